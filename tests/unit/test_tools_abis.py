@@ -0,0 +1,83 @@
+#!/usr/bin/env python3
+"""
+ABI HELPER TESTS
+=================
+Tests for tools/_abis.py: the ERC20 allowance storage key and Transfer log
+filtering.
+"""
+
+import sys
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).parent.parent.parent / "tools"))
+
+from hexbytes import HexBytes
+from web3 import Web3
+
+from _abis import (
+    TRANSFER_TOPIC, allowance_storage_key, transfers_to,
+)
+
+
+OWNER = "0xb22028EA4E841CA321eb917C706C931a94b564AB"
+SPENDER = "0xa5E0829CaCEd8fFDD4De3c43696c57F7D7A678ff"
+USDC = "0x3c499c542cEF5E3811e1192ce70d8cC03d5c3359"
+OTHER_TOKEN = "0x2791Bca1f2de4661ED88A30C99A7a9449Aa84174"
+
+
+# ============================================================
+# STORAGE KEYS
+# ============================================================
+
+class TestStorageKeys:
+    """Tests for the mapping storage-slot helpers."""
+
+    def test_allowance_key_is_nested_mapping(self):
+        inner = Web3.solidity_keccak(["uint256", "uint256"], [int(OWNER, 16), 1])
+        expected = Web3.solidity_keccak(["uint256", "bytes32"], [int(SPENDER, 16), inner])
+        assert allowance_storage_key(OWNER, SPENDER, 1) == Web3.to_hex(expected)
+
+    def test_allowance_key_depends_on_direction(self):
+        assert allowance_storage_key(OWNER, SPENDER, 1) != allowance_storage_key(SPENDER, OWNER, 1)
+
+
+# ============================================================
+# TRANSFER LOGS
+# ============================================================
+
+def _topic(address):
+    return "0x" + address[2:].lower().rjust(64, "0")
+
+
+def _transfer_log(token, to, amount, sender=SPENDER):
+    return {
+        "address": token,
+        "topics": [HexBytes(TRANSFER_TOPIC), HexBytes(_topic(sender)), HexBytes(_topic(to))],
+        "data": HexBytes(amount.to_bytes(32, "big")),
+    }
+
+
+class TestTransfersTo:
+    """Tests for transfers_to receipt filtering."""
+
+    def test_sums_matching_transfers(self):
+        receipt = {"logs": [
+            _transfer_log(USDC, OWNER, 1_000_000),
+            _transfer_log(USDC, OWNER, 250_000),
+        ]}
+        assert transfers_to(receipt, USDC, OWNER) == 1_250_000
+
+    def test_ignores_other_tokens_recipients_and_events(self):
+        approval = _transfer_log(USDC, OWNER, 5)
+        approval["topics"][0] = HexBytes("0x" + "11" * 32)
+        receipt = {"logs": [
+            _transfer_log(OTHER_TOKEN, OWNER, 7),            # wrong token
+            _transfer_log(USDC, SPENDER, 9),                 # sent elsewhere
+            _transfer_log(USDC, SPENDER, 11, sender=OWNER),  # sent by us
+            approval,                                        # not a Transfer
+            _transfer_log(USDC, OWNER, 3),
+        ]}
+        assert transfers_to(receipt, USDC, OWNER) == 3
+
+    def test_no_logs(self):
+        assert transfers_to({"logs": []}, USDC, OWNER) == 0
@@ -0,0 +1,61 @@
+#!/usr/bin/env python3
+"""
+FAST JSON TESTS
+================
+Tests for tools/_fastjson.py (loads and dumps), with and without orjson.
+"""
+
+import json
+import sys
+from pathlib import Path
+
+import pytest
+
+sys.path.insert(0, str(Path(__file__).parent.parent.parent / "tools"))
+
+import _fastjson
+
+
+@pytest.fixture(params=[True, False], ids=["orjson", "stdlib"])
+def backend(request, monkeypatch):
+    """Run each test against both backends (orjson only if installed)."""
+    if request.param and not _fastjson.ORJSON_AVAILABLE:
+        pytest.skip("orjson not installed")
+    monkeypatch.setattr(_fastjson, "ORJSON_AVAILABLE", request.param)
+    return request.param
+
+
+class TestLoads:
+    """Tests for loads."""
+
+    def test_str_and_bytes(self, backend):
+        payload = '{"bids": [{"price": "0.41", "size": "10"}], "n": 3}'
+        expected = {"bids": [{"price": "0.41", "size": "10"}], "n": 3}
+        assert _fastjson.loads(payload) == expected
+        assert _fastjson.loads(payload.encode()) == expected
+
+    def test_non_ascii(self, backend):
+        assert _fastjson.loads('["REDEEM \\u2014 x"]') == ["REDEEM — x"]
+
+    @pytest.mark.parametrize("bad", ["{not json", "", b"[1,"])
+    def test_bad_input_raises_value_error(self, backend, bad):
+        with pytest.raises(ValueError):
+            _fastjson.loads(bad)
+
+
+class TestDumps:
+    """Tests for dumps."""
+
+    RESULT = {"usdc_balance": 1.5, "errors": [], "actions_needed": ["REDEEM — x"], "wallet_address": None}
+
+    def test_returns_bytes_that_round_trip(self, backend):
+        out = _fastjson.dumps(self.RESULT)
+        assert isinstance(out, bytes)
+        assert json.loads(out) == self.RESULT
+
+    def test_indent_matches_stdlib_layout(self, backend):
+        expected = json.dumps(self.RESULT, indent=2, ensure_ascii=False).encode()
+        assert _fastjson.dumps(self.RESULT, indent=True) == expected
+
+    def test_non_ascii_is_utf8(self, backend):
+        assert "—".encode() in _fastjson.dumps(self.RESULT)
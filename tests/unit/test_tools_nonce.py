@@ -0,0 +1,116 @@
+#!/usr/bin/env python3
+"""
+NONCE TESTS
+============
+Tests for tools/_nonce.py: the per-wallet nonce lock and the
+send_with_nonce_lock wrapper the write scripts sign through.
+"""
+
+import sys
+from pathlib import Path
+from unittest.mock import MagicMock
+
+import pytest
+
+sys.path.insert(0, str(Path(__file__).parent.parent.parent / "tools"))
+
+import _nonce
+
+
+OWNER = "0xb22028EA4E841CA321eb917C706C931a94b564AB"
+
+
+@pytest.fixture(autouse=True)
+def lock_dir(tmp_path, monkeypatch):
+    """Point the nonce lock files at a temp directory."""
+    monkeypatch.setattr(_nonce, "LOCK_DIR", str(tmp_path))
+    return tmp_path
+
+
+def _recording_send(sent, reject=()):
+    def send(nonce):
+        sent.append(nonce)
+        if nonce in reject:
+            raise ValueError({"message": "nonce too low"})
+        return "0xhash"
+    return send
+
+
+# ============================================================
+# LOCK
+# ============================================================
+
+class TestNonceLock:
+    """Tests for nonce_lock."""
+
+    def test_lock_file_per_wallet_and_chain(self, lock_dir):
+        with _nonce.nonce_lock(OWNER, 137):
+            pass
+        with _nonce.nonce_lock(OWNER.lower(), 80002):
+            pass
+        assert sorted(p.name for p in lock_dir.iterdir()) == [
+            f"polymarket_nonce_{OWNER.lower()}_137.lock",
+            f"polymarket_nonce_{OWNER.lower()}_80002.lock",
+        ]
+
+
+# ============================================================
+# SEND WRAPPER
+# ============================================================
+
+class TestSendWithNonceLock:
+    """Tests for send_with_nonce_lock."""
+
+    def test_signs_with_pending_count(self):
+        w3 = MagicMock()
+        w3.eth.get_transaction_count.return_value = 9
+        sent = []
+
+        assert _nonce.send_with_nonce_lock(w3, OWNER, 137, _recording_send(sent)) == "0xhash"
+
+        assert sent == [9]
+        w3.eth.get_transaction_count.assert_called_once_with(OWNER, "pending")
+
+    def test_dropped_tx_nonce_is_reused(self):
+        """Our last broadcast was dropped: the next send fills the gap, not nonce + 1."""
+        w3 = MagicMock()
+        w3.eth.get_transaction_count.return_value = 5
+        sent = []
+
+        _nonce.send_with_nonce_lock(w3, OWNER, 137, _recording_send(sent))
+        # The tx at 5 never made it into the mempool; the node still reports 5.
+        _nonce.send_with_nonce_lock(w3, OWNER, 137, _recording_send(sent))
+
+        assert sent == [5, 5]
+
+    def test_follows_txs_sent_elsewhere(self):
+        """Txs from another wallet UI move the pending count; nothing stale is reused."""
+        w3 = MagicMock()
+        w3.eth.get_transaction_count.side_effect = [4, 7]
+        sent = []
+
+        _nonce.send_with_nonce_lock(w3, OWNER, 137, _recording_send(sent))
+        _nonce.send_with_nonce_lock(w3, OWNER, 137, _recording_send(sent))
+
+        assert sent == [4, 7]
+
+    def test_resyncs_on_nonce_too_low(self):
+        w3 = MagicMock()
+        w3.eth.get_transaction_count.side_effect = [5, 8]
+        sent = []
+
+        assert _nonce.send_with_nonce_lock(w3, OWNER, 137, _recording_send(sent, reject={5})) == "0xhash"
+        assert sent == [5, 8]
+
+    def test_other_errors_propagate_without_retry(self):
+        w3 = MagicMock()
+        w3.eth.get_transaction_count.return_value = 2
+        sent = []
+
+        def send(nonce):
+            sent.append(nonce)
+            raise ValueError("insufficient funds")
+
+        with pytest.raises(ValueError, match="insufficient funds"):
+            _nonce.send_with_nonce_lock(w3, OWNER, 137, send)
+        assert sent == [2]
@@ -0,0 +1,142 @@
+#!/usr/bin/env python3
+"""
+JSON-RPC HELPER TESTS
+======================
+Tests for tools/_rpc.py: batch_rpc result mapping, decode_uint and the
+Multicall3 aggregate3 helpers.
+"""
+
+import sys
+from pathlib import Path
+from unittest.mock import MagicMock, patch
+
+import pytest
+
+sys.path.insert(0, str(Path(__file__).parent.parent.parent / "tools"))
+
+from eth_abi import encode
+from web3 import Web3
+
+from _abis import MULTICALL3_ADDRESS
+from _rpc import (
+    aggregate3, aggregate3_request, batch_rpc, decode_aggregate3, decode_uint, eth_call,
+)
+
+
+USDC = "0x3c499c542cEF5E3811e1192ce70d8cC03d5c3359"
+EMPTY_RESULTS = [None, "0x", b""]
+
+
+def _fake_session(body):
+    resp = MagicMock()
+    resp.json.return_value = body
+    session = MagicMock()
+    session.post.return_value = resp
+    return session
+
+
+# ============================================================
+# BATCH RPC
+# ============================================================
+
+class TestBatchRpc:
+    """Tests for batch_rpc result mapping."""
+
+    def test_results_follow_input_order(self):
+        """Responses are matched by id, not by position in the reply."""
+        session = _fake_session([
+            {"jsonrpc": "2.0", "id": 2, "result": "0x3"},
+            {"jsonrpc": "2.0", "id": 0, "result": "0x1"},
+            {"jsonrpc": "2.0", "id": 1, "result": "0x2"},
+        ])
+        calls = [("eth_gasPrice", []), ("eth_blockNumber", []), ("eth_chainId", [])]
+
+        assert batch_rpc("http://rpc", calls, session=session) == ["0x1", "0x2", "0x3"]
+
+        payload = session.post.call_args.kwargs["json"]
+        assert [p["method"] for p in payload] == ["eth_gasPrice", "eth_blockNumber", "eth_chainId"]
+        assert [p["id"] for p in payload] == [0, 1, 2]
+
+    def test_error_and_missing_entries_become_none(self):
+        """A reverted call or a dropped reply yields None in its slot."""
+        session = _fake_session([
+            {"jsonrpc": "2.0", "id": 0, "error": {"code": 3, "message": "execution reverted"}},
+            {"jsonrpc": "2.0", "id": 1, "result": "0x2a"},
+        ])
+        calls = [eth_call(USDC, "0x"), ("eth_gasPrice", []), ("eth_blockNumber", [])]
+
+        assert batch_rpc("http://rpc", calls, session=session) == [None, "0x2a", None]
+
+    def test_rejected_batch_falls_back_to_parallel(self):
+        """A single error object (batch not supported) retries call by call."""
+        session = _fake_session({"jsonrpc": "2.0", "id": None, "error": {"message": "batch not allowed"}})
+        calls = [("eth_gasPrice", [])]
+
+        with patch("_rpc.parallel_rpc", return_value=["0x1"]) as parallel:
+            assert batch_rpc("http://rpc", calls, session=session) == ["0x1"]
+        parallel.assert_called_once_with("http://rpc", calls, 15)
+
+    def test_eth_call_shape(self):
+        """eth_call builds the (method, params) pair batch_rpc expects."""
+        assert eth_call(USDC, "0xabcd") == ("eth_call", [{"to": USDC, "data": "0xabcd"}, "latest"])
+
+
+# ============================================================
+# DECODING
+# ============================================================
+
+class TestDecodeUint:
+    """Tests for decode_uint over the shapes RPC results come in."""
+
+    @pytest.mark.parametrize("empty", EMPTY_RESULTS)
+    def test_empty_results_pass_through_as_none(self, empty):
+        assert decode_uint(empty) is None
+
+    def test_hex_quantity(self):
+        assert decode_uint("0x2a") == 42
+
+    def test_hex_word(self):
+        assert decode_uint("0x" + encode(["uint256"], [10**18]).hex()) == 10**18
+
+    def test_bytes_reads_first_word_only(self):
+        data = encode(["uint256", "uint256"], [7, 99])
+        assert decode_uint(data) == 7
+
+
+# ============================================================
+# MULTICALL3
+# ============================================================
+
+class TestAggregate3:
+    """Tests for the Multicall3 helpers."""
+
+    def test_aggregate3_maps_failures_to_none(self):
+        mc = MagicMock()
+        mc.functions.aggregate3.return_value.call.return_value = [(True, b"\x01"), (False, b"")]
+        calls = [(USDC, b"\x70\xa0\x82\x31"), (USDC, b"\x31\x3c\xe5\x67")]
+
+        with patch("_rpc.multicall3", return_value=mc):
+            assert aggregate3(MagicMock(), calls, allow_failure=True) == [b"\x01", None]
+
+        mc.functions.aggregate3.assert_called_once_with([(t, True, d) for t, d in calls])
+        mc.functions.aggregate3.return_value.call.assert_called_once_with(block_identifier="latest")
+
+    def test_request_targets_multicall3(self):
+        method, params = aggregate3_request(Web3(), [(USDC, b"\x70\xa0\x82\x31")])
+        assert method == "eth_call"
+        assert params[0]["to"] == MULTICALL3_ADDRESS
+        assert params[1] == "latest"
+
+    def test_decode_round_trip(self):
+        """Successful sub-calls keep their returnData; failed ones become None."""
+        word = encode(["uint256"], [123])
+        result = "0x" + encode(["(bool,bytes)[]"], [[(True, word), (False, b""), (True, b"")]]).hex()
+
+        decoded = decode_aggregate3(Web3(), result)
+
+        assert decoded == [word, None, b""]
+        assert decode_uint(decoded[0]) == 123
+
+    def test_decode_reverted_batch_raises(self):
+        with pytest.raises(ValueError):
+            decode_aggregate3(Web3(), None)
@@ -0,0 +1,86 @@
+"""
+Shared contract ABIs for the tools/ scripts.
+
+Every script used to carry its own (partial) ERC20 ABI and rebuild the
+contract object on each call. Import from here instead so the ABI is
+parsed once per interpreter and contract objects are reused.
+
+Usage (scripts are run as `python3 tools/<name>.py`, so tools/ is on sys.path):
+    from _abis import erc20
+    usdc = erc20(w3, USDC_ADDRESS)
+"""
+import functools
+
+from eth_abi import encode
+from web3 import Web3
+
+# Full ERC20 surface used across tools
+ERC20_ABI = [
+    {"constant": True, "inputs": [{"name": "_owner", "type": "address"}], "name": "balanceOf", "outputs": [{"name": "balance", "type": "uint256"}], "type": "function"},
+    {"constant": False, "inputs": [{"name": "_to", "type": "address"}, {"name": "_value", "type": "uint256"}], "name": "transfer", "outputs": [{"name": "", "type": "bool"}], "type": "function"},
+    {"constant": False, "inputs": [{"name": "_spender", "type": "address"}, {"name": "_value", "type": "uint256"}], "name": "approve", "outputs": [{"name": "", "type": "bool"}], "type": "function"},
+    {"constant": True, "inputs": [{"name": "_owner", "type": "address"}, {"name": "_spender", "type": "address"}], "name": "allowance", "outputs": [{"name": "", "type": "uint256"}], "type": "function"},
+    {"constant": True, "inputs": [], "name": "decimals", "outputs": [{"name": "", "type": "uint8"}], "type": "function"},
+]
+
+# Multicall3 (same address on every EVM chain); only aggregate3 is used
+MULTICALL3_ADDRESS = "0xcA11bde05977b3631167028862bE2a173976CA11"
+MULTICALL3_ABI = [
+    {"inputs": [{"components": [{"name": "target", "type": "address"}, {"name": "allowFailure", "type": "bool"}, {"name": "callData", "type": "bytes"}], "name": "calls", "type": "tuple[]"}],
+     "name": "aggregate3",
+     "outputs": [{"components": [{"name": "success", "type": "bool"}, {"name": "returnData", "type": "bytes"}], "name": "returnData", "type": "tuple[]"}],
+     "stateMutability": "payable", "type": "function"},
+]
+
+# 4-byte selectors for hand-built calldata (Multicall3 / raw eth_call)
+BALANCE_OF_SELECTOR = bytes.fromhex("70a08231")  # balanceOf(address)
+TRANSFER_SELECTOR = bytes.fromhex("a9059cbb")    # transfer(address,uint256)
+APPROVE_SELECTOR = bytes.fromhex("095ea7b3")     # approve(address,uint256)
+ALLOWANCE_SELECTOR = bytes.fromhex("dd62ed3e")   # allowance(address,address)
+DECIMALS_SELECTOR = bytes.fromhex("313ce567")    # decimals()
+
+# keccak256("Transfer(address,address,uint256)")
+TRANSFER_TOPIC = "0xddf252ad1be2c89b69c2b068fc378daa952ba7f163c4a11628f55a4df523b3ef"
+
+
+@functools.lru_cache(maxsize=32)
+def erc20(w3, address):
+    """Return a cached ERC20 contract bound to (w3, address)."""
+    return w3.eth.contract(address=Web3.to_checksum_address(address), abi=ERC20_ABI)
+
+
+@functools.lru_cache(maxsize=8)
+def multicall3(w3):
+    """Return the cached Multicall3 contract for this w3."""
+    return w3.eth.contract(address=MULTICALL3_ADDRESS, abi=MULTICALL3_ABI)
+
+
+def approve_calldata(spender, amount):
+    """ABI-encoded approve(spender, amount) without going through a Contract."""
+    return "0x" + (APPROVE_SELECTOR + encode(["address", "uint256"], [spender, amount])).hex()
+
+
+def transfer_calldata(to, amount):
+    """ABI-encoded transfer(to, amount) without going through a Contract."""
+    return "0x" + (TRANSFER_SELECTOR + encode(["address", "uint256"], [to, amount])).hex()
+
+
+def allowance_storage_key(owner, spender, allowances_slot):
+    """Storage key of _allowances[owner][spender] (nested mapping)."""
+    inner = Web3.keccak(encode(["address", "uint256"], [owner, allowances_slot]))
+    return "0x" + Web3.keccak(encode(["address", "bytes32"], [spender, inner])).hex()
+
+
+def transfers_to(receipt, token, owner):
+    """
+    Sum of `token` ERC20 Transfers to `owner` in a tx receipt: what a swap
+    actually paid out, read from its logs instead of a balanceOf diff.
+    """
+    to_topic = "0x" + owner[2:].lower().rjust(64, "0")
+    total = 0
+    for log in receipt["logs"]:
+        topics = [Web3.to_hex(t) for t in log["topics"]]
+        if (log["address"] == token and len(topics) == 3
+                and topics[0] == TRANSFER_TOPIC and topics[2] == to_topic):
+            total += int(Web3.to_hex(log["data"]), 16)
+    return total
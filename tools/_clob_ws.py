@@ -0,0 +1,56 @@
+"""
+Order book snapshots from the Polymarket CLOB market websocket.
+
+Subscribing to the market channel returns the full book once (a `book`
+event) and only deltas after that, instead of the whole book on every REST
+poll. get_book_ws() returns that first snapshot as the same
+OrderBookSummary that ClobClient.get_order_book() gives, so callers can
+switch over without touching their parsing.
+
+Usage:
+    from _clob_ws import get_book_ws
+    book = await get_book_ws(TOKEN_ID, fallback=lambda: client.get_order_book(TOKEN_ID))
+"""
+import asyncio
+import json
+
+import websockets
+from py_clob_client.clob_types import OrderBookSummary, OrderSummary
+
+from _fastjson import loads
+
+MARKET_WS_URL = "wss://ws-subscriptions-clob.polymarket.com/ws/market"
+
+
+def _summary(event):
+    return OrderBookSummary(
+        market=event.get("market"),
+        asset_id=event.get("asset_id"),
+        timestamp=event.get("timestamp"),
+        hash=event.get("hash"),
+        bids=[OrderSummary(price=b["price"], size=b["size"]) for b in event.get("bids", [])],
+        asks=[OrderSummary(price=a["price"], size=a["size"]) for a in event.get("asks", [])],
+    )
+
+
+async def get_book_ws(token_id, timeout=5.0, fallback=None):
+    """
+    First `book` snapshot for token_id from the market channel.
+
+    On any websocket error or timeout, returns fallback() (run in a thread,
+    e.g. the REST get_order_book) if given, else re-raises.
+    """
+    try:
+        async with websockets.connect(MARKET_WS_URL) as ws:
+            await ws.send(json.dumps({"assets_ids": [token_id], "type": "market"}))
+            async with asyncio.timeout(timeout):
+                while True:
+                    msg = loads(await ws.recv())
+                    # The initial snapshot arrives as a list of events
+                    for event in msg if isinstance(msg, list) else [msg]:
+                        if event.get("event_type") == "book" and event.get("asset_id") == token_id:
+                            return _summary(event)
+    except Exception:
+        if fallback is None:
+            raise
+        return await asyncio.to_thread(fallback)
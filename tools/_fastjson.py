@@ -0,0 +1,29 @@
+"""
+JSON for the tools/ scripts: orjson when installed, stdlib otherwise.
+
+orjson parses API payloads several times faster than json. Both raise a
+ValueError subclass on bad input, so callers can catch ValueError either way.
+dumps() returns UTF-8 bytes in both cases, ready for sys.stdout.buffer or a
+socket.
+"""
+import json
+
+try:
+    import orjson
+    ORJSON_AVAILABLE = True
+except ImportError:
+    ORJSON_AVAILABLE = False
+
+
+def loads(data):
+    """Parse JSON from str or bytes (e.g. resp.content)."""
+    if ORJSON_AVAILABLE:
+        return orjson.loads(data)
+    return json.loads(data)
+
+
+def dumps(obj, indent=False):
+    """Serialize to UTF-8 bytes; indent=True gives the 2-space json.dumps(indent=2) layout."""
+    if ORJSON_AVAILABLE:
+        return orjson.dumps(obj, option=orjson.OPT_INDENT_2 if indent else 0)
+    return json.dumps(obj, indent=2 if indent else None, ensure_ascii=False).encode()
@@ -0,0 +1,52 @@
+"""
+Nonce handling for the tools/ write scripts.
+
+Every send signs with the node's pending transaction count, read under an
+fcntl lock so concurrent tool runs don't hand out the same nonce. There is
+no local cache: a cached "next nonce" goes wrong as soon as one of our
+broadcasts is dropped (every later tx queues behind the gap), and the
+pending count already includes our own mempool txs. A "nonce too low"
+rejection (the node lagging behind another writer) re-reads once.
+"""
+import fcntl
+import os
+from contextlib import contextmanager
+
+LOCK_DIR = os.path.expanduser("~/.cache")
+
+
+def _lock_path(address, chain_id):
+    return os.path.join(LOCK_DIR, f"polymarket_nonce_{address.lower()}_{chain_id}.lock")
+
+
+@contextmanager
+def nonce_lock(address, chain_id):
+    """Exclusive cross-process lock for this wallet's nonce sequence."""
+    os.makedirs(LOCK_DIR, exist_ok=True)
+    with open(_lock_path(address, chain_id), "w") as fh:
+        fcntl.flock(fh, fcntl.LOCK_EX)
+        try:
+            yield
+        finally:
+            fcntl.flock(fh, fcntl.LOCK_UN)
+
+
+def is_nonce_too_low(exc):
+    return "nonce too low" in str(exc).lower()
+
+
+def send_with_nonce_lock(w3, address, chain_id, send):
+    """
+    Call send(nonce) -> tx_hash with the node's pending count, holding
+    nonce_lock; re-read and retry once if the node says "nonce too low".
+    """
+    with nonce_lock(address, chain_id):
+        nonce = w3.eth.get_transaction_count(address, "pending")
+        try:
+            return send(nonce)
+        except Exception as e:
+            if not is_nonce_too_low(e):
+                raise
+            nonce = w3.eth.get_transaction_count(address, "pending")
+            print(f"[NONCE] Pending count stale, resyncing to {nonce}")
+            return send(nonce)
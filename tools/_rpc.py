@@ -0,0 +1,346 @@
+"""
+Shared JSON-RPC helpers for the tools/ scripts.
+
+Public Polygon RPCs cost ~100-300ms per round-trip, which dominates the
+runtime of these scripts. Read-only calls that don't depend on each other
+should go out as one JSON-RPC 2.0 batch POST instead of one request each.
+
+Usage:
+    from _rpc import batch_rpc, eth_call, decode_uint
+    bal, quote = batch_rpc(RPC_URL, [
+        ("eth_getBalance", [addr, "latest"]),
+        eth_call(QUOTER, calldata),
+    ])
+"""
+import asyncio
+import time
+from concurrent.futures import ThreadPoolExecutor, as_completed
+
+import aiohttp
+import requests
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
+from hexbytes import HexBytes
+from web3 import Web3
+from web3.exceptions import TimeExhausted, Web3RPCError
+from web3.middleware import ExtraDataToPOAMiddleware
+
+from _abis import multicall3
+
+
+def pooled_session(pool_connections=8, pool_maxsize=32, retries=2, backoff_factor=0.1):
+    """
+    requests.Session with a larger keep-alive pool and connect retries.
+
+    Share one between the Web3 HTTPProvider and batch_rpc so every RPC after
+    the first reuses an open TLS connection.
+    """
+    session = requests.Session()
+    adapter = HTTPAdapter(
+        pool_connections=pool_connections,
+        pool_maxsize=pool_maxsize,
+        max_retries=Retry(total=retries, backoff_factor=backoff_factor),
+    )
+    session.mount("https://", adapter)
+    session.mount("http://", adapter)
+    session.headers["Connection"] = "keep-alive"
+    return session
+
+
+# Alternate public Polygon endpoints raced against the primary for reads
+POLYGON_FALLBACK_RPCS = ("https://polygon-rpc.com", "https://rpc.ankr.com/polygon")
+
+# Idempotent reads that are safe to send to several nodes at once. Not
+# eth_getTransactionCount: a lagging node that hasn't seen our last
+# broadcast would hand back a nonce that's already used
+RACE_METHODS = frozenset({
+    "eth_call", "eth_getBalance", "eth_gasPrice", "eth_getBlockByNumber",
+})
+
+# Methods that change chain state; after one of them reads stop racing
+WRITE_METHODS = frozenset({"eth_sendRawTransaction", "eth_sendTransaction"})
+
+
+class MultiRPCProvider(Web3.HTTPProvider):
+    """
+    HTTPProvider that sends RACE_METHODS to the primary and every fallback
+    endpoint at once and returns the first answer without a JSON-RPC
+    error, so read latency is the fastest node's rather than the primary's
+    (and a 429 from one is masked by the others). Everything else,
+    eth_sendRawTransaction included, goes to the primary only.
+
+    Once a write has gone out, every later read goes to the primary too: a
+    fallback that hasn't seen the tx yet could otherwise win with a
+    pre-tx balance or state.
+
+    Losing requests can't be interrupted mid-flight; they finish in the
+    background (bounded by the request timeout) and their answers are
+    dropped. The pool has room for several races' worth of stragglers so
+    a hung node doesn't stall the next read.
+    """
+
+    def __init__(self, endpoint_uri, fallback_uris, **kwargs):
+        super().__init__(endpoint_uri, **kwargs)
+        self._fallbacks = [
+            Web3.HTTPProvider(uri, session=kwargs.get("session"), request_kwargs=kwargs.get("request_kwargs"))
+            for uri in fallback_uris
+        ]
+        self._race_pool = ThreadPoolExecutor(max_workers=4 * (len(self._fallbacks) + 1))
+        self._wrote = False
+
+    def make_request(self, method, params):
+        if method in WRITE_METHODS:
+            self._wrote = True
+        if method not in RACE_METHODS or not self._fallbacks or self._wrote:
+            return super().make_request(method, params)
+        futures = [self._race_pool.submit(super().make_request, method, params)]
+        futures += [self._race_pool.submit(p.make_request, method, params) for p in self._fallbacks]
+        error = response = None
+        for fut in as_completed(futures):
+            try:
+                response = fut.result()
+            except Exception as e:
+                error = e
+                continue
+            # JSON-RPC errors (rate limits, node faults) come back as a
+            # normal response; wait for a node that actually answered
+            if not (isinstance(response, dict) and "error" in response):
+                return response
+        if response is not None:
+            return response
+        raise error
+
+
+def make_w3(rpc_url, session=None, timeout=15, poa=False, fallback_urls=()):
+    """
+    Web3 over a pooled keep-alive session (a fresh one unless passed in;
+    pass the same session to batch_rpc to share the connection).
+
+    eth_chainId is answered from web3's request cache after the first call,
+    so w3.eth.chain_id and build_transaction's chainId fill are free.
+
+    With fallback_urls, reads are raced across rpc_url and the fallbacks
+    (see MultiRPCProvider); writes still go to rpc_url alone.
+    """
+    kwargs = dict(
+        session=session or pooled_session(),
+        request_kwargs={"timeout": timeout},
+        cache_allowed_requests=True,
+        cacheable_requests={"eth_chainId"},
+    )
+    if fallback_urls:
+        provider = MultiRPCProvider(rpc_url, fallback_urls, **kwargs)
+    else:
+        provider = Web3.HTTPProvider(rpc_url, **kwargs)
+    w3 = Web3(provider)
+    if poa:
+        w3.middleware_onion.inject(ExtraDataToPOAMiddleware, layer=0)
+    return w3
+
+
+# Gas price / base fee barely move within a few seconds; reads inside this
+# window reuse the last answer
+GAS_PRICE_TTL = 3.0
+_fee_cache = {}
+
+# Polygon enforces a minimum priority fee; 30 gwei clears it
+POLYGON_PRIORITY_FEE = 30 * 10**9
+
+
+def _cached_fee(w3, name, ttl, fetch):
+    key = (name, w3.provider.endpoint_uri)
+    now = time.monotonic()
+    hit = _fee_cache.get(key)
+    if hit and now - hit[0] < ttl:
+        return hit[1]
+    value = fetch()
+    _fee_cache[key] = (now, value)
+    return value
+
+
+def get_gas_price(w3, ttl=GAS_PRICE_TTL):
+    """w3.eth.gas_price, cached per endpoint for `ttl` seconds."""
+    return _cached_fee(w3, "gas_price", ttl, lambda: w3.eth.gas_price)
+
+
+def get_base_fee(w3, ttl=GAS_PRICE_TTL):
+    """Pending block's baseFeePerGas, cached per endpoint for `ttl` seconds."""
+    return _cached_fee(w3, "base_fee", ttl, lambda: w3.eth.get_block("pending")["baseFeePerGas"])
+
+
+def eip1559_fees(base_fee, tip=POLYGON_PRIORITY_FEE):
+    """
+    Type-2 fee fields to merge into a tx dict. maxFeePerGas leaves room for
+    the base fee to double; only baseFee + tip is actually charged.
+    """
+    return {"type": 2, "maxFeePerGas": base_fee * 2 + tip, "maxPriorityFeePerGas": tip}
+
+
+def connect_fastest(rpc_urls, probe_timeout=3, request_timeout=10, poa=False):
+    """
+    Probe every endpoint concurrently and return a Web3 for the first one
+    that answers is_connected(), or None if none do. Worst-case setup is
+    one probe_timeout instead of the sum over a sequential fallback list.
+    """
+    def probe(rpc):
+        # No web3 retry/backoff on the probe: a dead endpoint should just lose
+        provider = Web3.HTTPProvider(
+            rpc, request_kwargs={"timeout": probe_timeout}, exception_retry_configuration=None
+        )
+        return rpc if Web3(provider).is_connected() else None
+
+    pool = ThreadPoolExecutor(max_workers=len(rpc_urls))
+    try:
+        for fut in as_completed([pool.submit(probe, rpc) for rpc in rpc_urls]):
+            try:
+                rpc = fut.result()
+            except Exception:
+                continue
+            if rpc:
+                w3 = Web3(Web3.HTTPProvider(rpc, request_kwargs={"timeout": request_timeout}))
+                if poa:
+                    w3.middleware_onion.inject(ExtraDataToPOAMiddleware, layer=0)
+                return w3
+    finally:
+        pool.shutdown(wait=False, cancel_futures=True)
+    return None
+
+
+# Polygon PoS block time; a receipt can't appear faster than this
+POLYGON_BLOCK_TIME = 2.0
+
+
+def wait_receipt(w3, tx_hash, timeout=120, poll_latency=POLYGON_BLOCK_TIME):
+    """
+    wait_for_transaction_receipt polled once per block instead of web3's
+    default 0.1s, which spends ~20 RPCs per block waiting on nothing.
+    """
+    return w3.eth.wait_for_transaction_receipt(tx_hash, timeout=timeout, poll_latency=poll_latency)
+
+
+def wait_receipts(w3, tx_hashes, timeout=120, poll_latency=POLYGON_BLOCK_TIME):
+    """
+    Wait for several txs at once: one eth_getBlockReceipts per new block
+    covers every tx in it, instead of one eth_getTransactionReceipt per tx
+    per poll. Returns {tx_hash: receipt}. Falls back to wait_receipt per tx
+    on nodes without eth_getBlockReceipts.
+    """
+    pending = {HexBytes(h): h for h in tx_hashes}
+    found = {}
+    deadline = time.monotonic() + timeout
+    # Start one block back: the first tx may already be in the head block
+    next_block = w3.eth.block_number - 1
+    try:
+        while pending:
+            head = w3.eth.block_number
+            while next_block <= head and pending:
+                for receipt in w3.eth.get_block_receipts(next_block):
+                    h = pending.pop(HexBytes(receipt["transactionHash"]), None)
+                    if h is not None:
+                        found[h] = receipt
+                next_block += 1
+            if not pending:
+                break
+            if time.monotonic() > deadline:
+                raise TimeExhausted(f"{len(pending)} transaction(s) not mined after {timeout}s")
+            time.sleep(poll_latency)
+    except Web3RPCError:
+        remaining = max(deadline - time.monotonic(), poll_latency)
+        for h in pending.values():
+            found[h] = wait_receipt(w3, h, timeout=remaining, poll_latency=poll_latency)
+    return found
+
+
+def eth_call(to, data, block="latest"):
+    """(method, params) pair for an eth_call, for use with batch_rpc."""
+    return ("eth_call", [{"to": to, "data": data}, block])
+
+
+def _payload(calls):
+    return [
+        {"jsonrpc": "2.0", "id": i, "method": method, "params": params}
+        for i, (method, params) in enumerate(calls)
+    ]
+
+
+def _results(payload, body):
+    by_id = {r.get("id"): r for r in body}
+    return [by_id.get(i, {}).get("result") for i in range(len(payload))]
+
+
+async def _post_all(rpc_url, payload, timeout):
+    async with aiohttp.ClientSession(timeout=aiohttp.ClientTimeout(total=timeout)) as session:
+        async def post(req):
+            async with session.post(rpc_url, json=req) as resp:
+                resp.raise_for_status()
+                return await resp.json(content_type=None)
+        return await asyncio.gather(*(post(req) for req in payload))
+
+
+def parallel_rpc(rpc_url, calls, timeout=15):
+    """
+    Same contract as batch_rpc, but one concurrent POST per call.
+
+    For endpoints that reject or throttle batches; wall time is still
+    ~1 round-trip instead of len(calls).
+    """
+    payload = _payload(calls)
+    return _results(payload, asyncio.run(_post_all(rpc_url, payload, timeout)))
+
+
+def batch_rpc(rpc_url, calls, session=None, timeout=15):
+    """
+    Send [(method, params), ...] as a single JSON-RPC batch.
+
+    Returns the raw `result` of each call in input order. Calls that came
+    back with an `error` (e.g. a reverted eth_call) yield None.
+    """
+    payload = _payload(calls)
+    resp = (session or requests).post(rpc_url, json=payload, timeout=timeout)
+    resp.raise_for_status()
+    body = resp.json()
+    if not isinstance(body, list):
+        # Endpoint rejected the batch (answers with a single error object)
+        return parallel_rpc(rpc_url, calls, timeout)
+    return _results(payload, body)
+
+
+def aggregate3(w3, calls, allow_failure=False, block_identifier="latest"):
+    """
+    Run [(target, calldata), ...] as one Multicall3 eth_call.
+
+    Returns each call's returnData (bytes) in order; with allow_failure=True
+    a failed sub-call yields None instead of reverting the whole batch.
+    """
+    results = multicall3(w3).functions.aggregate3(
+        [(target, allow_failure, data) for target, data in calls]
+    ).call(block_identifier=block_identifier)
+    return [data if ok else None for ok, data in results]
+
+
+def aggregate3_request(w3, calls, allow_failure=False, block="latest"):
+    """
+    The aggregate3 eth_call as a (method, params) pair, so a Multicall can
+    ride in the same batch_rpc POST as non-eth_call reads (nonce, gas price).
+    Decode the result with decode_aggregate3.
+    """
+    mc = multicall3(w3)
+    data = mc.encode_abi("aggregate3", args=[[(target, allow_failure, d) for target, d in calls]])
+    return eth_call(mc.address, data, block)
+
+
+def decode_aggregate3(w3, result):
+    """Hex result of an aggregate3_request -> [returnData bytes or None]."""
+    if result is None:
+        raise ValueError("aggregate3 reverted")
+    (results,) = w3.codec.decode(["(bool,bytes)[]"], bytes.fromhex(result[2:]))
+    return [data if ok else None for ok, data in results]
+
+
+def decode_uint(result):
+    """Hex quantity / 32-byte word (str or bytes) -> int (None passes through)."""
+    if result is None or result in ("0x", b""):
+        return None
+    if isinstance(result, bytes):
+        return int.from_bytes(result[:32], "big")
+    return int(result, 16)
@@ -1,6 +1,9 @@
 
+import logging
 import requests
 
+logger = logging.getLogger(__name__)
+
 def check_prices():
     queries = [
         "measles cases in the U.S.",
@@ -16,7 +19,9 @@ def check_prices():
             # simple search
             url = "https://gamma-api.polymarket.com/events"
             params = {"q": q, "limit": 1}
-            r = requests.get(url, params=params).json()
+            resp = requests.get(url, params=params)
+            resp.raise_for_status()
+            r = resp.json()
             
             if r:
                 # Gamma returns events. Need first market.
@@ -46,7 +51,9 @@ def check_prices():
                     mwt_id = m.get('id')
                     try:
                         m_url = f"https://gamma-api.polymarket.com/markets/{mwt_id}"
-                        mr = requests.get(m_url).json()
+                        m_resp = requests.get(m_url)
+                        m_resp.raise_for_status()
+                        mr = m_resp.json()
                         # Gamma returns price history or stats?
                         # Use orderbook endpoint for price? 
                         # Or just use the 'bestAsk' 'bestBid' if available in market obj.
@@ -58,14 +65,20 @@ def check_prices():
                         
                         print(f"{q[:48]:<50} | {'(Log Check)':<12} | {mid:.3f} (Mid)    | ???")
                         
-                    except:
+                    except requests.RequestException as e:
+                        logger.warning("GET %s failed (status %s): %s", m_url, getattr(e.response, "status_code", None), e)
+                        print(f"{q[:48]:<50} | {'Err':<12} | {'Err':<15} | ???")
+                    except (ValueError, KeyError) as e:
+                        logger.warning("bad market payload from %s: %s", m_url, e)
                         print(f"{q[:48]:<50} | {'Err':<12} | {'Err':<15} | ???")
 
             else:
                  print(f"{q[:48]:<50} | {'Not Found':<12} | {'-':<15} | -")
                  
-        except Exception as e:
-            print(f"Error {q}: {e}")
+        except requests.RequestException as e:
+            logger.warning("GET %s q=%r failed (status %s): %s", url, q, getattr(e.response, "status_code", None), e)
+        except (ValueError, KeyError, IndexError) as e:
+            logger.warning("bad events payload for %r: %s", q, e)
 
 if __name__ == "__main__":
     check_prices()
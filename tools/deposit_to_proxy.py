@@ -10,6 +10,8 @@ from web3 import Web3
 from web3.middleware import ExtraDataToPOAMiddleware
 from eth_account import Account
 from dotenv import load_dotenv
+from _abis import erc20, transfer_calldata
+from _nonce import send_with_nonce_lock
 
 load_dotenv()
 
@@ -21,11 +23,6 @@ RPC_URLS = [
 ]
 NATIVE_USDC = "0x3c499c542cEF5E3811e1192ce70d8cC03d5c3359"
 
-ERC20_ABI = [
-    {"constant": True, "inputs": [{"name": "_owner", "type": "address"}], "name": "balanceOf", "outputs": [{"name": "balance", "type": "uint256"}], "type": "function"},
-    {"constant": False, "inputs": [{"name": "_to", "type": "address"}, {"name": "_value", "type": "uint256"}], "name": "transfer", "outputs": [{"name": "", "type": "bool"}], "type": "function"}
-]
-
 def connect_web3():
     for rpc in RPC_URLS:
         try:
@@ -72,7 +69,7 @@ def fix_proxy_funding():
             # Some versions use different method names
             proxy_address = client.get_collateral_address()
             print(f"[PROXY] Collateral Address: {proxy_address}")
-        except:
+        except AttributeError:
             print("[ERROR] Cannot derive proxy address. Check py_clob_client version.")
             return
 
@@ -82,7 +79,7 @@ def fix_proxy_funding():
         return
 
     # 2. Check balances
-    usdc = w3.eth.contract(address=Web3.to_checksum_address(NATIVE_USDC), abi=ERC20_ABI)
+    usdc = erc20(w3, NATIVE_USDC)
 
     eoa_balance_wei = usdc.functions.balanceOf(eoa_address).call()
     eoa_balance = eoa_balance_wei / 1e6
@@ -104,18 +101,24 @@ def fix_proxy_funding():
     print(f"[TRANSFER] Moving ${transfer_amount:.6f} USDC to Proxy...")
 
     # 3. Execute transfer
-    tx = usdc.functions.transfer(
-        Web3.to_checksum_address(proxy_address),
-        transfer_amount_wei
-    ).build_transaction({
-        'from': eoa_address,
-        'nonce': w3.eth.get_transaction_count(eoa_address),
-        'gas': 100000,
-        'gasPrice': int(w3.eth.gas_price * 1.5)  # 50% boost for speed
-    })
-
-    signed = account.sign_transaction(tx)
-    tx_hash = w3.eth.send_raw_transaction(signed.raw_transaction)
+    gas_price = int(w3.eth.gas_price * 1.5)  # 50% boost for speed
+
+    def sign_and_send(nonce):
+        tx = {
+            'from': eoa_address,
+            'to': usdc.address,
+            'data': transfer_calldata(Web3.to_checksum_address(proxy_address), transfer_amount_wei),
+            'value': 0,
+            'chainId': 137,
+            'nonce': nonce,
+            'gas': 100000,
+            'gasPrice': gas_price
+        }
+        signed = account.sign_transaction(tx)
+        return w3.eth.send_raw_transaction(signed.raw_transaction)
+
+    # Signs with the node's pending nonce under the wallet lock (re-reads once on "nonce too low")
+    tx_hash = send_with_nonce_lock(w3, eoa_address, 137, sign_and_send)
 
     print(f"[TX] {tx_hash.hex()}")
     print("[WAITING] Confirming transaction...")
@@ -1,9 +1,11 @@
 
 import os
 import json
+import logging
 from py_clob_client.client import ClobClient
 from py_clob_client.clob_types import ApiCreds
 from py_clob_client.constants import POLYGON
+from py_clob_client.exceptions import PolyApiException
 from curl_cffi import requests as cffi_requests
 from dotenv import load_dotenv
 
@@ -13,6 +15,8 @@ PROXY_URL = os.getenv("PROXY_URL", "")
 SYS_PROXIES = {"https": PROXY_URL, "http": PROXY_URL}
 MAKER_ADDRESS = "0xb22028EA4E841CA321eb917C706C931a94b564AB"
 
+logger = logging.getLogger(__name__)
+
 import py_clob_client.http_helpers.helpers as _clob_helpers
 session = cffi_requests.Session(impersonate="chrome110", proxies=SYS_PROXIES)
 session.headers = {"Referer": "https://polymarket.com/", "Origin": "https://polymarket.com"}
@@ -23,6 +27,7 @@ def patched_request(endpoint, method, headers=None, data=None, **kwargs):
     if method == "GET": resp = session.get(endpoint, headers=final_headers)
     elif method == "POST": resp = session.post(endpoint, headers=final_headers, json=data)
     else: return {}
+    resp.raise_for_status()
     return resp.json()
 
 _clob_helpers.request = patched_request
@@ -44,5 +49,7 @@ try:
     for t in trades:
         if t.get('id') == trade_id:
             print(json.dumps(t, indent=2))
-except Exception as e:
-    print(f"Error: {e}")
+except cffi_requests.RequestsError as e:
+    logger.warning("get_trades failed (status %s): %s", getattr(e.response, "status_code", None), e)
+except (PolyApiException, ValueError) as e:
+    logger.warning("get_trades failed: %s", e)
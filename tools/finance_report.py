@@ -2,13 +2,21 @@
 import os
 import sys
 import math
+import requests
+import time
+import asyncio
+import logging
+import functools
+import threading
 from dotenv import load_dotenv
 from web3 import Web3
+from web3.exceptions import Web3Exception
 from py_clob_client.client import ClobClient
 from py_clob_client.clob_types import ApiCreds, BalanceAllowanceParams, AssetType
 from py_clob_client.constants import POLYGON
 from curl_cffi import requests as cffi_requests
 import py_clob_client.http_helpers.helpers as _clob_helpers
+from _abis import erc20
 
 # --- CONFIG ---
 load_dotenv(".env")
@@ -19,70 +27,130 @@ USDC_ADDRESS = "0x2791Bca1f2de4661ED88A30C99A7a9449Aa84174"
 NATIVE_USDC = "0x3c499c542cEF5E3811e1192ce70d8cC03d5c3359"
 MAKER_ADDRESS = "0xb22028EA4E841CA321eb917C706C931a94b564AB"
 GAS_COST_PER_TRADE = 0.05
+# Chainlink POL (ex-MATIC) / USD feed on Polygon, 8 decimals
+POL_USD_FEED = "0xAB594600376Ec9fD91F8e885dADF0CE036862dE0"
+POL_USD_FALLBACK = 0.85
+
+logger = logging.getLogger(__name__)
+AGGREGATOR_ABI = [{"inputs":[],"name":"latestRoundData","outputs":[{"name":"roundId","type":"uint80"},{"name":"answer","type":"int256"},{"name":"startedAt","type":"uint256"},{"name":"updatedAt","type":"uint256"},{"name":"answeredInRound","type":"uint80"}],"stateMutability":"view","type":"function"}]
 PROXY_URL = os.getenv("PROXY_URL", "")
 SYS_PROXIES = {"https": PROXY_URL, "http": PROXY_URL}
 
 # --- PROXY PATCH ---
-session = cffi_requests.Session(impersonate="chrome110", proxies=SYS_PROXIES)
-session.headers = {"Referer": "https://polymarket.com/", "Origin": "https://polymarket.com"}
+# curl_cffi sessions are not thread-safe; the report fans out CLOB calls
+# to worker threads, so keep one session per thread.
+_local = threading.local()
+def _session():
+    if not hasattr(_local, "session"):
+        _local.session = cffi_requests.Session(impersonate="chrome110", proxies=SYS_PROXIES)
+        _local.session.headers = {"Referer": "https://polymarket.com/", "Origin": "https://polymarket.com"}
+    return _local.session
+
 def patched_request(endpoint, method, headers=None, data=None, **kwargs):
+    session = _session()
     final_headers = {"Referer": "https://polymarket.com/", "Origin": "https://polymarket.com"}
     if headers: final_headers.update(headers)
     if method == "GET": resp = session.get(endpoint, headers=final_headers)
     elif method == "POST": resp = session.post(endpoint, headers=final_headers, json=data)
     elif method == "DELETE": resp = session.delete(endpoint, headers=final_headers)
     else: return {}
+    resp.raise_for_status()
     return resp.json()
 _clob_helpers.request = patched_request
 
+# 429s from the CLOB are retried this many times, honouring Retry-After
+# (capped) or backing off exponentially when the header is missing
+RATE_LIMIT_RETRIES = 3
+RATE_LIMIT_MAX_WAIT = 10.0
+
+def _retry_after(response, attempt):
+    """Seconds to wait before retrying a 429."""
+    try:
+        wait = float(response.headers.get("Retry-After"))
+    except (AttributeError, TypeError, ValueError):
+        wait = 0.5 * 2 ** attempt
+    return min(max(wait, 0.0), RATE_LIMIT_MAX_WAIT)
+
 def get_market_midpoint(client, token_id):
+    for attempt in range(RATE_LIMIT_RETRIES + 1):
+        try:
+            orderbook = client.get_order_book(token_id)
+            bids = orderbook.bids
+            asks = orderbook.asks
+            if bids and asks:
+                best_bid = float(bids[0].price)
+                best_ask = float(asks[0].price)
+                return (best_bid + best_ask) / 2
+            return 0.0
+        except cffi_requests.RequestsError as e:
+            status = getattr(e.response, "status_code", None)
+            if status == 429 and attempt < RATE_LIMIT_RETRIES:
+                time.sleep(_retry_after(e.response, attempt))
+                continue
+            logger.warning("order book %s failed (status %s): %s", token_id, status, e)
+            return 0.0
+        except (ValueError, KeyError) as e:
+            logger.warning("order book %s unparseable: %s", token_id, e)
+            return 0.0
+
+def get_chain_balances(w3):
+    """On-chain liquidity: (POL, USDC.e, native USDC) for the maker wallet."""
+    matic_bal = w3.from_wei(w3.eth.get_balance(MAKER_ADDRESS), 'ether')
+    usdc_bal = erc20(w3, USDC_ADDRESS).functions.balanceOf(MAKER_ADDRESS).call() / (10 ** 6)
+    native_bal = erc20(w3, NATIVE_USDC).functions.balanceOf(MAKER_ADDRESS).call() / (10 ** 6)
+    return matic_bal, usdc_bal, native_bal
+
+@functools.lru_cache(maxsize=1)
+def _pol_usd(w3, minute_bucket):
+    """POL/USD from Chainlink. minute_bucket keys the cache so it expires every 60s."""
+    feed = w3.eth.contract(address=POL_USD_FEED, abi=AGGREGATOR_ABI)
+    _, answer, _, _, _ = feed.functions.latestRoundData().call()
+    return answer / 1e8
+
+def get_pol_price(w3):
     try:
-        orderbook = client.get_order_book(token_id)
-        bids = orderbook.bids
-        asks = orderbook.asks
-        if bids and asks:
-            best_bid = float(bids[0].price)
-            best_ask = float(asks[0].price)
-            return (best_bid + best_ask) / 2
-        return 0.0
-    except:
-        return 0.0
-
-def main():
+        return _pol_usd(w3, int(time.time() // 60))
+    except (Web3Exception, requests.RequestException) as e:
+        logger.warning("POL price feed %s unavailable (%s), using $%s", POL_USD_FEED, e, POL_USD_FALLBACK)
+        return POL_USD_FALLBACK
+
+def get_position_shares(client, token_id):
+    try:
+        bal_resp = client.get_balance_allowance(BalanceAllowanceParams(asset_type=AssetType.CONDITIONAL, token_id=token_id))
+        return float(bal_resp.get('balance', '0')) / (10 ** 6)
+    except cffi_requests.RequestsError as e:
+        logger.warning("balance-allowance %s failed (status %s): %s", token_id, getattr(e.response, "status_code", None), e)
+        return 0
+    except (ValueError, KeyError) as e:
+        logger.warning("balance-allowance %s unparseable: %s", token_id, e)
+        return 0
+
+async def main():
     print("\nProcessing Financial Data...\n")
 
-    # 1. LIQUIDITY (CHAIN)
     w3 = Web3(Web3.HTTPProvider(RPC_URL))
-    matic_bal = w3.from_wei(w3.eth.get_balance(MAKER_ADDRESS), 'ether')
-    
-    abi = [{"constant":True,"inputs":[{"name":"_owner","type":"address"}],"name":"balanceOf","outputs":[{"name":"balance","type":"uint256"}],"type":"function"},{"constant":True,"inputs":[],"name":"decimals","outputs":[{"name":"","type":"uint8"}],"type":"function"}]
-    
-    usdc_ct = w3.eth.contract(address=USDC_ADDRESS, abi=abi)
-    usdc_bal = usdc_ct.functions.balanceOf(MAKER_ADDRESS).call() / (10 ** 6)
 
-    native_ct = w3.eth.contract(address=Web3.to_checksum_address(NATIVE_USDC), abi=abi)
-    native_bal = native_ct.functions.balanceOf(MAKER_ADDRESS).call() / (10 ** 6)
-
-    # 2. INVENTORY (API)
     pk = os.getenv("POLYMARKET_PRIVATE_KEY")
     creds = ApiCreds(api_key=os.getenv("CLOB_API_KEY"), api_secret=os.getenv("CLOB_SECRET"), api_passphrase=os.getenv("CLOB_PASSPHRASE"))
     client = ClobClient(host="https://clob.polymarket.com", key=pk, chain_id=POLYGON, creds=creds, signature_type=0, funder=MAKER_ADDRESS)
 
     # Hardcoded target for MVP speed, ideally fetch all
     target_token = "65596524896985010415844814777069255362767748488616308434723608750130614059462"
-    pos_shares = 0
-    try:
-        bal_resp = client.get_balance_allowance(BalanceAllowanceParams(asset_type=AssetType.CONDITIONAL, token_id=target_token))
-        pos_shares = float(bal_resp.get('balance', '0')) / (10 ** 6)
-    except: pass
 
-    current_price = get_market_midpoint(client, target_token)
+    # 1. LIQUIDITY (CHAIN) + 2. INVENTORY (API) — independent I/O, fetched concurrently
+    (matic_bal, usdc_bal, native_bal), pol_price, pos_shares, current_price = await asyncio.gather(
+        asyncio.to_thread(get_chain_balances, w3),
+        asyncio.to_thread(get_pol_price, w3),
+        asyncio.to_thread(get_position_shares, client, target_token),
+        asyncio.to_thread(get_market_midpoint, client, target_token),
+    )
     pos_value = pos_shares * current_price
     
     # 3. ANALYSIS
     liq_status = "🟢 HEALTHY" if usdc_bal >= 5.0 else "🔴 LOW FUNDS (<$5.00)"
     runway = math.floor(float(matic_bal) / GAS_COST_PER_TRADE)
-    net_worth = usdc_bal + (float(matic_bal) * 0.85) + pos_value # Approx POL=$0.85
+    pol_value = float(matic_bal) * pol_price
+    net_worth = usdc_bal + pol_value + pos_value
 
     # 4. REPORT
     print("┌────────────────────────────────────────────────────────┐")
@@ -94,7 +162,7 @@ def main():
     print(f" • Native USDC      : ${native_bal:.2f}  (Stuck Funds)")
     
     print("\n2️⃣  OPERATIONS (Gas)")
-    print(f" • POL Balance      : {matic_bal:.4f} POL")
+    print(f" • POL Balance      : {matic_bal:.4f} POL (${pol_value:.2f} @ ${pol_price:.3f})")
     print(f" • Est. Runway      : ~{runway} Trades (@ {GAS_COST_PER_TRADE} POL/tx)")
     
     print("\n3️⃣  INVENTORY (Positions)")
@@ -114,4 +182,4 @@ def main():
     print("══════════════════════════════════════════════════════════\n")
 
 if __name__ == "__main__":
-    main()
+    asyncio.run(main())
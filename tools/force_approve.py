@@ -4,6 +4,8 @@ import sys
 import time
 from web3 import Web3
 from dotenv import load_dotenv
+from _abis import erc20, approve_calldata
+from _nonce import send_with_nonce_lock
 
 load_dotenv("/app/hft/.env")
 
@@ -20,37 +22,6 @@ RPC_URLS = [
     "https://polygon-rpc.com" 
 ]
 
-# ABI for ERC20 Approve and Allowance
-ERC20_ABI = [
-    {
-        "constant": False,
-        "inputs": [
-            {"name": "_spender", "type": "address"},
-            {"name": "_value", "type": "uint256"}
-        ],
-        "name": "approve",
-        "outputs": [{"name": "", "type": "bool"}],
-        "type": "function"
-    },
-    {
-        "constant": True,
-        "inputs": [
-            {"name": "_owner", "type": "address"},
-            {"name": "_spender", "type": "address"}
-        ],
-        "name": "allowance",
-        "outputs": [{"name": "", "type": "uint256"}],
-        "type": "function"
-    },
-    {
-        "constant": True,
-        "inputs": [{"name": "_owner", "type": "address"}],
-        "name": "balanceOf",
-        "outputs": [{"name": "balance", "type": "uint256"}],
-        "type": "function"
-    }
-]
-
 def connect_web3():
     for url in RPC_URLS:
         try:
@@ -81,7 +52,7 @@ def main():
     print(f"[APPROVE] Wallet: {my_address}")
     
     # Initialize Contract
-    token_contract = w3.eth.contract(address=TOKEN_ADDRESS, abi=ERC20_ABI)
+    token_contract = erc20(w3, TOKEN_ADDRESS)
     
     # Check Balance
     try:
@@ -107,31 +78,30 @@ def main():
     print("[ACTION] Approving Max Uint256...")
     max_amount = 2**256 - 1
     
-    # Get nonce
-    nonce = w3.eth.get_transaction_count(my_address)
-    
     # Build txn
     print(f"[GAS] Base Price: {w3.eth.gas_price}")
     boosted_gas = int(w3.eth.gas_price * 2.0)
     print(f"[GAS] Boosted Price: {boosted_gas}")
     
-    tx = token_contract.functions.approve(SPENDER_ADDRESS, max_amount).build_transaction({
-        'chainId': 137, # Polygon Mainnet
-        'gas': 150000,
-        'gasPrice': boosted_gas,
-        'nonce': nonce,
-    })
-    
-    # Sign txn
-    signed_tx = w3.eth.account.sign_transaction(tx, private_key)
-    
-    # Send txn
-    try:
+    def sign_and_send(nonce):
+        tx = {
+            'to': TOKEN_ADDRESS,
+            'data': approve_calldata(SPENDER_ADDRESS, max_amount),
+            'value': 0,
+            'chainId': 137, # Polygon Mainnet
+            'gas': 150000,
+            'gasPrice': boosted_gas,
+            'nonce': nonce,
+        }
+        signed_tx = w3.eth.account.sign_transaction(tx, private_key)
         raw_tx = getattr(signed_tx, 'rawTransaction', None) or getattr(signed_tx, 'raw_transaction', None)
         if not raw_tx:
             raise ValueError("Could not find rawTransaction or raw_transaction on signed object")
-            
-        tx_hash = w3.eth.send_raw_transaction(raw_tx)
+        return w3.eth.send_raw_transaction(raw_tx)
+    
+    # Sign + send with the node's pending nonce under the wallet lock (resyncs on "nonce too low")
+    try:
+        tx_hash = send_with_nonce_lock(w3, my_address, 137, sign_and_send)
         print(f"[BROADCAST] Tx Hash: {w3.to_hex(tx_hash)}")
     except Exception as e:
         print(f"[ERROR] Failed to broadcast transaction: {e}")
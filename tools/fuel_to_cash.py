@@ -2,14 +2,20 @@
 """
 FUEL TO CASH: Convert POL (gas) to USDC.e (trading capital)
 Safety: Gets quote first, aborts if slippage > 3%
+
+Usage:
+    python3 tools/fuel_to_cash.py           # convert 50 POL
+    python3 tools/fuel_to_cash.py --quote   # price only, no wallet needed
 """
 import os
+import sys
 import time
-import json
+import functools
 from web3 import Web3
-from web3.middleware import ExtraDataToPOAMiddleware
 from eth_account import Account
 from dotenv import dotenv_values
+from _abis import erc20
+from _rpc import batch_rpc, eth_call, decode_uint, make_w3, pooled_session
 
 # Load from explicit path
 config = dotenv_values("/app/hft/.env")
@@ -22,193 +28,258 @@ UNISWAP_ROUTER = "0xE592427A0AEce92De3Edee1F18E0157C05861564"  # SwapRouter (V3)
 UNISWAP_QUOTER = "0xb27308f9F90D607463bb33eA1BeBb41C27CE5AB6"  # Quoter V1
 POLYMARKET_EXCHANGE = "0x4bFb41d5B3570DeFd03C39a9A4D8dE6Bd8B8982E"
 
-# ABIs
-WMATIC_ABI = json.loads('[{"constant":false,"inputs":[],"name":"deposit","outputs":[],"payable":true,"stateMutability":"payable","type":"function"},{"constant":false,"inputs":[{"name":"guy","type":"address"},{"name":"wad","type":"uint256"}],"name":"approve","outputs":[{"name":"","type":"bool"}],"type":"function"},{"constant":true,"inputs":[{"name":"","type":"address"}],"name":"balanceOf","outputs":[{"name":"","type":"uint256"}],"type":"function"}]')
-
-QUOTER_ABI = json.loads('[{"inputs":[{"internalType":"address","name":"tokenIn","type":"address"},{"internalType":"address","name":"tokenOut","type":"address"},{"internalType":"uint24","name":"fee","type":"uint24"},{"internalType":"uint256","name":"amountIn","type":"uint256"},{"internalType":"uint160","name":"sqrtPriceLimitX96","type":"uint160"}],"name":"quoteExactInputSingle","outputs":[{"internalType":"uint256","name":"amountOut","type":"uint256"}],"stateMutability":"nonpayable","type":"function"}]')
-
-ROUTER_ABI = json.loads('[{"inputs":[{"components":[{"internalType":"address","name":"tokenIn","type":"address"},{"internalType":"address","name":"tokenOut","type":"address"},{"internalType":"uint24","name":"fee","type":"uint24"},{"internalType":"address","name":"recipient","type":"address"},{"internalType":"uint256","name":"deadline","type":"uint256"},{"internalType":"uint256","name":"amountIn","type":"uint256"},{"internalType":"uint256","name":"amountOutMinimum","type":"uint256"},{"internalType":"uint160","name":"sqrtPriceLimitX96","type":"uint160"}],"internalType":"struct ISwapRouter.ExactInputSingleParams","name":"params","type":"tuple"}],"name":"exactInputSingle","outputs":[{"internalType":"uint256","name":"amountOut","type":"uint256"}],"stateMutability":"payable","type":"function"}]')
-
-ERC20_ABI = json.loads('[{"constant":false,"inputs":[{"name":"_spender","type":"address"},{"name":"_value","type":"uint256"}],"name":"approve","outputs":[{"name":"","type":"bool"}],"type":"function"},{"constant":true,"inputs":[{"name":"_owner","type":"address"}],"name":"balanceOf","outputs":[{"name":"balance","type":"uint256"}],"type":"function"},{"constant":true,"inputs":[{"name":"owner","type":"address"},{"name":"spender","type":"address"}],"name":"allowance","outputs":[{"name":"","type":"uint256"}],"type":"function"}]')
-
-def convert_fuel():
-    # Setup Web3
-    w3 = Web3(Web3.HTTPProvider(RPC_URL))
-    w3.middleware_onion.inject(ExtraDataToPOAMiddleware, layer=0)
-
-    if not w3.is_connected():
-        print("[ERROR] Cannot connect to Polygon RPC")
-        return
-
-    pk = config.get("POLYMARKET_PRIVATE_KEY")
-    if not pk:
-        print("[ERROR] POLYMARKET_PRIVATE_KEY not found")
-        return
-
-    account = Account.from_key(pk)
-    my_addr = account.address
-
-    print(f"[FUEL->CASH] Starting conversion for: {my_addr}")
-
-    # 1. Check POL Balance
-    pol_balance = w3.eth.get_balance(my_addr)
-    pol_readable = pol_balance / 1e18
-    print(f"[BALANCE] POL (Gas): {pol_readable:.4f}")
-
-    # We want to swap 50 POL but keep at least 5 for gas
-    swap_amount_pol = 50
-    min_remaining = 5
-
-    if pol_readable < (swap_amount_pol + min_remaining):
-        print(f"[ERROR] Not enough POL. Need {swap_amount_pol + min_remaining}, have {pol_readable:.2f}")
-        return
-
-    amount_to_swap = w3.to_wei(swap_amount_pol, 'ether')
-    print(f"[SWAP] Will convert {swap_amount_pol} POL to USDC.e")
-
-    # 2. Get Quote First (Safety Check)
-    print("[QUOTE] Getting Uniswap quote...")
-    quoter = w3.eth.contract(address=Web3.to_checksum_address(UNISWAP_QUOTER), abi=QUOTER_ABI)
+# Checksummed once at import (to_checksum_address costs a keccak each call)
+WMATIC = Web3.to_checksum_address(WMATIC_ADDR)
+USDC_E = Web3.to_checksum_address(USDC_E_ADDR)
+ROUTER = Web3.to_checksum_address(UNISWAP_ROUTER)
+QUOTER = Web3.to_checksum_address(UNISWAP_QUOTER)
+PM_EXCHANGE = Web3.to_checksum_address(POLYMARKET_EXCHANGE)
 
+# ABIs
+WMATIC_ABI = [
+    {"constant": False, "inputs": [], "name": "deposit", "outputs": [], "payable": True, "stateMutability": "payable", "type": "function"},
+    {"constant": False, "inputs": [{"name": "guy", "type": "address"}, {"name": "wad", "type": "uint256"}], "name": "approve", "outputs": [{"name": "", "type": "bool"}], "type": "function"},
+    {"constant": True, "inputs": [{"name": "", "type": "address"}], "name": "balanceOf", "outputs": [{"name": "", "type": "uint256"}], "type": "function"},
+]
+
+QUOTER_ABI = [
+    {"inputs": [{"internalType": "address", "name": "tokenIn", "type": "address"}, {"internalType": "address", "name": "tokenOut", "type": "address"}, {"internalType": "uint24", "name": "fee", "type": "uint24"}, {"internalType": "uint256", "name": "amountIn", "type": "uint256"}, {"internalType": "uint160", "name": "sqrtPriceLimitX96", "type": "uint160"}], "name": "quoteExactInputSingle", "outputs": [{"internalType": "uint256", "name": "amountOut", "type": "uint256"}], "stateMutability": "nonpayable", "type": "function"},
+]
+
+ROUTER_ABI = [
+    {"inputs": [{"components": [{"internalType": "address", "name": "tokenIn", "type": "address"}, {"internalType": "address", "name": "tokenOut", "type": "address"}, {"internalType": "uint24", "name": "fee", "type": "uint24"}, {"internalType": "address", "name": "recipient", "type": "address"}, {"internalType": "uint256", "name": "deadline", "type": "uint256"}, {"internalType": "uint256", "name": "amountIn", "type": "uint256"}, {"internalType": "uint256", "name": "amountOutMinimum", "type": "uint256"}, {"internalType": "uint160", "name": "sqrtPriceLimitX96", "type": "uint160"}], "internalType": "struct ISwapRouter.ExactInputSingleParams", "name": "params", "type": "tuple"}], "name": "exactInputSingle", "outputs": [{"internalType": "uint256", "name": "amountOut", "type": "uint256"}], "stateMutability": "payable", "type": "function"},
+]
+
+FEE_TIERS = [500, 3000, 10000]  # 0.05%, 0.3%, 1%
+
+# One keep-alive pool for both the Web3 provider and the raw batches
+SESSION = pooled_session()
+
+_ABIS = {WMATIC: WMATIC_ABI, QUOTER: QUOTER_ABI, ROUTER: ROUTER_ABI}
+
+@functools.lru_cache(maxsize=8)
+def _contract(w3, address):
+    """Contract objects are reused across quote/swap calls on the same w3."""
+    return w3.eth.contract(address=address, abi=_ABIS[address])
+
+def quote_calls(w3, amount):
+    """Pre-encoded quoteExactInputSingle eth_calls (WMATIC -> USDC.e), one per fee tier."""
+    quoter = _contract(w3, QUOTER)
+    return [
+        eth_call(QUOTER, quoter.encode_abi("quoteExactInputSingle", args=[
+            WMATIC,
+            USDC_E,
+            fee,
+            amount,
+            0
+        ]))
+        for fee in FEE_TIERS
+    ]
+
+def pick_best_quote(results):
+    """(best_fee, amount_out) from quote_calls results; (None, None) if every tier failed."""
     quote_out = None
     best_fee = None
 
-    for fee in [500, 3000, 10000]:  # 0.05%, 0.3%, 1%
-        try:
-            quote = quoter.functions.quoteExactInputSingle(
-                Web3.to_checksum_address(WMATIC_ADDR),
-                Web3.to_checksum_address(USDC_E_ADDR),
-                fee,
-                amount_to_swap,
-                0
-            ).call()
-            quote_usd = quote / 1e6
-            print(f"[QUOTE] Fee {fee/10000}%: ${quote_usd:.4f} USDC.e")
-
-            if quote_out is None or quote > quote_out:
-                quote_out = quote
-                best_fee = fee
-        except Exception as e:
-            print(f"[QUOTE] Fee {fee/10000}% failed: {e}")
+    for fee, result in zip(FEE_TIERS, results):
+        quote = decode_uint(result)
+        if quote is None:
+            print(f"[QUOTE] Fee {fee/10000}% failed: no pool / reverted")
+            continue
+        quote_usd = quote / 1e6
+        print(f"[QUOTE] Fee {fee/10000}%: ${quote_usd:.4f} USDC.e")
 
-    if quote_out is None:
-        print("[ERROR] Could not get quote from Uniswap")
-        return
+        if quote_out is None or quote > quote_out:
+            quote_out = quote
+            best_fee = fee
 
-    expected_usd = quote_out / 1e6
-    # POL is around $0.25-0.30 typically, so 50 POL ~ $12-15
-    # If we get less than $10 for 50 POL, something is wrong
-    if expected_usd < 10:
-        print(f"[WARNING] Quote seems low: ${expected_usd:.2f} for 50 POL")
-        print("[WARNING] Proceeding anyway as POL price may have dropped")
+    return best_fee, quote_out
 
-    print(f"[QUOTE] Best: ${expected_usd:.4f} USDC.e (fee {best_fee/10000}%)")
+def get_best_quote(w3, amount):
+    """Pricing only: one batched round-trip, never builds or signs a transaction."""
+    return pick_best_quote(batch_rpc(RPC_URL, quote_calls(w3, amount), session=SESSION))
 
-    # Set minimum with 3% tolerance
-    min_out = int(quote_out * 0.97)
-    print(f"[MIN_OUT] Will accept minimum: ${min_out / 1e6:.4f}")
+def execute_swap(w3, account, fee, amount, min_out, nonce, gas_price):
+    """Wrap -> approve router -> exactInputSingle. Returns the next nonce, or None on failure."""
+    my_addr = account.address
 
     # 3. Wrap POL -> WMATIC
     print("[WRAP] Step 1/4: Wrapping POL to WMATIC...")
-    wmatic = w3.eth.contract(address=Web3.to_checksum_address(WMATIC_ADDR), abi=WMATIC_ABI)
+    wmatic = _contract(w3, WMATIC)
 
     wrap_tx = wmatic.functions.deposit().build_transaction({
         'from': my_addr,
-        'nonce': w3.eth.get_transaction_count(my_addr),
+        'nonce': nonce,
         'gas': 100000,
-        'gasPrice': w3.eth.gas_price,
-        'value': amount_to_swap
+        'gasPrice': gas_price,
+        'value': amount
     })
 
     signed_wrap = account.sign_transaction(wrap_tx)
     wrap_hash = w3.eth.send_raw_transaction(signed_wrap.raw_transaction)
+    nonce += 1
     print(f"[WRAP] TX: {wrap_hash.hex()}")
 
     receipt = w3.eth.wait_for_transaction_receipt(wrap_hash, timeout=120)
     if receipt['status'] != 1:
         print("[ERROR] Wrap failed!")
-        return
+        return None
     print("[WRAP] Success!")
 
     # 4. Approve Router
     print("[APPROVE] Step 2/4: Approving Uniswap Router...")
     approve_tx = wmatic.functions.approve(
-        Web3.to_checksum_address(UNISWAP_ROUTER),
-        amount_to_swap
+        ROUTER,
+        amount
     ).build_transaction({
         'from': my_addr,
-        'nonce': w3.eth.get_transaction_count(my_addr),
+        'nonce': nonce,
         'gas': 100000,
-        'gasPrice': w3.eth.gas_price
+        'gasPrice': gas_price
     })
 
     signed_approve = account.sign_transaction(approve_tx)
     approve_hash = w3.eth.send_raw_transaction(signed_approve.raw_transaction)
+    nonce += 1
     print(f"[APPROVE] TX: {approve_hash.hex()}")
-
-    receipt = w3.eth.wait_for_transaction_receipt(approve_hash, timeout=120)
-    if receipt['status'] != 1:
-        print("[ERROR] Approval failed!")
-        return
-    print("[APPROVE] Success!")
+    # No wait here: the swap below uses nonce+1, so the node can't mine it
+    # before the approve. Saves one block confirmation.
 
     # 5. Execute Swap
     print("[SWAP] Step 3/4: Swapping WMATIC -> USDC.e...")
-    router = w3.eth.contract(address=Web3.to_checksum_address(UNISWAP_ROUTER), abi=ROUTER_ABI)
+    router = _contract(w3, ROUTER)
 
     params = (
-        Web3.to_checksum_address(WMATIC_ADDR),   # tokenIn
-        Web3.to_checksum_address(USDC_E_ADDR),   # tokenOut
-        best_fee,                                  # fee
+        WMATIC,                                    # tokenIn
+        USDC_E,                                    # tokenOut
+        fee,                                       # fee
         my_addr,                                   # recipient
         int(time.time()) + 300,                    # deadline (5 min)
-        amount_to_swap,                            # amountIn
+        amount,                                    # amountIn
         min_out,                                   # amountOutMinimum
         0                                          # sqrtPriceLimitX96
     )
 
     swap_tx = router.functions.exactInputSingle(params).build_transaction({
         'from': my_addr,
-        'nonce': w3.eth.get_transaction_count(my_addr),
+        'nonce': nonce,
         'gas': 300000,
-        'gasPrice': int(w3.eth.gas_price * 1.2),  # 20% boost
+        'gasPrice': int(gas_price * 1.2),  # 20% boost
         'value': 0
     })
 
     signed_swap = account.sign_transaction(swap_tx)
     swap_hash = w3.eth.send_raw_transaction(signed_swap.raw_transaction)
+    nonce += 1
     print(f"[SWAP] TX: {swap_hash.hex()}")
     print("[SWAP] Waiting for confirmation...")
 
     receipt = w3.eth.wait_for_transaction_receipt(swap_hash, timeout=180)
 
     if receipt['status'] != 1:
+        # Find out whether the approve was the actual cause
+        approve_receipt = w3.eth.wait_for_transaction_receipt(approve_hash, timeout=120)
+        if approve_receipt['status'] != 1:
+            print("[ERROR] Approval failed!")
         print("[ERROR] Swap failed!")
         print(f"Receipt: {receipt}")
-        return
+        return None
 
+    print("[APPROVE] Success!")
     print("[SWAP] Success!")
+    return nonce
+
+def convert_fuel():
+    # Setup Web3
+    w3 = make_w3(RPC_URL, SESSION, poa=True)
+
+    if not w3.is_connected():
+        print("[ERROR] Cannot connect to Polygon RPC")
+        return
+
+    pk = config.get("POLYMARKET_PRIVATE_KEY")
+    if not pk:
+        print("[ERROR] POLYMARKET_PRIVATE_KEY not found")
+        return
+
+    account = Account.from_key(pk)
+    my_addr = account.address
+
+    print(f"[FUEL->CASH] Starting conversion for: {my_addr}")
+
+    # We want to swap 50 POL but keep at least 5 for gas
+    swap_amount_pol = 50
+    min_remaining = 5
+    amount_to_swap = w3.to_wei(swap_amount_pol, 'ether')
+
+    # 1+2. POL balance, starting nonce, gas price and the Uniswap quotes in one batched round-trip
+    pol_balance, nonce, gas_price, *quote_results = batch_rpc(RPC_URL, [
+        ("eth_getBalance", [my_addr, "latest"]),
+        ("eth_getTransactionCount", [my_addr, "pending"]),
+        ("eth_gasPrice", []),
+    ] + quote_calls(w3, amount_to_swap), session=SESSION)
+    pol_balance = decode_uint(pol_balance)
+    # We are the only sender: increment locally after each broadcast
+    nonce = decode_uint(nonce)
+    # Snapshot once: Polygon gas barely moves over this ~30s sequence
+    gas_price = decode_uint(gas_price)
+    pol_readable = pol_balance / 1e18
+    print(f"[BALANCE] POL (Gas): {pol_readable:.4f}")
+
+    if pol_readable < (swap_amount_pol + min_remaining):
+        print(f"[ERROR] Not enough POL. Need {swap_amount_pol + min_remaining}, have {pol_readable:.2f}")
+        return
+
+    print(f"[SWAP] Will convert {swap_amount_pol} POL to USDC.e")
+
+    # 2. Get Quote First (Safety Check)
+    print("[QUOTE] Getting Uniswap quote...")
+    best_fee, quote_out = pick_best_quote(quote_results)
+
+    if quote_out is None:
+        print("[ERROR] Could not get quote from Uniswap")
+        return
+
+    expected_usd = quote_out / 1e6
+    # POL is around $0.25-0.30 typically, so 50 POL ~ $12-15
+    # If we get less than $10 for 50 POL, something is wrong
+    if expected_usd < 10:
+        print(f"[WARNING] Quote seems low: ${expected_usd:.2f} for 50 POL")
+        print("[WARNING] Proceeding anyway as POL price may have dropped")
+
+    print(f"[QUOTE] Best: ${expected_usd:.4f} USDC.e (fee {best_fee/10000}%)")
+
+    # Set minimum with 3% tolerance
+    min_out = int(quote_out * 0.97)
+    print(f"[MIN_OUT] Will accept minimum: ${min_out / 1e6:.4f}")
+
+    nonce = execute_swap(w3, account, best_fee, amount_to_swap, min_out, nonce, gas_price)
+    if nonce is None:
+        return
 
     # 6. Approve USDC.e to Polymarket Exchange (if needed)
     print("[APPROVE] Step 4/4: Ensuring USDC.e approved to Polymarket...")
-    usdc_e = w3.eth.contract(address=Web3.to_checksum_address(USDC_E_ADDR), abi=ERC20_ABI)
+    usdc_e = erc20(w3, USDC_E)
 
-    new_balance = usdc_e.functions.balanceOf(my_addr).call()
-    current_allowance = usdc_e.functions.allowance(my_addr, POLYMARKET_EXCHANGE).call()
+    new_balance, current_allowance = map(decode_uint, batch_rpc(RPC_URL, [
+        eth_call(usdc_e.address, usdc_e.encode_abi("balanceOf", args=[my_addr])),
+        eth_call(usdc_e.address, usdc_e.encode_abi("allowance", args=[my_addr, PM_EXCHANGE])),
+    ], session=SESSION))
 
     if current_allowance < new_balance:
         approve_pm_tx = usdc_e.functions.approve(
-            Web3.to_checksum_address(POLYMARKET_EXCHANGE),
+            PM_EXCHANGE,
             2**256 - 1  # Max approval
         ).build_transaction({
             'from': my_addr,
-            'nonce': w3.eth.get_transaction_count(my_addr),
+            'nonce': nonce,
             'gas': 100000,
-            'gasPrice': w3.eth.gas_price
+            'gasPrice': gas_price
         })
 
         signed_pm = account.sign_transaction(approve_pm_tx)
         pm_hash = w3.eth.send_raw_transaction(signed_pm.raw_transaction)
+        nonce += 1
         print(f"[APPROVE] TX: {pm_hash.hex()}")
 
         receipt = w3.eth.wait_for_transaction_receipt(pm_hash, timeout=120)
@@ -220,8 +291,12 @@ def convert_fuel():
         print("[APPROVE] Already approved to Polymarket")
 
     # Final Status
-    final_usdc = usdc_e.functions.balanceOf(my_addr).call() / 1e6
-    final_pol = w3.eth.get_balance(my_addr) / 1e18
+    final_usdc, final_pol = map(decode_uint, batch_rpc(RPC_URL, [
+        eth_call(usdc_e.address, usdc_e.encode_abi("balanceOf", args=[my_addr])),
+        ("eth_getBalance", [my_addr, "latest"]),
+    ], session=SESSION))
+    final_usdc /= 1e6
+    final_pol /= 1e18
 
     print("")
     print("=" * 50)
@@ -233,5 +308,17 @@ def convert_fuel():
     print("Bot is now funded and ready to trade!")
     print("=" * 50)
 
+def print_quote():
+    """--quote: price 50 POL -> USDC.e without touching the wallet."""
+    w3 = make_w3(RPC_URL, SESSION)
+    best_fee, quote_out = get_best_quote(w3, w3.to_wei(50, 'ether'))
+    if quote_out is None:
+        print("[ERROR] Could not get quote from Uniswap")
+        return
+    print(f"[QUOTE] Best: ${quote_out / 1e6:.4f} USDC.e (fee {best_fee/10000}%)")
+
 if __name__ == "__main__":
-    convert_fuel()
+    if "--quote" in sys.argv:
+        print_quote()
+    else:
+        convert_fuel()
@@ -1,12 +1,76 @@
+import json
 import requests
+from _fastjson import loads
 
 SLUG = "what-price-will-bitcoin-hit-in-january-2026"
 URL = f"https://gamma-api.polymarket.com/events?slug={SLUG}"
 
-try:
-    r = requests.get(URL)
+# Keep-alive session + conditional GET: reruns get a bodiless 304 when unchanged
+SESSION = requests.Session()
+CACHE_FILE = "/tmp/gamma_target_cache.json"
+
+def fetch_event(url):
+    cached = None
+    try:
+        with open(CACHE_FILE) as f:
+            cached = json.load(f)
+        if cached.get("url") != url:
+            cached = None
+    except (OSError, ValueError):
+        pass
+
+    headers = {}
+    if cached:
+        if cached.get("etag"):
+            headers["If-None-Match"] = cached["etag"]
+        if cached.get("last_modified"):
+            headers["If-Modified-Since"] = cached["last_modified"]
+
+    r = SESSION.get(url, headers=headers, timeout=15)
+    if r.status_code == 304 and cached:
+        return cached["payload"]
     r.raise_for_status()
-    data = r.json()
+    data = loads(r.content)
+
+    if r.headers.get("ETag") or r.headers.get("Last-Modified"):
+        try:
+            with open(CACHE_FILE, "w") as f:
+                json.dump({
+                    "url": url,
+                    "etag": r.headers.get("ETag"),
+                    "last_modified": r.headers.get("Last-Modified"),
+                    "payload": data,
+                }, f)
+        except OSError:
+            pass
+    return data
+
+def _parse_ids(raw_ids):
+    """Gamma's JSON-encoded clobTokenIds -> list, or None if missing/empty/garbled."""
+    if isinstance(raw_ids, list):
+        return raw_ids or None
+    if not isinstance(raw_ids, (str, bytes)) or not raw_ids:
+        return None
+    try:
+        return loads(raw_ids) or None
+    except ValueError:
+        return None
+
+def rank_markets(markets):
+    """(question, volume, bid, ask, spread, token_id) rows, highest volume first."""
+    rows = []
+    for m in markets:
+        ids = _parse_ids(m.get('clobTokenIds'))
+        if not ids:
+            continue
+        bid = float(m.get('bestBid', 0) or 0) # Handle None/Empty strings safely
+        ask = float(m.get('bestAsk', 0) or 0)
+        rows.append((m.get('question'), float(m.get('volume', 0) or 0), bid, ask, ask - bid, ids[0]))
+    rows.sort(key=lambda r: r[1], reverse=True)
+    return rows
+
+try:
+    data = fetch_event(URL)
     
     if not data:
         print("No event found.")
@@ -19,37 +83,12 @@ try:
         print("No markets in event.")
         exit(1)
         
-    # Find active markets with clobTokenIds
-    import json
-    valid = []
-    for m in markets:
-        raw_ids = m.get('clobTokenIds')
-        if raw_ids:
-            try:
-                ids = json.loads(raw_ids)
-                if ids:
-                    m['parsed_ids'] = ids
-                    valid.append(m)
-            except:
-                pass
-    
-    # Remove specific filtering to see ALL options using the loop above
-    
-    # Sort by volume descending
-    valid.sort(key=lambda x: float(x.get('volume', 0)), reverse=True)
+    # Find active markets with clobTokenIds, sorted by volume descending
+    valid = rank_markets(markets)
     
     print(f"{'QUESTION':<50} | {'VOL':<10} | {'BID':<5} | {'ASK':<5} | {'SPREAD':<6} | {'ID'}")
     print("-" * 130)
-    for m in valid:
-        q = m.get('question')
-        v = float(m.get('volume', 0))
-        id_ = m.get('parsed_ids')[0]
-        
-        # Gamma API output usually has 'bestBid'/'bestAsk' string or numeric
-        bid = float(m.get('bestBid', 0) or 0) # Handle None/Empty strings safely
-        ask = float(m.get('bestAsk', 0) or 0)
-        spread = ask - bid
-        
+    for q, v, bid, ask, spread, id_ in valid:
         print(f"{q:<50} | ${v/1e6:,.1f}M | {bid:<5.2f} | {ask:<5.2f} | {spread:<6.2f} | {id_}")
     
 except Exception as e:
@@ -1,5 +1,6 @@
 from py_clob_client.client import ClobClient
 import os
+from functools import reduce
 from dotenv import load_dotenv
 
 load_dotenv("/app/hft/.env")
@@ -10,12 +11,17 @@ chain_id = 137
 
 client = ClobClient(host, key=key, chain_id=chain_id, signature_type=1)
 
-print("Client attributes:", dir(client))
+# Full attribute dump is noisy; opt in with INSPECT_VERBOSE=1
+if os.getenv("INSPECT_VERBOSE"):
+    print("Client attributes:", dir(client))
 
 # diligent search for session or http client
-if hasattr(client, "session"):
-    print("Found client.session:", client.session.headers)
-elif hasattr(client, "http_client"):
-    print("Found client.http_client:", dir(client.http_client))
-    if hasattr(client.http_client, "session"):
-        print("Found client.http_client.session:", client.http_client.session.headers)
+for path in ("session", "http_client.session"):
+    try:
+        session = reduce(getattr, path.split("."), client)
+    except AttributeError:
+        continue
+    print(f"Found client.{path}:", session.headers)
+    break
+else:
+    print("No session found on client")
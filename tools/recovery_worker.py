@@ -1,10 +1,11 @@
 import os
 import time
 import json
+import asyncio
 import logging
 from dotenv import load_dotenv
 from py_clob_client.client import ClobClient
-from py_clob_client.clob_types import OrderArgs
+from py_clob_client.clob_types import OrderArgs, OpenOrderParams
 # from py_clob_client.clob_types import OrderType
 
 class OrderType:
@@ -22,6 +23,13 @@ import json
 import py_clob_client.http_helpers.helpers as _clob_helpers
 from curl_cffi import requests as cffi_requests
 from py_clob_client.exceptions import PolyApiException
+from _fastjson import loads
+
+try:
+    import websockets
+    WS_AVAILABLE = True
+except ImportError:
+    WS_AVAILABLE = False
 
 # --- CLOUDFLARE BYPASS PATCH (CHAMELEON PROTOCOL V2) ---
 # Hardcoded Proxy to avoid import issues if core not in path
@@ -30,27 +38,23 @@ SYS_PROXIES = {"https": PROXY_URL, "http": PROXY_URL}
 
 _cffi_session = cffi_requests.Session(impersonate="chrome110", proxies=SYS_PROXIES)
 
+DEFAULT_HEADERS = {
+    "Content-Type": "application/json",
+    "Referer": "https://polymarket.com/",
+    "Origin": "https://polymarket.com"
+}
+
 def _cffi_request(endpoint: str, method: str, headers=None, data=None):
     """Replacement request function using curl_cffi for TLS spoofing."""
-    final_headers = {
-        "Content-Type": "application/json",
-        "Referer": "https://polymarket.com/",
-        "Origin": "https://polymarket.com"
-    }
-
-    if headers:
-        final_headers.update(headers)
+    final_headers = {**DEFAULT_HEADERS, **headers} if headers else DEFAULT_HEADERS
 
     try:
         if method == "GET":
             resp = _cffi_session.get(endpoint, headers=final_headers, timeout=30)
         elif method == "POST":
+            # py_clob_client pre-serializes order bodies; send them as-is
             if isinstance(data, str):
-                try:
-                    json_data = json.loads(data)
-                    resp = _cffi_session.post(endpoint, headers=final_headers, json=json_data, timeout=30)
-                except:
-                    resp = _cffi_session.post(endpoint, headers=final_headers, data=data, timeout=30)
+                resp = _cffi_session.post(endpoint, headers=final_headers, data=data, timeout=30)
             else:
                 resp = _cffi_session.post(endpoint, headers=final_headers, json=data, timeout=30)
         elif method == "DELETE":
@@ -71,7 +75,7 @@ def _cffi_request(endpoint: str, method: str, headers=None, data=None):
             raise PolyApiException(MockResp(resp.status_code, resp.text))
 
         try:
-            return resp.json()
+            return loads(resp.content)
         except ValueError:
             return resp.text
             
@@ -88,6 +92,10 @@ load_dotenv("/app/hft/.env")
 KEY = os.getenv("POLYMARKET_PRIVATE_KEY")
 HOST = "https://clob.polymarket.com"
 CHAIN_ID = 137
+WS_USER_URL = "wss://ws-subscriptions-clob.polymarket.com/ws/user"
+ORDER_SIZE = 5.0
+# With the user channel pushing fills, HTTP is only a periodic reconcile
+WS_RECONCILE_SECS = 60
 
 if not KEY:
     print("❌ KEYS MISSING")
@@ -96,6 +104,87 @@ if not KEY:
 logging.basicConfig(level=logging.INFO, format='[RECOVERY] %(message)s')
 logger = logging.getLogger("recovery")
 
+def check_fill_http(client, order_id):
+    """One get_order poll: True if filled, False if cancelled, None if still open."""
+    o_status = client.get_order(order_id)
+    # Usually 'size_matched' vs 'original_size'.
+    matched = float(o_status.get('size_matched', 0))
+    if matched >= ORDER_SIZE:
+        return True
+    if o_status.get('status') == 'canceled':
+        return False
+    return None
+
+def poll_fill_http(client, order_id):
+    """Legacy 10s polling loop (used when the websocket is unavailable)."""
+    while True:
+        time.sleep(10)
+        try:
+            result = check_fill_http(client, order_id)
+            if result is not None:
+                return result
+        except Exception as e_stat:
+            logger.warning(f"Status check error: {e_stat}")
+            time.sleep(10)
+
+async def wait_fill_ws(client, order_id):
+    """
+    Wait for order_id on the CLOB user channel: True once size_matched
+    reaches ORDER_SIZE, False if it is cancelled.
+    """
+    creds = client.creds
+    async with websockets.connect(WS_USER_URL, ping_interval=30, ping_timeout=10) as ws:
+        await ws.send(json.dumps({
+            "type": "user",
+            "auth": {"apiKey": creds.api_key, "secret": creds.api_secret, "passphrase": creds.api_passphrase},
+            "markets": [],
+        }))
+        # The order may have filled before we subscribed
+        result = await asyncio.to_thread(check_fill_http, client, order_id)
+        if result is not None:
+            return result
+
+        seen_trades = set()
+        trade_matched = 0.0
+        while True:
+            try:
+                raw = await asyncio.wait_for(ws.recv(), timeout=WS_RECONCILE_SECS)
+            except asyncio.TimeoutError:
+                result = await asyncio.to_thread(check_fill_http, client, order_id)
+                if result is not None:
+                    return result
+                continue
+
+            msg = loads(raw)
+            for ev in msg if isinstance(msg, list) else [msg]:
+                etype = ev.get("event_type")
+                if etype == "order" and ev.get("id") == order_id:
+                    if ev.get("type") == "CANCELLATION":
+                        return False
+                    if float(ev.get("size_matched", 0)) >= ORDER_SIZE:
+                        return True
+                elif etype == "trade" and ev.get("id") not in seen_trades:
+                    # Trades repeat as MATCHED -> MINED -> CONFIRMED; count each once
+                    if ev.get("taker_order_id") == order_id:
+                        seen_trades.add(ev.get("id"))
+                        trade_matched += float(ev.get("size", 0))
+                    else:
+                        for mo in ev.get("maker_orders", []):
+                            if mo.get("order_id") == order_id:
+                                seen_trades.add(ev.get("id"))
+                                trade_matched += float(mo.get("matched_amount", 0))
+                    if trade_matched >= ORDER_SIZE:
+                        return True
+
+def wait_for_fill(client, order_id):
+    """Push-driven fill detection, falling back to HTTP polling on websocket failure."""
+    if WS_AVAILABLE:
+        try:
+            return asyncio.run(wait_fill_ws(client, order_id))
+        except Exception as e_ws:
+            logger.warning(f"User channel failed ({e_ws}); falling back to polling")
+    return poll_fill_http(client, order_id)
+
 def main():
     logger.info("🚑 STARTING LADDERED RECOVERY WORKER")
     
@@ -121,19 +210,9 @@ def main():
             # Let's assume we have them. If order fails due to insufficient balance, we stop.
             
             # 2. Check Open Orders
-            # Assuming get_orders returns all orders?
-            orders = client.get_orders()
-            # Filter for this token and active status
-            open_orders = [
-                o for o in orders 
-                if o.get('tokenID') == TOKEN_ID and o.get('status') in ['open', 'matched'] # Matched might be partial?
-                # Actually, check 'side' too?
-                # And 'status' should be 'active' or 'open'?
-                # Assuming 'status' field exists.
-            ]
-            # Better: if orders list is huge, this is bad.
-            # Does get_orders accept parsed params?
-            # client.get_orders(market=TOKEN_ID)?
+            # Filter server-side: /data/orders only returns live orders, and
+            # asset_id restricts it to this token (market= is the condition id)
+            open_orders = client.get_orders(OpenOrderParams(asset_id=TOKEN_ID))
             if open_orders:
                 logger.info(f"⏳ Open Orders Found: {len(open_orders)}. Waiting...")
                 time.sleep(60)
@@ -144,7 +223,7 @@ def main():
             order_args = OrderArgs(
                 token_id=TOKEN_ID,
                 price=0.25,
-                size=5.0,
+                size=ORDER_SIZE,
                 side=SELL
             )
             
@@ -154,36 +233,15 @@ def main():
                 order_id = resp.get('orderID')
                 logger.info(f"✅ Order Placed: {order_id}")
                 
-                # 4. Wait Loop (Check fill status)
-                # Wait for fill before starting 30m timer? 
+                # 4. Wait for fill (user-channel push, HTTP poll fallback)
                 # User: "If it fills, wait 30 minutes".
-                
-                filled = False
-                while not filled:
-                    time.sleep(10)
-                    # Check status
-                    # get_order(order_id)
-                    try:
-                        o_status = client.get_order(order_id)
-                        # status: 'matched' or 'open' or 'cancelled'
-                        # Actually 'status' field?
-                        # Depending on API response structure.
-                        # Usually 'size_matched' vs 'original_size'.
-                        matched = float(o_status.get('size_matched', 0))
-                        if matched >= 5.0:
-                            logger.info("🎉 Order FILLED!")
-                            filled = True
-                        elif o_status.get('status') == 'canceled':
-                            logger.info("❌ Order Cancelled externally. Retrying...")
-                            break 
-                    except Exception as e_stat:
-                        logger.warning(f"Status check error: {e_stat}")
-                        time.sleep(10)
-                
-                if filled:
+                if wait_for_fill(client, order_id):
+                    logger.info("🎉 Order FILLED!")
                     logger.info("🕒 Starting 30-Minute Cooldown...")
                     time.sleep(1800) # 30 mins
                     logger.info("⏰ Cooldown Complete. Preparing next batch.")
+                else:
+                    logger.info("❌ Order Cancelled externally. Retrying...")
 
             except Exception as e_order:
                 logger.error(f"Order Placement Failed: {e_order}")
@@ -12,7 +12,10 @@ Usage (on EC2):
 import os
 import sys
 import json
+from eth_abi import encode
 from web3 import Web3
+from _abis import erc20
+from _rpc import aggregate3, aggregate3_request, connect_fastest, batch_rpc, decode_aggregate3, decode_uint
 
 # ── Bootstrap ──────────────────────────────────────────────────────────
 for envpath in ["/run/sovereign-hive/env", "/app/sovereign-hive/.env", ".env"]:
@@ -47,6 +50,15 @@ USDC = "0x2791Bca1f2de4661ED88A30C99A7a9449Aa84174"
 CONDITION_ID = "0x0e71b3c6b61504df944761289aea4aef1d4587cee4050e4ce07e3299c54a9248"
 TOKEN_ID = "49689741427622618555134572237092324131804188952521642977757233337834517599219"
 
+# Same values in the form the calls take them
+USDC_ADDRESS = Web3.to_checksum_address(USDC)
+CONDITION_BYTES = bytes.fromhex(CONDITION_ID[2:])
+TOKEN_ID_INT = int(TOKEN_ID)
+PARENT_COLLECTION_ID = bytes(32)  # 0x0 for root collection
+# For binary markets: indexSets = [1] for outcome 0, [2] for outcome 1
+# Outcome 0 (Auger-Aliassime) has indexSet = 1 (binary: 01)
+INDEX_SETS = [1]
+
 # CTF redeemPositions ABI
 CTF_ABI = [
     {
@@ -90,22 +102,20 @@ CTF_ABI = [
     },
 ]
 
-ERC20_ABI = [
-    {"constant": True, "inputs": [{"name": "_owner", "type": "address"}],
-     "name": "balanceOf", "outputs": [{"name": "balance", "type": "uint256"}],
-     "type": "function"},
+# Resolution reads depend only on CONDITION_ID, so their calldata is encoded
+# once here rather than through the contract object on every run
+PAYOUT_DENOMINATOR_SELECTOR = bytes.fromhex("dd34de67")  # payoutDenominator(bytes32)
+PAYOUT_NUMERATORS_SELECTOR = bytes.fromhex("0504c814")   # payoutNumerators(bytes32,uint256)
+PAYOUT_DENOMINATOR_DATA = PAYOUT_DENOMINATOR_SELECTOR + encode(["bytes32"], [CONDITION_BYTES])
+PAYOUT_NUMERATORS_DATA = [
+    PAYOUT_NUMERATORS_SELECTOR + encode(["bytes32", "uint256"], [CONDITION_BYTES, i])
+    for i in (0, 1)
 ]
 
 
 def get_web3():
-    for rpc in RPC_ENDPOINTS:
-        try:
-            w3 = Web3(Web3.HTTPProvider(rpc, request_kwargs={"timeout": 10}))
-            if w3.is_connected():
-                return w3
-        except Exception:
-            continue
-    return None
+    # Race all endpoints; first to answer wins
+    return connect_fastest(RPC_ENDPOINTS)
 
 
 def main():
@@ -119,14 +129,26 @@ def main():
     print(f"Wallet: {addr}")
 
     ctf = w3.eth.contract(address=Web3.to_checksum_address(CTF), abi=CTF_ABI)
-    usdc = w3.eth.contract(address=Web3.to_checksum_address(USDC), abi=ERC20_ABI)
-
-    # Check USDC balance before
-    usdc_before = usdc.functions.balanceOf(addr).call() / 1e6
+    usdc = erc20(w3, USDC)
+
+    # All pre-checks in one round-trip: the Multicall3 for contract reads plus
+    # nonce and gas price, fused into a single JSON-RPC batch
+    mc_result, nonce, gas_price = batch_rpc(w3.provider.endpoint_uri, [
+        aggregate3_request(w3, [
+            (usdc.address, usdc.encode_abi("balanceOf", args=[addr])),
+            (ctf.address, ctf.encode_abi("balanceOf", args=[addr, TOKEN_ID_INT])),
+            (ctf.address, PAYOUT_DENOMINATOR_DATA),
+            (ctf.address, PAYOUT_NUMERATORS_DATA[0]),
+            (ctf.address, PAYOUT_NUMERATORS_DATA[1]),
+        ]),
+        ("eth_getTransactionCount", [addr, "pending"]),
+        ("eth_gasPrice", []),
+    ])
+    usdc_before, token_balance, denom, p0, p1 = map(decode_uint, decode_aggregate3(w3, mc_result))
+
+    usdc_before = usdc_before / 1e6
     print(f"USDC before: ${usdc_before:.2f}")
 
-    # Check conditional token balance
-    token_balance = ctf.functions.balanceOf(addr, int(TOKEN_ID)).call()
     shares = token_balance / 1e6
     print(f"Tennis shares: {shares:.4f}")
 
@@ -135,14 +157,10 @@ def main():
         sys.exit(0)
 
     # Verify condition is resolved
-    condition_bytes = bytes.fromhex(CONDITION_ID[2:])
-    denom = ctf.functions.payoutDenominator(condition_bytes).call()
     if denom == 0:
         print("ERROR: Condition not resolved yet. Cannot redeem.")
         sys.exit(1)
 
-    p0 = ctf.functions.payoutNumerators(condition_bytes, 0).call()
-    p1 = ctf.functions.payoutNumerators(condition_bytes, 1).call()
     print(f"Payout: [{p0}, {p1}] (denom={denom})")
 
     if p0 == 0:
@@ -150,20 +168,16 @@ def main():
         sys.exit(1)
 
     # Redeem positions
-    # For binary markets: indexSets = [1] for outcome 0, [2] for outcome 1
-    # Outcome 0 (Auger-Aliassime) has indexSet = 1 (binary: 01)
-    parent_collection_id = bytes(32)  # 0x0 for root collection
-
     print(f"\nRedeeming {shares:.4f} shares for ~${shares:.2f} USDC...")
 
-    nonce = w3.eth.get_transaction_count(addr)
-    gas_price = int(w3.eth.gas_price * 1.5)
+    nonce = decode_uint(nonce)
+    gas_price = int(decode_uint(gas_price) * 1.5)
 
     tx = ctf.functions.redeemPositions(
-        Web3.to_checksum_address(USDC),   # collateralToken
-        parent_collection_id,              # parentCollectionId (root)
-        condition_bytes,                   # conditionId
-        [1]                                # indexSets: [1] = outcome 0
+        USDC_ADDRESS,                      # collateralToken
+        PARENT_COLLECTION_ID,              # parentCollectionId (root)
+        CONDITION_BYTES,                   # conditionId
+        INDEX_SETS                         # indexSets: [1] = outcome 0
     ).build_transaction({
         "from": addr,
         "nonce": nonce,
@@ -172,7 +186,7 @@ def main():
         "chainId": 137,
     })
 
-    signed = w3.eth.account.sign_transaction(tx, PK)
+    signed = account.sign_transaction(tx)
     tx_hash = w3.eth.send_raw_transaction(signed.raw_transaction)
     print(f"TX: {tx_hash.hex()}")
     print("Waiting for confirmation...")
@@ -180,9 +194,16 @@ def main():
     receipt = w3.eth.wait_for_transaction_receipt(tx_hash, timeout=120)
 
     if receipt.status == 1:
-        # Check balances after
-        usdc_after = usdc.functions.balanceOf(addr).call() / 1e6
-        shares_after = ctf.functions.balanceOf(addr, int(TOKEN_ID)).call() / 1e6
+        # Check balances after (one Multicall3 pinned to the receipt's block so
+        # both reads are the same snapshot; a flaky sub-call shouldn't hide the success)
+        usdc_after, shares_after = aggregate3(w3, [
+            (usdc.address, usdc.encode_abi("balanceOf", args=[addr])),
+            (ctf.address, ctf.encode_abi("balanceOf", args=[addr, TOKEN_ID_INT])),
+        ], allow_failure=True, block_identifier=receipt.blockNumber)
+        if usdc_after is None or shares_after is None:
+            print("WARNING: post-redeem balance read failed; check the wallet manually")
+        usdc_after = (decode_uint(usdc_after) or 0) / 1e6
+        shares_after = (decode_uint(shares_after) or 0) / 1e6
         print(f"\nSUCCESS!")
         print(f"USDC before: ${usdc_before:.2f}")
         print(f"USDC after:  ${usdc_after:.2f}")
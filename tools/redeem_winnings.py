@@ -4,19 +4,31 @@ Redeem winning Polymarket positions on-chain.
 """
 import os
 import sys
+import functools
+import requests
 from dotenv import load_dotenv
+from eth_abi import encode
 from web3 import Web3
+from _abis import erc20
+from _nonce import nonce_lock
+from _rpc import POLYGON_FALLBACK_RPCS, aggregate3_request, batch_rpc, decode_aggregate3, decode_uint, eth_call, eip1559_fees, make_w3, pooled_session, wait_receipt
 
 load_dotenv()
 
 # Config
 WALLET = '0xb22028EA4E841CA321eb917C706C931a94b564AB'
 PRIVATE_KEY = os.getenv('POLYMARKET_PRIVATE_KEY')
+CHAIN_ID = 137
 
 # Contracts
 CONDITIONAL_TOKENS = '0x4D97DCd97eC945f40cF65F87097ACe5EA0476045'
 USDC_E = '0x2791Bca1f2de4661ED88A30C99A7a9449Aa84174'
 
+# Loop-invariant redeemPositions args, converted once
+COLLATERAL = Web3.to_checksum_address(USDC_E)
+PARENT_COLLECTION_ID = bytes(32)  # 0x0 for root
+REDEEM_POSITIONS_SELECTOR = bytes.fromhex('01b7037c')  # redeemPositions(address,bytes32,bytes32,uint256[])
+
 # Winning positions to redeem
 POSITIONS = [
     {
@@ -63,111 +75,149 @@ CT_ABI = [
     },
 ]
 
+@functools.lru_cache(maxsize=None)
+def redeem_calldata(condition_id, index_set):
+    """ABI-encoded redeemPositions(COLLATERAL, root, condition_id, [index_set])."""
+    return '0x' + (REDEEM_POSITIONS_SELECTOR + encode(
+        ['address', 'bytes32', 'bytes32', 'uint256[]'],
+        [COLLATERAL, PARENT_COLLECTION_ID, bytes.fromhex(condition_id[2:]), [index_set]],
+    )).hex()
+
 def main():
     print('=' * 60)
     print('POLYMARKET WINNINGS REDEMPTION')
     print('=' * 60)
     
     # Connect
-    w3 = Web3(Web3.HTTPProvider('https://polygon-bor-rpc.publicnode.com'))
-    if not w3.is_connected():
-        print('ERROR: Cannot connect to Polygon RPC')
-        sys.exit(1)
-    
-    print(f'Connected to Polygon (Chain ID: {w3.eth.chain_id})')
+    rpc_url = 'https://polygon-bor-rpc.publicnode.com'
+    session = pooled_session()
+    # No is_connected()/chain_id probe: the pre-flight batch is the first
+    # RPC and doubles as the connectivity check (chainId is fixed at 137)
+    w3 = make_w3(rpc_url, session, fallback_urls=POLYGON_FALLBACK_RPCS)
     
     account = w3.eth.account.from_key(PRIVATE_KEY)
     print(f'Wallet: {account.address}')
     
-    # Check POL balance for gas
-    pol_balance = w3.eth.get_balance(account.address)
-    print(f'POL Balance: {pol_balance/1e18:.4f}')
-    
-    if pol_balance < w3.to_wei('0.1', 'ether'):
-        print('WARNING: Low POL balance for gas!')
-    
     # Contract
     ct = w3.eth.contract(
         address=Web3.to_checksum_address(CONDITIONAL_TOKENS),
         abi=CT_ABI
     )
+    usdc = erc20(w3, USDC_E)
+    usdc_balance = eth_call(usdc.address, usdc.encode_abi('balanceOf', args=[account.address]))
     
-    # Check USDC.e balance before
-    usdc_abi = [{'constant':True,'inputs':[{'name':'account','type':'address'}],'name':'balanceOf','outputs':[{'name':'','type':'uint256'}],'type':'function'}]
-    usdc = w3.eth.contract(address=Web3.to_checksum_address(USDC_E), abi=usdc_abi)
-    usdc_before = usdc.functions.balanceOf(account.address).call()
-    print(f'\nUSDC.e Before: ${usdc_before/1e6:.2f}')
+    # Hold the wallet's nonce lock from the nonce read through the last
+    # redemption, so a concurrently running tool can't reuse our nonces
+    with nonce_lock(account.address, CHAIN_ID):
+        # Every pre-flight read in one JSON-RPC batch round-trip: pending base
+        # fee, POL, USDC.e, nonce, plus one Multicall3 carrying each position's
+        # balance and payout denominator (2N sub-calls, failures tolerated)
+        pos_calls = []
+        for pos in POSITIONS:
+            pos_calls.append((ct.address, ct.encode_abi('balanceOf', args=[account.address, pos['tokenId']])))
+            pos_calls.append((ct.address, ct.encode_abi('payoutDenominator', args=[pos['conditionId']])))
+        try:
+            pending_block, pol_balance, usdc_before, nonce, mc_result = batch_rpc(rpc_url, [
+                ('eth_getBlockByNumber', ['pending', False]),
+                ('eth_getBalance', [account.address, 'latest']),
+                usdc_balance,
+                ('eth_getTransactionCount', [account.address, 'pending']),
+                aggregate3_request(w3, pos_calls, allow_failure=True),
+            ], session=session)
+        except requests.RequestException as e:
+            print(f'ERROR: Cannot connect to Polygon RPC: {e}')
+            sys.exit(1)
+        print('Connected to Polygon')
+        pol_balance, usdc_before, nonce = map(decode_uint, (pol_balance, usdc_before, nonce))
+        pos_results = [decode_uint(r) for r in decode_aggregate3(w3, mc_result)]
     
-    # Process each position
-    for pos in POSITIONS:
-        print(f'\n--- {pos["name"]} ---')
-        
-        # Check token balance
-        balance = ct.functions.balanceOf(account.address, pos['tokenId']).call()
-        print(f'Token Balance: {balance/1e6:.2f} shares')
+        # Check POL balance for gas
+        print(f'POL Balance: {pol_balance/1e18:.4f}')
+    
+        if pol_balance < w3.to_wei('0.1', 'ether'):
+            print('WARNING: Low POL balance for gas!')
+    
+        # Check USDC.e balance before
+        print(f'\nUSDC.e Before: ${usdc_before/1e6:.2f}')
+    
+        # Only this script sends from the wallet here: one fee snapshot, and the
+        # pre-flight nonce is incremented locally after each successful send
+        fees = eip1559_fees(decode_uint(pending_block['baseFeePerGas']))
+    
+        # Filter to redeemable positions up front; skips cost no extra RPC
+        ready = []
+        for pos, balance, payout_denom in zip(POSITIONS, pos_results[0::2], pos_results[1::2]):
+            print(f'\n--- {pos["name"]} ---')
         
-        if balance == 0:
-            print('No tokens to redeem, skipping...')
-            continue
+            # Check token balance
+            if balance is None:
+                print('Could not read token balance, skipping...')
+                continue
+            print(f'Token Balance: {balance/1e6:.2f} shares')
         
-        # Check if condition is resolved (payoutDenominator > 0)
-        try:
-            payout_denom = ct.functions.payoutDenominator(pos['conditionId']).call()
-            print(f'Payout Denominator: {payout_denom}')
-            if payout_denom == 0:
-                print('Market not resolved yet, skipping...')
+            if balance == 0:
+                print('No tokens to redeem, skipping...')
                 continue
-        except Exception as e:
-            print(f'Could not check payout: {e}')
         
-        # Build redemption transaction
-        # indexSets: [1] for YES (outcome 0), [2] for NO (outcome 1)
-        # For binary markets: YES=1 (2^0), NO=2 (2^1)
-        index_set = 1 << pos['outcomeIndex']  # 1 for YES, 2 for NO
+            # Check if condition is resolved (payoutDenominator > 0)
+            if payout_denom is None:
+                print('Could not check payout: call reverted')
+            else:
+                print(f'Payout Denominator: {payout_denom}')
+                if payout_denom == 0:
+                    print('Market not resolved yet, skipping...')
+                    continue
+            ready.append(pos)
+    
+        # Process each redeemable position
+        for pos in ready:
+            print(f'\n--- Redeeming {pos["name"]} ---')
         
-        print(f'Redeeming with indexSet: [{index_set}]')
+            # Build redemption transaction
+            # indexSets: [1] for YES (outcome 0), [2] for NO (outcome 1)
+            # For binary markets: YES=1 (2^0), NO=2 (2^1)
+            index_set = 1 << pos['outcomeIndex']  # 1 for YES, 2 for NO
         
-        try:
-            # Get current gas price
-            gas_price = w3.eth.gas_price
-            boosted_gas = int(gas_price * 1.5)
-            print(f'Gas Price: {boosted_gas/1e9:.2f} gwei')
-            
-            # Build transaction
-            nonce = w3.eth.get_transaction_count(account.address, 'pending')
+            print(f'Redeeming with indexSet: [{index_set}]')
+        
+            try:
+                print(f'Max Fee: {fees["maxFeePerGas"]/1e9:.2f} gwei (tip {fees["maxPriorityFeePerGas"]/1e9:.0f})')
             
-            txn = ct.functions.redeemPositions(
-                Web3.to_checksum_address(USDC_E),  # collateralToken
-                bytes(32),  # parentCollectionId (0x0 for root)
-                pos['conditionId'],  # conditionId
-                [index_set]  # indexSets
-            ).build_transaction({
-                'from': account.address,
-                'nonce': nonce,
-                'gas': 200000,
-                'gasPrice': boosted_gas,
-                'chainId': 137
-            })
+                # Build transaction
+                txn = {
+                    'from': account.address,
+                    'to': ct.address,
+                    'data': redeem_calldata(pos['conditionId'], index_set),
+                    'nonce': nonce,
+                    'gas': 200000,
+                    **fees,
+                    'chainId': CHAIN_ID
+                }
             
-            # Sign and send
-            signed = account.sign_transaction(txn)
-            tx_hash = w3.eth.send_raw_transaction(signed.raw_transaction)
-            print(f'TX Sent: {tx_hash.hex()}')
+                # Sign and send
+                signed = account.sign_transaction(txn)
+                tx_hash = w3.eth.send_raw_transaction(signed.raw_transaction)
+                nonce += 1
+                print(f'TX Sent: {tx_hash.hex()}')
             
-            # Wait for confirmation
-            print('Waiting for confirmation...')
-            receipt = w3.eth.wait_for_transaction_receipt(tx_hash, timeout=120)
+                # Wait for confirmation
+                print('Waiting for confirmation...')
+                receipt = wait_receipt(w3, tx_hash, timeout=120)
             
-            if receipt['status'] == 1:
-                print(f'✅ SUCCESS! Block: {receipt["blockNumber"]}')
-            else:
-                print(f'❌ FAILED! Check transaction on Polygonscan')
+                if receipt['status'] == 1:
+                    print(f'✅ SUCCESS! Block: {receipt["blockNumber"]}')
+                else:
+                    print(f'❌ FAILED! Check transaction on Polygonscan')
                 
-        except Exception as e:
-            print(f'ERROR: {e}')
+            except Exception as e:
+                print(f'ERROR: {e}')
+                # The local nonce may no longer match the node (e.g. the send
+                # failed mid-flight); resync before the next position
+                nonce = w3.eth.get_transaction_count(account.address, 'pending')
     
     # Check USDC.e balance after
-    usdc_after = usdc.functions.balanceOf(account.address).call()
+    (usdc_after,) = batch_rpc(rpc_url, [usdc_balance], session=session)
+    usdc_after = decode_uint(usdc_after)
     print(f'\n{"=" * 60}')
     print(f'USDC.e Before: ${usdc_before/1e6:.2f}')
     print(f'USDC.e After:  ${usdc_after/1e6:.2f}')
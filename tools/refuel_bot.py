@@ -1,8 +1,11 @@
 import time
 import os
-from web3 import Web3
+from concurrent.futures import ThreadPoolExecutor
 from eth_account import Account
 from dotenv import load_dotenv
+from _abis import approve_calldata, erc20
+from _nonce import nonce_lock
+from _rpc import POLYGON_FALLBACK_RPCS, eip1559_fees, get_base_fee, make_w3, wait_receipt
 
 # --- CONFIGURATION ---
 load_dotenv("/app/hft/.env")
@@ -12,8 +15,41 @@ RPC_URL = "https://polygon-bor.publicnode.com"
 WMATIC_ADDR = "0x0d500B1d8E8eF31E21C99d1Db9A6444d3ADf1270"
 USDC_E_ADDR = "0x2791Bca1f2de4661ED88A30C99A7a9449Aa84174"
 ROUTER_ADDR = "0xE592427A0AEce92De3Edee1F18E0157C05861564" # Uniswap V3
+CHAIN_ID = 137
 
-w3 = Web3(Web3.HTTPProvider(RPC_URL))
+# ABIs as Python literals: nothing to parse at runtime
+WMATIC_ABI = [
+    {"constant": False, "inputs": [], "name": "deposit", "outputs": [], "payable": True, "type": "function"},
+    {"constant": False, "inputs": [{"name": "guy", "type": "address"}, {"name": "wad", "type": "uint256"}], "name": "approve", "outputs": [{"name": "", "type": "bool"}], "type": "function"},
+]
+
+ROUTER_ABI = [
+    {
+        "inputs": [
+            {
+                "components": [
+                    {"internalType": "address", "name": "tokenIn", "type": "address"},
+                    {"internalType": "address", "name": "tokenOut", "type": "address"},
+                    {"internalType": "uint24", "name": "fee", "type": "uint24"},
+                    {"internalType": "address", "name": "recipient", "type": "address"},
+                    {"internalType": "uint256", "name": "deadline", "type": "uint256"},
+                    {"internalType": "uint256", "name": "amountIn", "type": "uint256"},
+                    {"internalType": "uint256", "name": "amountOutMinimum", "type": "uint256"},
+                    {"internalType": "uint160", "name": "sqrtPriceLimitX96", "type": "uint160"}
+                ],
+                "internalType": "struct ISwapRouter.ExactInputSingleParams",
+                "name": "params",
+                "type": "tuple"
+            }
+        ],
+        "name": "exactInputSingle",
+        "outputs": [{"internalType": "uint256", "name": "amountOut", "type": "uint256"}],
+        "stateMutability": "payable",
+        "type": "function"
+    }
+]
+
+w3 = make_w3(RPC_URL, fallback_urls=POLYGON_FALLBACK_RPCS)
 if not PK:
     print("❌ ERROR: POLYMARKET_PRIVATE_KEY not found in .env")
     exit(1)
@@ -39,80 +75,71 @@ def execute_refuel():
 
     # 2. Wrap POL -> WMATIC (Required for Uniswap)
     print(f"📦 Step 1/3: Wrapping {swap_amount_pol} POL...")
-    wmatic = w3.eth.contract(address=WMATIC_ADDR, abi='[{"constant":false,"inputs":[],"name":"deposit","outputs":[],"payable":true,"type":"function"}]')
-    
-    current_nonce = w3.eth.get_transaction_count(my_addr)
-    gas_price = int(w3.eth.gas_price * 1.5) # Speed up
+    wmatic = w3.eth.contract(address=WMATIC_ADDR, abi=WMATIC_ABI)
     
-    tx1 = wmatic.functions.deposit().build_transaction({
-        'from': my_addr, 'nonce': current_nonce,
-        'gas': 100000, 'gasPrice': gas_price, 'value': amount_in
-    })
-    s1 = w3.eth.account.sign_transaction(tx1, PK)
-    tx_hash1 = w3.eth.send_raw_transaction(s1.raw_transaction)
-    print(f"   Hash: {tx_hash1.hex()}")
-    print("   Waiting for confirmation...")
-    w3.eth.wait_for_transaction_receipt(tx_hash1, timeout=120)
-
-    # 3. Approve Uniswap
-    print("🔓 Step 2/3: Approving Router...")
-    wmatic_token = w3.eth.contract(address=WMATIC_ADDR, abi='[{"constant":false,"inputs":[{"name":"guy","type":"address"},{"name":"wad","type":"uint256"}],"name":"approve","outputs":[{"name":"","type":"bool"}],"type":"function"}]')
+    # Hold the wallet's nonce lock from the read until the last broadcast, so a
+    # concurrently running tool can't hand out the same nonces
+    with nonce_lock(my_addr, CHAIN_ID):
+        # One nonce read for all three steps: wrap = n, approve = n+1, swap = n+2
+        current_nonce = w3.eth.get_transaction_count(my_addr, 'pending')
+        fees = eip1559_fees(get_base_fee(w3))  # type-2: pays baseFee + tip, not a 1.5x guess
     
-    tx2 = wmatic_token.functions.approve(ROUTER_ADDR, amount_in).build_transaction({
-        'from': my_addr, 'nonce': current_nonce + 1,
-        'gas': 100000, 'gasPrice': gas_price
-    })
-    s2 = w3.eth.account.sign_transaction(tx2, PK)
-    tx_hash2 = w3.eth.send_raw_transaction(s2.raw_transaction)
-    print(f"   Hash: {tx_hash2.hex()}")
-    w3.eth.wait_for_transaction_receipt(tx_hash2, timeout=120)
+        # Every field is known up front: assemble tx dicts directly instead of
+        # build_transaction (no chainId lookup / validation pass per tx)
+        tx1 = {
+            'from': my_addr, 'to': WMATIC_ADDR, 'data': wmatic.encode_abi('deposit'),
+            'nonce': current_nonce, 'gas': 100000, **fees, 'value': amount_in, 'chainId': CHAIN_ID
+        }
+        s1 = account.sign_transaction(tx1)
+        tx_hash1 = w3.eth.send_raw_transaction(s1.raw_transaction)
+        print(f"   Hash: {tx_hash1.hex()}")
+        # No receipt waits between steps: nonces n, n+1, n+2 make the node
+        # execute wrap -> approve -> swap in order; all three confirm together below
 
-    # 4. Swap WMATIC -> USDC.e
-    print("🔄 Step 3/3: Swapping to USDC.e...")
-    router_abi = [
-        {
-            "inputs": [
-                {
-                    "components": [
-                        {"internalType": "address", "name": "tokenIn", "type": "address"},
-                        {"internalType": "address", "name": "tokenOut", "type": "address"},
-                        {"internalType": "uint24", "name": "fee", "type": "uint24"},
-                        {"internalType": "address", "name": "recipient", "type": "address"},
-                        {"internalType": "uint256", "name": "deadline", "type": "uint256"},
-                        {"internalType": "uint256", "name": "amountIn", "type": "uint256"},
-                        {"internalType": "uint256", "name": "amountOutMinimum", "type": "uint256"},
-                        {"internalType": "uint160", "name": "sqrtPriceLimitX96", "type": "uint160"}
-                    ],
-                    "internalType": "struct ISwapRouter.ExactInputSingleParams",
-                    "name": "params",
-                    "type": "tuple"
-                }
-            ],
-            "name": "exactInputSingle",
-            "outputs": [{"internalType": "uint256", "name": "amountOut", "type": "uint256"}],
-            "stateMutability": "payable",
-            "type": "function"
+        # 3. Approve Uniswap
+        print("🔓 Step 2/3: Approving Router...")
+        tx2 = {
+            'from': my_addr, 'to': WMATIC_ADDR, 'data': approve_calldata(ROUTER_ADDR, amount_in),
+            'nonce': current_nonce + 1, 'gas': 100000, **fees, 'value': 0, 'chainId': CHAIN_ID
         }
-    ]
-    router = w3.eth.contract(address=ROUTER_ADDR, abi=router_abi)
-    
-    # Fee 500 = 0.05%
-    params = (WMATIC_ADDR, USDC_E_ADDR, 500, my_addr, int(time.time())+600, amount_in, 0, 0)
+        s2 = account.sign_transaction(tx2)
+        tx_hash2 = w3.eth.send_raw_transaction(s2.raw_transaction)
+        print(f"   Hash: {tx_hash2.hex()}")
+
+        # 4. Swap WMATIC -> USDC.e
+        print("🔄 Step 3/3: Swapping to USDC.e...")
+        router = w3.eth.contract(address=ROUTER_ADDR, abi=ROUTER_ABI)
     
-    tx3 = router.functions.exactInputSingle(params).build_transaction({
-        'from': my_addr, 'nonce': current_nonce + 2,
-        'gas': 350000, 'gasPrice': gas_price
-    })
-    s3 = w3.eth.account.sign_transaction(tx3, PK)
-    tx_hash3 = w3.eth.send_raw_transaction(s3.raw_transaction)
+        # Fee 500 = 0.05%
+        params = (WMATIC_ADDR, USDC_E_ADDR, 500, my_addr, int(time.time())+600, amount_in, 0, 0)
     
+        tx3 = {
+            'from': my_addr, 'to': ROUTER_ADDR, 'data': router.encode_abi('exactInputSingle', args=[params]),
+            'nonce': current_nonce + 2, 'gas': 350000, **fees, 'value': 0, 'chainId': CHAIN_ID
+        }
+        s3 = account.sign_transaction(tx3)
+        tx_hash3 = w3.eth.send_raw_transaction(s3.raw_transaction)
+        print(f"   Hash: {tx_hash3.hex()}")
+    print("   Waiting for confirmations...")
+
+    with ThreadPoolExecutor(max_workers=3) as pool:
+        r1, r2, r3 = pool.map(
+            lambda h: wait_receipt(w3, h, timeout=180),
+            [tx_hash1, tx_hash2, tx_hash3],
+        )
+    if r1['status'] != 1 or r2['status'] != 1:
+        step = "Wrap" if r1['status'] != 1 else "Approve"
+        print(f"❌ ERROR: {step} reverted; swap cannot have filled.")
+        return
+    if r3['status'] != 1:
+        print(f"❌ ERROR: Swap reverted. Tx: {tx_hash3.hex()}")
+        return
+
     print(f"✅ REFUEL COMPLETE. Tx: {tx_hash3.hex()}")
     print("👉 Checking final balance...")
-    time.sleep(5)
     
     # Verify final balance
-    usdc_abi = [{"constant":True,"inputs":[{"name":"_owner","type":"address"}],"name":"balanceOf","outputs":[{"name":"balance","type":"uint256"}],"type":"function"}]
-    usdc = w3.eth.contract(address=USDC_E_ADDR, abi=usdc_abi)
+    usdc = erc20(w3, USDC_E_ADDR)
     final_bal = usdc.functions.balanceOf(my_addr).call() / 1e6
     print(f"💰 New USDC.e Balance: ${final_bal:.2f}")
 
@@ -1,11 +1,33 @@
 
-import requests
+import asyncio
 import json
 
+import aiohttp
+from _fastjson import loads
+
 ADDRESS = "0xb22028EA4E841CA321eb917C706C931a94b564AB"
 GAMMA_URL = "https://gamma-api.polymarket.com"
 
-def check_endpoints():
+async def head(session, ep):
+    """Status of a HEAD probe (body never downloaded); the exception on error."""
+    try:
+        async with session.head(GAMMA_URL + ep, allow_redirects=True,
+                                timeout=aiohttp.ClientTimeout(total=2)) as resp:
+            return resp.status
+    except (aiohttp.ClientError, asyncio.TimeoutError) as e:
+        return e
+
+async def fetch(session, ep):
+    """(status, body) for one endpoint; status is None and body the exception on error."""
+    try:
+        async with session.get(GAMMA_URL + ep) as resp:
+            if resp.status != 200:
+                return resp.status, None
+            return 200, loads(await resp.read())
+    except (aiohttp.ClientError, asyncio.TimeoutError, ValueError) as e:
+        return None, e
+
+async def check_endpoints():
     endpoints = [
         f"/portfolio/{ADDRESS}",
         f"/wallets/{ADDRESS}/portfolio",
@@ -15,17 +37,27 @@ def check_endpoints():
         "/markets?limit=1"
     ]
     
-    for ep in endpoints:
-        print(f"Checking {ep}...")
-        try:
-            resp = requests.get(GAMMA_URL + ep, timeout=5)
-            if resp.status_code == 200:
-                print(f"✅ SUCCESS: {ep}")
-                print(json.dumps(resp.json(), indent=2)[:500])
-            else:
-                print(f"❌ FAIL: {ep} -> {resp.status_code}")
-        except Exception as e:
-            print(f"Error: {e}")
+    # All probes are independent: fan out, then report in order.
+    # Pass 1 is HEAD only, so 404/5xx bodies are never downloaded or parsed;
+    # pass 2 GETs just the endpoints that answered 200 (or refused HEAD)
+    print(f"Checking {len(endpoints)} endpoints...")
+    async with aiohttp.ClientSession(timeout=aiohttp.ClientTimeout(total=5)) as session:
+        heads = await asyncio.gather(*(head(session, ep) for ep in endpoints))
+        live = [ep for ep, status in zip(endpoints, heads) if status in (200, 405)]
+        bodies = dict(zip(live, await asyncio.gather(*(fetch(session, ep) for ep in live))))
+
+    for ep, status in zip(endpoints, heads):
+        if ep in bodies:
+            status, body = bodies[ep]
+        else:
+            status, body = (None, status) if isinstance(status, Exception) else (status, None)
+        if status == 200:
+            print(f"✅ SUCCESS: {ep}")
+            print(json.dumps(body, indent=2)[:500])
+        elif status is None:
+            print(f"Error: {ep} -> {body!r}")
+        else:
+            print(f"❌ FAIL: {ep} -> {status}")
 
 if __name__ == "__main__":
-    check_endpoints()
+    asyncio.run(check_endpoints())
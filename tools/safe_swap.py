@@ -15,11 +15,16 @@ Usage:
 import os
 import sys
 import time
-import json
+from concurrent.futures import ThreadPoolExecutor
 from web3 import Web3
 from web3.middleware import ExtraDataToPOAMiddleware
 from eth_account import Account
 from dotenv import dotenv_values
+from web3.exceptions import ContractLogicError
+from eth_abi import encode
+from _abis import ALLOWANCE_SELECTOR, BALANCE_OF_SELECTOR, allowance_storage_key, approve_calldata, transfers_to
+from _fastjson import loads
+from _rpc import aggregate3, batch_rpc, decode_uint, eth_call, wait_receipt, wait_receipts
 
 # Try multiple .env paths
 ENV_PATHS = ["/app/hft/.env", ".env", "../.env"]
@@ -31,7 +36,12 @@ for path in ENV_PATHS:
 
 # --- CONFIGURATION ---
 RPC_URL = "https://polygon-bor.publicnode.com"
+CHAIN_ID = 137
 MAX_SLIPPAGE_PERCENT = 3.0  # HARD LIMIT: Abort if slippage > 3%
+# Approve the router for max uint256 once per token so later swaps skip the
+# approve tx entirely (as the other tools do); INFINITE_APPROVAL=0 approves
+# only the swap amount
+INFINITE_APPROVAL = (config.get("INFINITE_APPROVAL") or os.getenv("INFINITE_APPROVAL", "1")) != "0"
 
 # Token Addresses
 TOKENS = {
@@ -45,15 +55,36 @@ TOKENS = {
 UNISWAP_ROUTER = "0xE592427A0AEce92De3Edee1F18E0157C05861564"
 UNISWAP_QUOTER = "0xb27308f9F90D607463bb33eA1BeBb41C27CE5AB6"
 POLYMARKET_EXCHANGE = "0x4bFb41d5B3570DeFd03C39a9A4D8dE6Bd8B8982E"
+FEE_TIERS = (100, 500, 3000, 10000)  # 0.01%, 0.05%, 0.3%, 1%
+
+# Checksummed once at import (to_checksum_address costs a keccak each call)
+CHECKSUMS = {k: Web3.to_checksum_address(v) for k, v in TOKENS.items() if v != "NATIVE"}
+CHECKSUMS["ROUTER"] = Web3.to_checksum_address(UNISWAP_ROUTER)
+CHECKSUMS["QUOTER"] = Web3.to_checksum_address(UNISWAP_QUOTER)
+
+# Storage slot of each token's allowance mapping, for eth_call state overrides:
+# USDC.e is OpenZeppelin ERC20 (UChildERC20), native USDC is Circle's
+# FiatToken, WMATIC is WETH9
+ALLOWANCE_SLOTS = {"USDC_E": 1, "NATIVE_USDC": 10, "WMATIC": 4}
+MAX_UINT256 = 2**256 - 1
+
+# quoteExactInputSingle(address,address,uint24,uint256,uint160)
+QUOTE_EXACT_INPUT_SINGLE_SELECTOR = bytes.fromhex("f7729d43")
+# exactInputSingle((address,address,uint24,address,uint256,uint256,uint256,uint160))
+EXACT_INPUT_SINGLE_SELECTOR = bytes.fromhex("414bf389")
+EXACT_INPUT_SINGLE_PARAMS = ["(address,address,uint24,address,uint256,uint256,uint256,uint160)"]
 
 # ABIs
-WMATIC_ABI = json.loads('[{"constant":false,"inputs":[],"name":"deposit","outputs":[],"payable":true,"stateMutability":"payable","type":"function"},{"constant":false,"inputs":[{"name":"guy","type":"address"},{"name":"wad","type":"uint256"}],"name":"approve","outputs":[{"name":"","type":"bool"}],"type":"function"},{"constant":true,"inputs":[{"name":"","type":"address"}],"name":"balanceOf","outputs":[{"name":"","type":"uint256"}],"type":"function"},{"constant":false,"inputs":[{"name":"wad","type":"uint256"}],"name":"withdraw","outputs":[],"type":"function"}]')
+WMATIC_ABI = loads(b'[{"constant":false,"inputs":[],"name":"deposit","outputs":[],"payable":true,"stateMutability":"payable","type":"function"},{"constant":false,"inputs":[{"name":"guy","type":"address"},{"name":"wad","type":"uint256"}],"name":"approve","outputs":[{"name":"","type":"bool"}],"type":"function"},{"constant":true,"inputs":[{"name":"","type":"address"}],"name":"balanceOf","outputs":[{"name":"","type":"uint256"}],"type":"function"},{"constant":false,"inputs":[{"name":"wad","type":"uint256"}],"name":"withdraw","outputs":[],"type":"function"}]')
 
-ERC20_ABI = json.loads('[{"constant":false,"inputs":[{"name":"_spender","type":"address"},{"name":"_value","type":"uint256"}],"name":"approve","outputs":[{"name":"","type":"bool"}],"type":"function"},{"constant":true,"inputs":[{"name":"_owner","type":"address"}],"name":"balanceOf","outputs":[{"name":"balance","type":"uint256"}],"type":"function"},{"constant":true,"inputs":[{"name":"owner","type":"address"},{"name":"spender","type":"address"}],"name":"allowance","outputs":[{"name":"","type":"uint256"}],"type":"function"},{"constant":true,"inputs":[],"name":"decimals","outputs":[{"name":"","type":"uint8"}],"type":"function"}]')
+ERC20_ABI = loads(b'[{"constant":false,"inputs":[{"name":"_spender","type":"address"},{"name":"_value","type":"uint256"}],"name":"approve","outputs":[{"name":"","type":"bool"}],"type":"function"},{"constant":true,"inputs":[{"name":"_owner","type":"address"}],"name":"balanceOf","outputs":[{"name":"balance","type":"uint256"}],"type":"function"},{"constant":true,"inputs":[{"name":"owner","type":"address"},{"name":"spender","type":"address"}],"name":"allowance","outputs":[{"name":"","type":"uint256"}],"type":"function"},{"constant":true,"inputs":[],"name":"decimals","outputs":[{"name":"","type":"uint8"}],"type":"function"}]')
 
-QUOTER_ABI = json.loads('[{"inputs":[{"internalType":"address","name":"tokenIn","type":"address"},{"internalType":"address","name":"tokenOut","type":"address"},{"internalType":"uint24","name":"fee","type":"uint24"},{"internalType":"uint256","name":"amountIn","type":"uint256"},{"internalType":"uint160","name":"sqrtPriceLimitX96","type":"uint160"}],"name":"quoteExactInputSingle","outputs":[{"internalType":"uint256","name":"amountOut","type":"uint256"}],"stateMutability":"nonpayable","type":"function"}]')
+QUOTER_ABI = loads(b'[{"inputs":[{"internalType":"address","name":"tokenIn","type":"address"},{"internalType":"address","name":"tokenOut","type":"address"},{"internalType":"uint24","name":"fee","type":"uint24"},{"internalType":"uint256","name":"amountIn","type":"uint256"},{"internalType":"uint160","name":"sqrtPriceLimitX96","type":"uint160"}],"name":"quoteExactInputSingle","outputs":[{"internalType":"uint256","name":"amountOut","type":"uint256"}],"stateMutability":"nonpayable","type":"function"}]')
 
-ROUTER_ABI = json.loads('[{"inputs":[{"components":[{"internalType":"address","name":"tokenIn","type":"address"},{"internalType":"address","name":"tokenOut","type":"address"},{"internalType":"uint24","name":"fee","type":"uint24"},{"internalType":"address","name":"recipient","type":"address"},{"internalType":"uint256","name":"deadline","type":"uint256"},{"internalType":"uint256","name":"amountIn","type":"uint256"},{"internalType":"uint256","name":"amountOutMinimum","type":"uint256"},{"internalType":"uint160","name":"sqrtPriceLimitX96","type":"uint160"}],"internalType":"struct ISwapRouter.ExactInputSingleParams","name":"params","type":"tuple"}],"name":"exactInputSingle","outputs":[{"internalType":"uint256","name":"amountOut","type":"uint256"}],"stateMutability":"payable","type":"function"}]')
+ROUTER_ABI = loads(b'[{"inputs":[{"components":[{"internalType":"address","name":"tokenIn","type":"address"},{"internalType":"address","name":"tokenOut","type":"address"},{"internalType":"uint24","name":"fee","type":"uint24"},{"internalType":"address","name":"recipient","type":"address"},{"internalType":"uint256","name":"deadline","type":"uint256"},{"internalType":"uint256","name":"amountIn","type":"uint256"},{"internalType":"uint256","name":"amountOutMinimum","type":"uint256"},{"internalType":"uint160","name":"sqrtPriceLimitX96","type":"uint160"}],"internalType":"struct ISwapRouter.ExactInputSingleParams","name":"params","type":"tuple"}],"name":"exactInputSingle","outputs":[{"internalType":"uint256","name":"amountOut","type":"uint256"}],"stateMutability":"payable","type":"function"}]')
+
+# Shared pool for overlapping independent RPC reads
+_EXEC = ThreadPoolExecutor(max_workers=8)
 
 
 class SafeSwap:
@@ -70,74 +101,140 @@ class SafeSwap:
 
         self.account = Account.from_key(pk)
         self.address = self.account.address
-        self.quoter = self.w3.eth.contract(
-            address=Web3.to_checksum_address(UNISWAP_QUOTER),
-            abi=QUOTER_ABI
-        )
-        self.router = self.w3.eth.contract(
-            address=Web3.to_checksum_address(UNISWAP_ROUTER),
-            abi=ROUTER_ABI
+
+        # Contract objects are built once per instance
+        self._checksums = CHECKSUMS
+        self.quoter = self.w3.eth.contract(address=self._checksums["QUOTER"], abi=QUOTER_ABI)
+        self.router = self.w3.eth.contract(address=self._checksums["ROUTER"], abi=ROUTER_ABI)
+        self._wmatic = self.w3.eth.contract(address=self._checksums["WMATIC"], abi=WMATIC_ABI)
+        self._erc20 = {
+            name: self.w3.eth.contract(address=self._checksums[name], abi=ERC20_ABI)
+            for name in TOKENS if name in self._checksums
+        }
+        # decimals() never changes; known tokens are pre-seeded
+        self._decimals_cache: dict[str, int] = {"USDC_E": 6, "NATIVE_USDC": 6, "WMATIC": 18, "POL": 18}
+        # Hot-path read calldata depends only on our address: encode it once
+        # and skip web3's per-call ABI encode/decode pipeline
+        self._balance_of_data = BALANCE_OF_SELECTOR + encode(["address"], [self.address])
+        self._allowance_data = ALLOWANCE_SELECTOR + encode(
+            ["address", "address"], [self.address, self._checksums["ROUTER"]]
         )
 
+    def _call_uint(self, to: str, data: bytes, state_override=None) -> int:
+        """Raw eth_call returning a single uint256."""
+        return decode_uint(self.w3.eth.call({'to': to, 'data': data}, "latest", state_override))
+
+    def _allowance(self, token: str, state_override=None) -> int:
+        """Router allowance for `token`."""
+        return self._call_uint(self._checksums[token], self._allowance_data, state_override)
+
     def get_balance(self, token: str) -> tuple:
         """Get balance of a token. Returns (raw_balance, decimals, readable_balance)"""
         if token == "POL":
             bal = self.w3.eth.get_balance(self.address)
             return bal, 18, bal / 1e18
 
-        addr = TOKENS.get(token)
-        if not addr:
+        contract = self._erc20.get(token)
+        if contract is None:
             raise ValueError(f"Unknown token: {token}")
 
-        contract = self.w3.eth.contract(
-            address=Web3.to_checksum_address(addr),
-            abi=ERC20_ABI
-        )
-        bal = contract.functions.balanceOf(self.address).call()
-        try:
-            decimals = contract.functions.decimals().call()
-        except:
-            decimals = 18 if token == "WMATIC" else 6
+        bal = self._call_uint(contract.address, self._balance_of_data)
+        decimals = self._decimals_cache.get(token)
+        if decimals is None:
+            decimals = self._decimals_cache[token] = contract.functions.decimals().call()
 
         return bal, decimals, bal / (10 ** decimals)
 
+    def get_balances(self, tokens) -> dict:
+        """
+        Readable balances for several tokens in one JSON-RPC batch POST.
+        Returns {token: readable_balance}; tokens whose read fails are omitted.
+        """
+        calls = []
+        for token in tokens:
+            if token == "POL":
+                calls.append(("eth_getBalance", [self.address, "latest"]))
+            else:
+                calls.append(eth_call(self._checksums[token], "0x" + self._balance_of_data.hex()))
+
+        balances = {}
+        for token, raw in zip(tokens, batch_rpc(RPC_URL, calls)):
+            raw = decode_uint(raw)
+            if raw is not None:
+                balances[token] = raw / (10 ** self._decimals_cache[token])
+        return balances
+
     def get_quote(self, token_in: str, token_out: str, amount_in: int) -> tuple:
         """
         Get best quote across multiple fee tiers.
         Returns (best_quote, best_fee, all_quotes)
         """
-        # Resolve addresses
-        addr_in = TOKENS.get(token_in)
-        addr_out = TOKENS.get(token_out)
-
-        if token_in == "POL":
-            addr_in = TOKENS["WMATIC"]
-        if token_out == "POL":
-            addr_out = TOKENS["WMATIC"]
+        # Resolve addresses (POL trades as WMATIC)
+        addr_in = self._checksums["WMATIC" if token_in == "POL" else token_in]
+        addr_out = self._checksums["WMATIC" if token_out == "POL" else token_out]
 
         quotes = {}
         best_quote = None
         best_fee = None
 
-        for fee in [100, 500, 3000, 10000]:  # 0.01%, 0.05%, 0.3%, 1%
-            try:
-                quote = self.quoter.functions.quoteExactInputSingle(
-                    Web3.to_checksum_address(addr_in),
-                    Web3.to_checksum_address(addr_out),
-                    fee,
-                    amount_in,
-                    0
-                ).call()
-                quotes[fee] = quote
-
-                if best_quote is None or quote > best_quote:
-                    best_quote = quote
-                    best_fee = fee
-            except Exception as e:
-                quotes[fee] = f"Error: {e}"
+        # All fee tiers in one Multicall3 eth_call; a tier without a pool
+        # reverts on its own instead of failing the batch
+        results = aggregate3(self.w3, [
+            (self.quoter.address, QUOTE_EXACT_INPUT_SINGLE_SELECTOR + encode(
+                ["address", "address", "uint24", "uint256", "uint160"],
+                [addr_in, addr_out, fee, amount_in, 0]
+            ))
+            for fee in FEE_TIERS
+        ], allow_failure=True)
+
+        for fee, data in zip(FEE_TIERS, results):
+            if data is None:
+                quotes[fee] = "Error: no pool / quote reverted"
+                continue
+            quote = decode_uint(data)
+            quotes[fee] = quote
+
+            if best_quote is None or quote > best_quote:
+                best_quote = quote
+                best_fee = fee
 
         return best_quote, best_fee, quotes
 
+    def _swap_calldata(self, params: tuple) -> str:
+        """exactInputSingle(params) calldata, without web3's ABI lookup."""
+        return "0x" + (EXACT_INPUT_SINGLE_SELECTOR + encode(EXACT_INPUT_SINGLE_PARAMS, [params])).hex()
+
+    def _simulate_swap(self, params: tuple, token: str):
+        """
+        eth_call exactInputSingle with the router's allowance for `token`
+        overridden to max in storage. True if it succeeds, False if it
+        reverts, None if it can't tell (unknown slot, no override support).
+        """
+        slot = ALLOWANCE_SLOTS.get(token)
+        if slot is None:
+            return None
+        token_addr = self._checksums[token]
+        key = allowance_storage_key(self.address, self._checksums["ROUTER"], slot)
+        override = {token_addr: {"stateDiff": {key: "0x" + "ff" * 32}}}
+        tx = {
+            'from': self.address,
+            'to': self.router.address,
+            'data': self._swap_calldata(params),
+        }
+        try:
+            self.w3.eth.call(tx, "latest", override)
+            return True
+        except ContractLogicError:
+            pass
+        except Exception:
+            return None
+        # Reverted: only trust that if the override really set the allowance
+        try:
+            allowance = self._allowance(token, override)
+        except Exception:
+            return None
+        return False if allowance == MAX_UINT256 else None
+
     def calculate_slippage(self, amount_in: int, amount_out: int,
                            decimals_in: int, decimals_out: int,
                            expected_rate: float = None) -> float:
@@ -200,8 +297,19 @@ class SafeSwap:
 
         amount_in_raw = int(amount * (10 ** decimals_in))
 
+        # The pre-swap reads don't depend on each other: start them all now
+        # and only block where a result is needed. POL is wrapped first, so
+        # the router allowance that matters is WMATIC's
+        balance_f = _EXEC.submit(self.get_balance, token_in)
+        quote_f = _EXEC.submit(self.get_quote, token_in, token_out, amount_in_raw)
+        if not quote_only:
+            approve_token = "WMATIC" if token_in == "POL" else token_in
+            allowance_f = _EXEC.submit(self._allowance, approve_token)
+            nonce_f = _EXEC.submit(self.w3.eth.get_transaction_count, self.address, 'pending')
+            gas_price_f = _EXEC.submit(lambda: self.w3.eth.gas_price)
+
         # Check balance
-        bal_raw, _, bal_readable = self.get_balance(token_in)
+        bal_raw, _, bal_readable = balance_f.result()
         if bal_raw < amount_in_raw:
             result["status"] = "error"
             result["error"] = f"Insufficient balance. Have {bal_readable}, need {amount}"
@@ -211,7 +319,7 @@ class SafeSwap:
 
         # Get quote
         print(f"[QUOTE] Getting quote for {amount} {token_in} -> {token_out}...")
-        best_quote, best_fee, all_quotes = self.get_quote(token_in, token_out, amount_in_raw)
+        best_quote, best_fee, all_quotes = quote_f.result()
 
         if best_quote is None:
             result["status"] = "error"
@@ -222,7 +330,8 @@ class SafeSwap:
         amount_out = best_quote / (10 ** decimals_out)
         result["amount_out"] = amount_out
         result["best_fee"] = f"{best_fee/10000}%"
-        result["all_quotes"] = {f"{k/10000}%": v/(10**decimals_out) if isinstance(v, int) else v
+        scale = 10 ** decimals_out
+        result["all_quotes"] = {f"{k/10000}%": v / scale if isinstance(v, int) else v
                                 for k, v in all_quotes.items()}
 
         # Calculate slippage
@@ -249,25 +358,74 @@ class SafeSwap:
         # Execute swap
         print(f"[SWAP] Executing swap...")
 
+        # One nonce/gas price read for the whole wrap/approve/swap/unwrap
+        # sequence; nonces are assigned locally in send order
+        nonce = nonce_f.result()
+        base_gp = gas_price_f.result()
+
         try:
-            # Handle POL -> token (need to wrap first)
-            if token_in == "POL":
-                print("[WRAP] Wrapping POL to WMATIC...")
-                wmatic = self.w3.eth.contract(
-                    address=Web3.to_checksum_address(TOKENS["WMATIC"]),
-                    abi=WMATIC_ABI
-                )
+            min_out = int(best_quote * 0.97)  # 3% slippage tolerance
+            token_out_addr = self._checksums[token_out if token_out != "POL" else "WMATIC"]
+
+            params = (
+                self._checksums[approve_token],
+                token_out_addr,
+                best_fee,
+                self.address,
+                int(time.time()) + 600,
+                amount_in_raw,
+                min_out,
+                0
+            )
 
-                wrap_tx = wmatic.functions.deposit().build_transaction({
+            # Everything but the unwrap amount is known now: build the
+            # wrap/approve/swap txs with consecutive nonces and sign them on
+            # the pool, so signing overlaps the first send and receipt wait.
+            # The allowance was read up front; wrapping doesn't change it
+            wrap = token_in == "POL"
+            approve = allowance_f.result() < amount_in_raw
+            txs = {}
+            if wrap:
+                txs["wrap"] = self._wmatic.functions.deposit().build_transaction({
                     'from': self.address,
-                    'nonce': self.w3.eth.get_transaction_count(self.address),
+                    'nonce': nonce,
                     'gas': 100000,
-                    'gasPrice': self.w3.eth.gas_price,
+                    'gasPrice': base_gp,
                     'value': amount_in_raw
                 })
-                signed = self.account.sign_transaction(wrap_tx)
-                tx_hash = self.w3.eth.send_raw_transaction(signed.raw_transaction)
-                receipt = self.w3.eth.wait_for_transaction_receipt(tx_hash, timeout=120)
+                nonce += 1
+            if approve:
+                txs["approve"] = {
+                    'from': self.address,
+                    'to': self._checksums[approve_token],
+                    'data': approve_calldata(
+                        self._checksums["ROUTER"],
+                        MAX_UINT256 if INFINITE_APPROVAL else amount_in_raw
+                    ),
+                    'nonce': nonce,
+                    'gas': 100000,
+                    'gasPrice': base_gp,
+                    'chainId': CHAIN_ID
+                }
+                nonce += 1
+            txs["swap"] = {
+                'from': self.address,
+                'to': self._checksums["ROUTER"],
+                'data': self._swap_calldata(params),
+                'nonce': nonce,
+                'gas': 400000,
+                'gasPrice': int(base_gp * 1.5),
+                'value': 0,
+                'chainId': CHAIN_ID
+            }
+            nonce += 1
+            signed = {name: _EXEC.submit(self.account.sign_transaction, tx) for name, tx in txs.items()}
+
+            # Handle POL -> token (need to wrap first)
+            if wrap:
+                print("[WRAP] Wrapping POL to WMATIC...")
+                tx_hash = self.w3.eth.send_raw_transaction(signed["wrap"].result().raw_transaction)
+                receipt = wait_receipt(self.w3, tx_hash, timeout=120)
                 if receipt['status'] != 1:
                     result["status"] = "error"
                     result["error"] = "Wrap failed"
@@ -276,64 +434,42 @@ class SafeSwap:
                 token_in = "WMATIC"
 
             # Approve router
-            token_addr = TOKENS.get(token_in)
-            token_contract = self.w3.eth.contract(
-                address=Web3.to_checksum_address(token_addr),
-                abi=ERC20_ABI
-            )
-
-            allowance = token_contract.functions.allowance(
-                self.address, UNISWAP_ROUTER
-            ).call()
+            approve_hash = None
 
-            if allowance < amount_in_raw:
-                print("[APPROVE] Approving router...")
-                approve_tx = token_contract.functions.approve(
-                    Web3.to_checksum_address(UNISWAP_ROUTER),
-                    amount_in_raw
-                ).build_transaction({
-                    'from': self.address,
-                    'nonce': self.w3.eth.get_transaction_count(self.address),
-                    'gas': 100000,
-                    'gasPrice': self.w3.eth.gas_price
-                })
-                signed = self.account.sign_transaction(approve_tx)
-                tx_hash = self.w3.eth.send_raw_transaction(signed.raw_transaction)
-                receipt = self.w3.eth.wait_for_transaction_receipt(tx_hash, timeout=120)
-                if receipt['status'] != 1:
+            if approve:
+                # Dry-run the swap as if already approved: if it would revert
+                # anyway, don't spend gas on the approve
+                simulated = self._simulate_swap(params, token_in)
+                if simulated is False:
                     result["status"] = "error"
-                    result["error"] = "Approval failed"
+                    result["error"] = "Swap simulation reverted (not approving)"
                     return result
-                print(f"[APPROVE] Done: {tx_hash.hex()}")
 
-            # Execute swap
-            min_out = int(best_quote * 0.97)  # 3% slippage tolerance
-            token_out_addr = TOKENS.get(token_out if token_out != "POL" else "WMATIC")
-
-            params = (
-                Web3.to_checksum_address(token_addr),
-                Web3.to_checksum_address(token_out_addr),
-                best_fee,
-                self.address,
-                int(time.time()) + 600,
-                amount_in_raw,
-                min_out,
-                0
-            )
-
-            swap_tx = self.router.functions.exactInputSingle(params).build_transaction({
-                'from': self.address,
-                'nonce': self.w3.eth.get_transaction_count(self.address),
-                'gas': 400000,
-                'gasPrice': int(self.w3.eth.gas_price * 1.5),
-                'value': 0
-            })
+                print("[APPROVE] Approving router...")
+                tx_hash = self.w3.eth.send_raw_transaction(signed["approve"].result().raw_transaction)
+                if simulated:
+                    # Nonce order guarantees the approve executes first; the
+                    # swap goes out now and both receipts are awaited together
+                    approve_hash = tx_hash
+                    print(f"[APPROVE] Sent: {tx_hash.hex()}")
+                else:
+                    receipt = wait_receipt(self.w3, tx_hash, timeout=120)
+                    if receipt['status'] != 1:
+                        result["status"] = "error"
+                        result["error"] = "Approval failed"
+                        return result
+                    print(f"[APPROVE] Done: {tx_hash.hex()}")
 
-            signed = self.account.sign_transaction(swap_tx)
-            tx_hash = self.w3.eth.send_raw_transaction(signed.raw_transaction)
+            # Execute swap
+            tx_hash = self.w3.eth.send_raw_transaction(signed["swap"].result().raw_transaction)
             print(f"[SWAP] TX: {tx_hash.hex()}")
 
-            receipt = self.w3.eth.wait_for_transaction_receipt(tx_hash, timeout=300)
+            if approve_hash:
+                # Approve and swap are both in flight: confirm them together
+                receipts = wait_receipts(self.w3, [approve_hash, tx_hash], timeout=300)
+                approve_receipt, receipt = receipts[approve_hash], receipts[tx_hash]
+            else:
+                receipt = wait_receipt(self.w3, tx_hash, timeout=300)
 
             if receipt['status'] == 1:
                 result["status"] = "success"
@@ -342,21 +478,19 @@ class SafeSwap:
                 # Handle token -> POL (need to unwrap)
                 if token_out == "POL":
                     print("[UNWRAP] Unwrapping WMATIC to POL...")
-                    wmatic = self.w3.eth.contract(
-                        address=Web3.to_checksum_address(TOKENS["WMATIC"]),
-                        abi=WMATIC_ABI
-                    )
-                    wmatic_bal = wmatic.functions.balanceOf(self.address).call()
+                    # Unwrap exactly what the swap paid out (no balanceOf read, and
+                    # unrelated WMATIC in the wallet is left alone)
+                    wmatic_out = transfers_to(receipt, self._checksums["WMATIC"], self.address) or min_out
 
-                    unwrap_tx = wmatic.functions.withdraw(wmatic_bal).build_transaction({
+                    unwrap_tx = self._wmatic.functions.withdraw(wmatic_out).build_transaction({
                         'from': self.address,
-                        'nonce': self.w3.eth.get_transaction_count(self.address),
+                        'nonce': nonce,
                         'gas': 100000,
-                        'gasPrice': self.w3.eth.gas_price
+                        'gasPrice': base_gp
                     })
                     signed = self.account.sign_transaction(unwrap_tx)
                     unwrap_hash = self.w3.eth.send_raw_transaction(signed.raw_transaction)
-                    self.w3.eth.wait_for_transaction_receipt(unwrap_hash, timeout=120)
+                    wait_receipt(self.w3, unwrap_hash, timeout=120)
                     print(f"[UNWRAP] Done: {unwrap_hash.hex()}")
 
                 # Get final balance
@@ -368,6 +502,8 @@ class SafeSwap:
                 result["status"] = "error"
                 result["error"] = "Swap transaction reverted"
                 result["tx_hash"] = tx_hash.hex()
+                if approve_hash and approve_receipt['status'] != 1:
+                    result["error"] = "Approval failed"
 
         except Exception as e:
             result["status"] = "error"
@@ -387,13 +523,20 @@ def main():
     print("=" * 50)
     print("CURRENT BALANCES")
     print("=" * 50)
-    for token in ["POL", "WMATIC", "USDC_E", "NATIVE_USDC"]:
-        try:
-            _, _, bal = swapper.get_balance(token)
-            symbol = "$" if "USDC" in token else ""
-            print(f"{token}: {symbol}{bal:.4f}")
-        except:
-            pass
+    tokens = ["POL", "WMATIC", "USDC_E", "NATIVE_USDC"]
+    try:
+        balances = swapper.get_balances(tokens)
+    except Exception:
+        # Batch POST failed outright; fall back to one read per token
+        balances = {}
+        for token in tokens:
+            try:
+                balances[token] = swapper.get_balance(token)[2]
+            except:
+                pass
+    for token, bal in balances.items():
+        symbol = "$" if "USDC" in token else ""
+        print(f"{token}: {symbol}{bal:.4f}")
     print("=" * 50)
 
     cmd = sys.argv[1].lower()
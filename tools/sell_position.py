@@ -2,6 +2,9 @@
 import os
 import sys
 import time
+import random
+import threading
+from concurrent.futures import ThreadPoolExecutor
 from dotenv import load_dotenv
 from py_clob_client.client import ClobClient
 from py_clob_client.clob_types import ApiCreds, OrderArgs, BalanceAllowanceParams, AssetType, OrderType
@@ -17,16 +20,26 @@ MAKER_ADDRESS = "0xb22028EA4E841CA321eb917C706C931a94b564AB"
 TARGET_TOKEN = "65596524896985010415844814777069255362767748488616308434723608750130614059462"
 PROXY_URL = os.getenv("PROXY_URL", "")
 SYS_PROXIES = {"https": PROXY_URL, "http": PROXY_URL}
+BACKOFF_START = 0.25  # seconds; doubles after each failed attempt
+BACKOFF_MAX = 8.0
 
 # --- PROXY PATCH ---
-session = cffi_requests.Session(impersonate="chrome110", proxies=SYS_PROXIES)
-session.headers = {"Referer": "https://polymarket.com/", "Origin": "https://polymarket.com"}
+# Keep-alive sessions (chrome120 negotiates HTTP/2) carrying the browser
+# headers, so calls only pass the CLOB auth headers. curl_cffi sessions are
+# not thread-safe and the balance/book reads run on worker threads, so keep
+# one session per thread.
+BROWSER_HEADERS = {"Referer": "https://polymarket.com/", "Origin": "https://polymarket.com"}
+_local = threading.local()
+def _session():
+    if not hasattr(_local, "session"):
+        _local.session = cffi_requests.Session(impersonate="chrome120", proxies=SYS_PROXIES, headers=BROWSER_HEADERS, timeout=30)
+    return _local.session
+
 def patched_request(endpoint, method, headers=None, data=None, **kwargs):
-    final_headers = {"Referer": "https://polymarket.com/", "Origin": "https://polymarket.com"}
-    if headers: final_headers.update(headers)
-    if method == "GET": resp = session.get(endpoint, headers=final_headers)
-    elif method == "POST": resp = session.post(endpoint, headers=final_headers, json=data)
-    elif method == "DELETE": resp = session.delete(endpoint, headers=final_headers)
+    session = _session()
+    if method == "GET": resp = session.get(endpoint, headers=headers)
+    elif method == "POST": resp = session.post(endpoint, headers=headers, json=data)
+    elif method == "DELETE": resp = session.delete(endpoint, headers=headers)
     else: return {}
     return resp.json()
 _clob_helpers.request = patched_request
@@ -42,9 +55,14 @@ def main():
     # Assumed stopped via systemctl command
 
     # 2. CHECK & LOOP
-    for i in range(3): # Try 3 times
+    pool = ThreadPoolExecutor(max_workers=2)
+    delay = BACKOFF_START
+    for i in range(5): # Try 5 times
         try:
-            bal_resp = client.get_balance_allowance(BalanceAllowanceParams(asset_type=AssetType.CONDITIONAL, token_id=TARGET_TOKEN))
+            # Balance and book are independent reads: fetch them concurrently
+            bal_f = pool.submit(client.get_balance_allowance, BalanceAllowanceParams(asset_type=AssetType.CONDITIONAL, token_id=TARGET_TOKEN))
+            book_f = pool.submit(client.get_order_book, TARGET_TOKEN)
+            bal_resp = bal_f.result()
             raw_balance = float(bal_resp.get('balance', '0'))
             shares = raw_balance / (10 ** 6)
             print(f"[Attempt {i+1}] Current Position: {shares} shares")
@@ -53,8 +71,7 @@ def main():
                 print("✅ Position successfully closed.")
                 sys.exit(0)
             
-            # Fetch Book
-            book = client.get_order_book(TARGET_TOKEN)
+            book = book_f.result()
             if not book.bids:
                 print("❌ No Bids available to sell into!")
                 sys.exit(1)
@@ -81,7 +98,11 @@ def main():
             
         except Exception as e:
             print(f"❌ Error: {e}")
-            time.sleep(1)
+            # Capped exponential backoff with jitter; back off harder when rate limited
+            if getattr(e, "status_code", None) == 429 or "429" in str(e):
+                delay = min(delay * 2, BACKOFF_MAX)
+            time.sleep(delay + random.uniform(0, delay / 2))
+            delay = min(delay * 2, BACKOFF_MAX)
 
     print("⚠️  Liquidation process finished (Verify outcome).")
 
@@ -25,7 +25,6 @@ TOKEN_ID = "51338236787729560681434534660841415073585974762690814047670810862722
 from curl_cffi import requests as cffi_requests
 
 SYS_PROXIES = {"https": PROXY_URL, "http": PROXY_URL}
-_cffi_session = cffi_requests.Session(impersonate="chrome110", proxies=SYS_PROXIES)
 
 BROWSER_HEADERS = {
     "User-Agent": "curl/7.68.0",
@@ -34,18 +33,22 @@ BROWSER_HEADERS = {
     "Referer": "https://polymarket.com/",
 }
 
+# Headers and timeout live on the keep-alive session (chrome120 negotiates
+# HTTP/2), so each call only passes the CLOB auth headers
+_cffi_session = cffi_requests.Session(
+    impersonate="chrome120",
+    proxies=SYS_PROXIES,
+    headers={**BROWSER_HEADERS, "Content-Type": "application/json"},
+    timeout=30,
+)
+
 def _cffi_request(endpoint: str, method: str, headers=None, data=None):
     """Replacement request function using curl_cffi for TLS spoofing."""
     from py_clob_client.exceptions import PolyApiException
 
-    final_headers = BROWSER_HEADERS.copy()
-    final_headers.update({"Content-Type": "application/json"})
-    if headers:
-        final_headers.update(headers)
-
     try:
         if method == "GET":
-            resp = _cffi_session.get(endpoint, headers=final_headers, timeout=30)
+            resp = _cffi_session.get(endpoint, headers=headers)
         elif method == "POST":
             json_payload = None
             if isinstance(data, str):
@@ -57,11 +60,11 @@ def _cffi_request(endpoint: str, method: str, headers=None, data=None):
                 json_payload = data
 
             if json_payload:
-                resp = _cffi_session.post(endpoint, headers=final_headers, json=json_payload, timeout=30)
+                resp = _cffi_session.post(endpoint, headers=headers, json=json_payload)
             else:
-                resp = _cffi_session.post(endpoint, headers=final_headers, data=data, timeout=30)
+                resp = _cffi_session.post(endpoint, headers=headers, data=data)
         elif method == "DELETE":
-            resp = _cffi_session.delete(endpoint, headers=final_headers, json=data, timeout=30)
+            resp = _cffi_session.delete(endpoint, headers=headers, json=data)
         else:
             raise ValueError(f"Unsupported method: {method}")
 
@@ -1,35 +1,29 @@
-import os
+import shutil
 import subprocess
-import signal
+
+PORTS = [8000, 8001, 8002, 8003, 8005]
+NAME_PATTERN = "python|uvicorn|hardened_run"
+
+def run_if_available(cmd):
+    """Run cmd, or print a skip notice if its binary isn't installed (e.g. python:3.11-slim)."""
+    if shutil.which(cmd[0]) is None:
+        print(f"{cmd[0]} not found, skipping")
+        return
+    try:
+        subprocess.run(cmd, check=False)
+    except OSError as e:
+        print(f"{cmd[0]} failed ({e}), skipping")
 
 def super_cleanup():
     print("Super Cleanup Initializing...")
-    # 1. Kill by port
-    for port in [8000, 8001, 8002, 8003, 8005]:
-        try:
-            cmd = f"lsof -t -i :{port}"
-            pids = subprocess.check_output(cmd, shell=True).decode().strip().split("\n")
-            for pid in pids:
-                if pid:
-                    print(f"Killing PID {pid} on port {port}")
-                    os.kill(int(pid), signal.SIGKILL)
-        except:
-            pass
+    # 1. Kill by port (one fuser call covers every port)
+    print(f"Killing processes on ports {PORTS}")
+    run_if_available(["fuser", "-k", "-9"] + [f"{port}/tcp" for port in PORTS])
 
-    # 2. Kill by name
-    try:
-        cmd = "ps aux | grep -Ei 'python|uvicorn|hardened_run' | grep -v grep | awk '{print $2}'"
-        pids = subprocess.check_output(cmd, shell=True).decode().strip().split("\n")
-        for pid in pids:
-            if pid:
-                print(f"Killing PID {pid} (process name match)")
-                try:
-                    os.kill(int(pid), signal.SIGKILL)
-                except:
-                    pass
-    except:
-        pass
+    # 2. Kill by name (pkill matches the full command line, like the old ps | grep).
+    # This includes the interpreter running this script, so report first.
     print("Cleanup Finished.")
+    run_if_available(["pkill", "-9", "-i", "-f", NAME_PATTERN])
 
 if __name__ == "__main__":
     super_cleanup()
@@ -8,6 +8,8 @@ import sys
 from web3 import Web3
 from eth_account import Account
 from dotenv import load_dotenv
+from _abis import transfers_to
+from _rpc import batch_rpc, connect_fastest, decode_uint, eth_call, wait_receipt, wait_receipts
 
 load_dotenv()
 
@@ -25,6 +27,16 @@ USDC_NATIVE = "0x3c499c542cEF5E3811e1192ce70d8cC03d5c3359"  # Native USDC (6 dec
 # QuickSwap Router V2
 QUICKSWAP_ROUTER = "0xa5E0829CaCEd8fFDD4De3c43696c57F7D7A678ff"
 
+# QuickSwap USDC.e/USDC pair: CREATE2 from factory 0x5757371414417b8C6CAad45bAeF941aBc7d3Ab32,
+# so it never changes. token0 is USDC.e (the lower address).
+QUICKSWAP_PAIR = "0x2FB3b855fb2E3F668de6fC82f026a7ab56F6B067"
+GET_RESERVES_SELECTOR = "0x0902f1ac"  # getReserves()
+
+# Checksummed once at import instead of on every contract construction
+USDC_E_CS = Web3.to_checksum_address(USDC_E)
+USDC_NATIVE_CS = Web3.to_checksum_address(USDC_NATIVE)
+QUICKSWAP_ROUTER_CS = Web3.to_checksum_address(QUICKSWAP_ROUTER)
+
 # Minimal ABIs
 ERC20_ABI = [
     {"constant": True, "inputs": [{"name": "_owner", "type": "address"}], "name": "balanceOf", "outputs": [{"name": "balance", "type": "uint256"}], "type": "function"},
@@ -59,21 +71,18 @@ ROUTER_ABI = [
     }
 ]
 
+def get_amount_out(amount_in, reserve_in, reserve_out):
+    """UniswapV2Library.getAmountOut (0.3% fee), same integer math as the router."""
+    amount_in_with_fee = amount_in * 997
+    return amount_in_with_fee * reserve_out // (reserve_in * 1000 + amount_in_with_fee)
+
 def connect_web3():
-    """Connect to Polygon RPC with failover."""
-    from web3.middleware import ExtraDataToPOAMiddleware
-
-    for rpc in RPC_URLS:
-        try:
-            w3 = Web3(Web3.HTTPProvider(rpc))
-            # Inject POA middleware for Polygon
-            w3.middleware_onion.inject(ExtraDataToPOAMiddleware, layer=0)
-            if w3.is_connected():
-                print(f"[CONNECTED] {rpc}")
-                return w3
-        except Exception as e:
-            print(f"[FAILED] {rpc}: {e}")
-    raise Exception("All RPCs failed")
+    """Connect to the first Polygon RPC that answers (all probed in parallel)."""
+    w3 = connect_fastest(RPC_URLS, poa=True)
+    if w3 is None:
+        raise Exception("All RPCs failed")
+    print(f"[CONNECTED] {w3.provider.endpoint_uri}")
+    return w3
 
 def swap_usdc_e_to_native(amount_to_swap=None):
     """
@@ -95,15 +104,30 @@ def swap_usdc_e_to_native(amount_to_swap=None):
     print(f"[WALLET] {address}")
 
     # Load contracts
-    usdc_e_contract = w3.eth.contract(address=Web3.to_checksum_address(USDC_E), abi=ERC20_ABI)
-    usdc_native_contract = w3.eth.contract(address=Web3.to_checksum_address(USDC_NATIVE), abi=ERC20_ABI)
-    router = w3.eth.contract(address=Web3.to_checksum_address(QUICKSWAP_ROUTER), abi=ROUTER_ABI)
+    usdc_e_contract = w3.eth.contract(address=USDC_E_CS, abi=ERC20_ABI)
+    usdc_native_contract = w3.eth.contract(address=USDC_NATIVE_CS, abi=ERC20_ABI)
+    router = w3.eth.contract(address=QUICKSWAP_ROUTER_CS, abi=ROUTER_ABI)
+
+    # Every pre-swap read in one JSON-RPC batch round-trip: both balances,
+    # router allowance, gas price, nonce, the latest block (for the deadline)
+    # and the pair reserves (for the quote)
+    rpc_url = w3.provider.endpoint_uri
+    (usdc_e_balance_raw, usdc_native_balance_raw, allowance,
+     gas_price, nonce, latest_block, reserves) = batch_rpc(rpc_url, [
+        eth_call(usdc_e_contract.address, usdc_e_contract.encode_abi("balanceOf", args=[address])),
+        eth_call(usdc_native_contract.address, usdc_native_contract.encode_abi("balanceOf", args=[address])),
+        eth_call(usdc_e_contract.address, usdc_e_contract.encode_abi("allowance", args=[address, QUICKSWAP_ROUTER_CS])),
+        ("eth_gasPrice", []),
+        ("eth_getTransactionCount", [address, "latest"]),
+        ("eth_getBlockByNumber", ["latest", False]),
+        eth_call(QUICKSWAP_PAIR, GET_RESERVES_SELECTOR),
+    ])
+    usdc_e_balance_raw, usdc_native_balance_raw, allowance, gas_price, nonce = map(
+        decode_uint, (usdc_e_balance_raw, usdc_native_balance_raw, allowance, gas_price, nonce)
+    )
 
     # Check balances
-    usdc_e_balance_raw = usdc_e_contract.functions.balanceOf(address).call()
     usdc_e_balance = usdc_e_balance_raw / 1e6
-
-    usdc_native_balance_raw = usdc_native_contract.functions.balanceOf(address).call()
     usdc_native_balance = usdc_native_balance_raw / 1e6
 
     print(f"[BALANCE] USDC.e: {usdc_e_balance:.6f}")
@@ -122,46 +146,48 @@ def swap_usdc_e_to_native(amount_to_swap=None):
     amount_in_human = amount_in / 1e6
     print(f"[SWAP] Amount: {amount_in_human:.6f} USDC.e")
 
-    # Check/Approve Router
-    allowance = usdc_e_contract.functions.allowance(address, QUICKSWAP_ROUTER).call()
+    # Check/Approve Router. USDC.e has no EIP-2612 permit and the V2 router
+    # no selfPermit, so a short allowance still needs an approve tx, but the
+    # swap goes out right behind it (next nonce) instead of a block later
+    approve_hash = None
     if allowance < amount_in:
         print(f"[APPROVE] Approving QuickSwap Router...")
         approve_tx = usdc_e_contract.functions.approve(
-            QUICKSWAP_ROUTER,
+            QUICKSWAP_ROUTER_CS,
             2**256 - 1  # Max approval
         ).build_transaction({
             'from': address,
             'gas': 100000,
-            'gasPrice': w3.eth.gas_price,
-            'nonce': w3.eth.get_transaction_count(address)
+            'gasPrice': gas_price,
+            'nonce': nonce
         })
 
         signed_approve = account.sign_transaction(approve_tx)
         approve_hash = w3.eth.send_raw_transaction(signed_approve.raw_transaction)
+        nonce += 1
         print(f"[APPROVE] TX: {approve_hash.hex()}")
 
-        receipt = w3.eth.wait_for_transaction_receipt(approve_hash, timeout=120)
-        if receipt['status'] != 1:
-            print("[ERROR] Approval failed")
-            return
-        print(f"[APPROVE] Success")
-
-    # Get expected output
-    path = [USDC_E, USDC_NATIVE]
+    # Get expected output from the reserves read above; the router's
+    # getAmountsOut is only a fallback if the pair read came back empty
+    path = [USDC_E_CS, USDC_NATIVE_CS]
     try:
-        amounts_out = router.functions.getAmountsOut(amount_in, path).call()
-        expected_out = amounts_out[1] / 1e6
+        if reserves and len(reserves) >= 130:
+            reserve_in, reserve_out = int(reserves[2:66], 16), int(reserves[66:130], 16)
+            amount_out = get_amount_out(amount_in, reserve_in, reserve_out)
+        else:
+            amount_out = router.functions.getAmountsOut(amount_in, path).call()[1]
+        expected_out = amount_out / 1e6
         print(f"[QUOTE] Expected output: {expected_out:.6f} Native USDC")
 
         # Set slippage to 0.5%
-        min_out = int(amounts_out[1] * 0.995)
+        min_out = int(amount_out * 0.995)
     except Exception as e:
         print(f"[WARN] Could not get quote: {e}")
         # Set conservative slippage
         min_out = int(amount_in * 0.99)  # 1% slippage
 
     # Execute Swap
-    deadline = w3.eth.get_block('latest')['timestamp'] + 600  # 10 minutes
+    deadline = decode_uint(latest_block['timestamp']) + 600  # 10 minutes
 
     print(f"[SWAP] Executing swap...")
     swap_tx = router.functions.swapExactTokensForTokens(
@@ -173,8 +199,8 @@ def swap_usdc_e_to_native(amount_to_swap=None):
     ).build_transaction({
         'from': address,
         'gas': 300000,
-        'gasPrice': int(w3.eth.gas_price * 1.2),  # 20% boost
-        'nonce': w3.eth.get_transaction_count(address)
+        'gasPrice': int(gas_price * 1.2),  # 20% boost
+        'nonce': nonce  # tracked locally: no re-query racing the approve
     })
 
     signed_swap = account.sign_transaction(swap_tx)
@@ -182,18 +208,26 @@ def swap_usdc_e_to_native(amount_to_swap=None):
     print(f"[SWAP] TX: {swap_hash.hex()}")
     print(f"[SWAP] Waiting for confirmation...")
 
-    receipt = w3.eth.wait_for_transaction_receipt(swap_hash, timeout=180)
+    if approve_hash is None:
+        receipt = wait_receipt(w3, swap_hash, timeout=180)
+    else:
+        receipts = wait_receipts(w3, [approve_hash, swap_hash], timeout=180)
+        if receipts[approve_hash]['status'] != 1:
+            print("[ERROR] Approval failed")
+            return
+        print(f"[APPROVE] Success")
+        receipt = receipts[swap_hash]
 
     if receipt['status'] == 1:
         print(f"[SUCCESS] Swap complete!")
 
-        # Check new balances
-        new_usdc_e = usdc_e_contract.functions.balanceOf(address).call() / 1e6
-        new_native = usdc_native_contract.functions.balanceOf(address).call() / 1e6
+        # Amount received comes from the swap's own Transfer log; the new
+        # balances follow from it without re-reading either token
+        received = transfers_to(receipt, USDC_NATIVE_CS, address) / 1e6
 
-        print(f"[NEW BALANCE] USDC.e: {new_usdc_e:.6f}")
-        print(f"[NEW BALANCE] Native USDC: {new_native:.6f}")
-        print(f"[RECEIVED] {new_native - usdc_native_balance:.6f} Native USDC")
+        print(f"[NEW BALANCE] USDC.e: {usdc_e_balance - amount_in_human:.6f}")
+        print(f"[NEW BALANCE] Native USDC: {usdc_native_balance + received:.6f}")
+        print(f"[RECEIVED] {received:.6f} Native USDC")
     else:
         print(f"[ERROR] Swap failed")
         print(f"[DEBUG] Receipt: {receipt}")
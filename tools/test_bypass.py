@@ -1,13 +1,18 @@
 
-import os
+import functools
 import json
+import os
 import sys
+import time
+from concurrent.futures import ThreadPoolExecutor
 from curl_cffi import requests as cffi_requests
 from py_clob_client.constants import POLYGON
 from py_clob_client.client import ClobClient
 from py_clob_client.clob_types import OrderArgs, OrderType, ApiCreds
 from py_clob_client.order_builder.constants import BUY
 from dotenv import load_dotenv
+from _fastjson import loads
+from _rpc import connect_fastest
 
 # Load Env
 load_dotenv("/app/hft/.env")
@@ -18,6 +23,8 @@ TOKEN_ADDRESS_USDC_E = "0x2791Bca1f2de4661ED88A30C99A7a9449Aa84174"
 # USDC (Native) on Polygon
 TOKEN_ADDRESS_NATIVE = "0x3c499c542cEF5E3811e1192ce70d8cC03d5c3359"
 
+RPC_URLS = ["https://polygon-rpc.com", "https://1rpc.io/matic", "https://rpc.ankr.com/polygon"]
+
 # Verify Env
 pk = os.getenv("POLYMARKET_PRIVATE_KEY")
 if not pk:
@@ -44,8 +51,8 @@ def patched_post(url, headers=None, data=None, **kwargs):
     # Force JSON
     if data and isinstance(data, str):
         try:
-            kwargs['json'] = json.loads(data)
-        except:
+            kwargs['json'] = loads(data)
+        except ValueError:
             kwargs['data'] = data
     elif data:
         kwargs['json'] = data
@@ -55,7 +62,7 @@ def patched_post(url, headers=None, data=None, **kwargs):
         if resp.status_code != 200:
             print(f"[FAIL] {resp.status_code} | {resp.text}")
         else:
-            print(f"[SUCCESS] {resp.json()}")
+            print(f"[SUCCESS] {loads(resp.content)}")
         return resp
     except Exception as e:
         print(f"[CRITICAL] {e}")
@@ -63,7 +70,18 @@ def patched_post(url, headers=None, data=None, **kwargs):
 
 # Monkey Patch
 import py_clob_client.http_helpers.helpers as _clob_helpers
-_clob_helpers.request = lambda url, method, headers=None, data=None, **kwargs: patched_post(url, headers=headers, data=data, **kwargs) if method == "POST" else session.request(method, url, headers=headers, json=data, **kwargs).json()
+DISPATCH = {"GET": session.get, "DELETE": session.delete}
+
+def patched_request(endpoint, method, headers=None, data=None, **kwargs):
+    # Every method goes through the impersonating session and, like the
+    # stock helper, hands back the decoded body
+    if method == "POST":
+        resp = patched_post(endpoint, headers=headers, data=data, **kwargs)
+    else:
+        resp = DISPATCH[method](endpoint, headers=headers, json=data, **kwargs)
+    return loads(resp.content)
+
+_clob_helpers.request = patched_request
 
 print("[TEST] Initializing Client...")
 creds = ApiCreds(
@@ -88,47 +106,75 @@ try:
 except:
     pass
 
-print("[TEST] Fetching Balances...")
-try:
-    # Manual Web3 Balance Check for diagnostic
-    from web3 import Web3
-    w3 = Web3(Web3.HTTPProvider("https://polygon-rpc.com"))
+def check_balances():
+    print("[TEST] Fetching Balances...")
+    try:
+        # Manual Web3 Balance Check for diagnostic
+        # First of several public RPCs to answer, so one dead endpoint can't stall the check
+        w3 = connect_fastest(RPC_URLS, request_timeout=5)
+        if w3 is None:
+            raise ConnectionError(f"no RPC reachable: {RPC_URLS}")
     
-    # USDC.e
-    contract_e = w3.eth.contract(address=w3.to_checksum_address(TOKEN_ADDRESS_USDC_E), abi=[{"constant":True,"inputs":[{"name":"_owner","type":"address"}],"name":"balanceOf","outputs":[{"name":"balance","type":"uint256"}],"payable":False,"type":"function"}])
-    bal_e = contract_e.functions.balanceOf(client.signer.address()).call()
-    print(f"[TEST] USDC.e Balance (EOA): {bal_e / 1e6}")
+        # USDC.e
+        contract_e = w3.eth.contract(address=w3.to_checksum_address(TOKEN_ADDRESS_USDC_E), abi=[{"constant":True,"inputs":[{"name":"_owner","type":"address"}],"name":"balanceOf","outputs":[{"name":"balance","type":"uint256"}],"payable":False,"type":"function"}])
+        bal_e = contract_e.functions.balanceOf(client.signer.address()).call()
+        print(f"[TEST] USDC.e Balance (EOA): {bal_e / 1e6}")
     
-    # Native USDC
-    contract_n = w3.eth.contract(address=w3.to_checksum_address(TOKEN_ADDRESS_NATIVE), abi=[{"constant":True,"inputs":[{"name":"_owner","type":"address"}],"name":"balanceOf","outputs":[{"name":"balance","type":"uint256"}],"payable":False,"type":"function"}])
-    bal_n = contract_n.functions.balanceOf(client.signer.address()).call()
-    print(f"[TEST] Native USDC Balance (EOA): {bal_n / 1e6}")
-except Exception as e:
-    print(f"[TEST] Balance Check Error: {e}")
+        # Native USDC
+        contract_n = w3.eth.contract(address=w3.to_checksum_address(TOKEN_ADDRESS_NATIVE), abi=[{"constant":True,"inputs":[{"name":"_owner","type":"address"}],"name":"balanceOf","outputs":[{"name":"balance","type":"uint256"}],"payable":False,"type":"function"}])
+        bal_n = contract_n.functions.balanceOf(client.signer.address()).call()
+        print(f"[TEST] Native USDC Balance (EOA): {bal_n / 1e6}")
+    except Exception as e:
+        print(f"[TEST] Balance Check Error: {e}")
 
-print("[TEST] Fetching Market Data (Gamma API)...")
-try:
-    token_id = "65596524896985010415844814777069255362767748488616308434723608750130614059462"
-    # Gamma API uses hash or slug usually, but let's try searching by token_id via events or similar
-    # The token_id is a boolean outcome token.
-    # We can try to get the market via CLOB API again but ensuring correct endpoint?
-    # Actually, simpler: Use requests to get Clob Market
-    resp = session.get(f"https://clob.polymarket.com/sampling-simplified-markets")
-    if resp.status_code == 200:
-        markets = resp.json().get('data', []) or resp.json()
-        found = False
-        for m in markets:
-            if m.get('token_id') == token_id or m.get('asset_id') == token_id:
-                print(f"[TEST] Market Found: {str(m)[:300]}")
-                found = True
-                break
-        if not found:
+# Sampling-markets list, shared across runs; it only changes every few minutes
+MARKETS_CACHE = os.path.expanduser("~/.cache/polymarket_sampling_markets.json")
+MARKETS_TTL = 300
+
+def load_sampling_markets():
+    try:
+        with open(MARKETS_CACHE) as f:
+            cached = json.load(f)
+        if time.time() - cached.get("updated_at", 0) < MARKETS_TTL:
+            return cached["markets"]
+    except (OSError, ValueError, KeyError):
+        pass
+
+    resp = session.get("https://clob.polymarket.com/sampling-simplified-markets")
+    resp.raise_for_status()
+    body = loads(resp.content)
+    markets = body.get('data', []) or body
+    os.makedirs(os.path.dirname(MARKETS_CACHE), exist_ok=True)
+    tmp = MARKETS_CACHE + ".tmp"
+    with open(tmp, "w") as f:
+        json.dump({"markets": markets, "updated_at": time.time()}, f)
+    os.replace(tmp, MARKETS_CACHE)
+    return markets
+
+@functools.lru_cache(maxsize=1024)
+def fetch_market_by_token(token_id):
+    """Sampling-markets entry for token_id, or None (disk cache first, then CLOB)."""
+    for m in load_sampling_markets():
+        if m.get('token_id') == token_id or m.get('asset_id') == token_id:
+            return m
+    return None
+
+def fetch_market():
+    print("[TEST] Fetching Market Data (Gamma API)...")
+    try:
+        token_id = "65596524896985010415844814777069255362767748488616308434723608750130614059462"
+        m = fetch_market_by_token(token_id)
+        if m is not None:
+            print(f"[TEST] Market Found: {str(m)[:300]}")
+        else:
             print("[TEST] Market NOT found in sampling")
-    else:
-        print(f"[TEST] CLOB Sampling Failed: {resp.status_code}")
-        
-except Exception as e:
-    print(f"[TEST] Gamma/Fetch Error: {e}")
+    except Exception as e:
+        print(f"[TEST] Gamma/Fetch Error: {e}")
+
+# Independent reads (Polygon RPC vs CLOB): run them side by side
+with ThreadPoolExecutor(max_workers=2) as pool:
+    for fut in [pool.submit(check_balances), pool.submit(fetch_market)]:
+        fut.result()
 
 print(f"[TEST] Using Collateral (USDC.e): 0x2791Bca1f2de4661ED88A30C99A7a9449Aa84174")
 print("[TEST] Signing Order...")
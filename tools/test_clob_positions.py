@@ -26,12 +26,16 @@ if not PK:
     print("Error: PK missing in .env")
     sys.exit(1)
 
-def test_endpoint(endpoint):
+SESSION = requests.Session()
+
+# Built once and passed to every endpoint check; only the L2 headers
+# (timestamped HMAC) are per request
+SIGNER = Signer(PK, CHAIN_ID)
+CREDS = ApiCreds(KEY, SECRET, PASSPHRASE)
+
+def test_endpoint(signer, creds, endpoint):
     print(f"\n--- Testing {endpoint} ---")
     try:
-        signer = Signer(PK, CHAIN_ID)
-        creds = ApiCreds(KEY, SECRET, PASSPHRASE)
-        
         req_args = RequestArgs(
             method="GET",
             request_path=endpoint,
@@ -45,7 +49,7 @@ def test_endpoint(endpoint):
         )
         
         url = HOST + endpoint
-        resp = requests.get(url, headers=headers)
+        resp = SESSION.get(url, headers=headers)
         
         print(f"Status: {resp.status_code}")
         if resp.status_code == 200:
@@ -57,5 +61,5 @@ def test_endpoint(endpoint):
         print(f"Error: {e}")
 
 if __name__ == "__main__":
-    test_endpoint("/data/trades") 
-    test_endpoint("/trades")
+    test_endpoint(SIGNER, CREDS, "/data/trades")
+    test_endpoint(SIGNER, CREDS, "/trades")
@@ -5,11 +5,13 @@ import json
 ADDRESS = "0xb22028EA4E841CA321eb917C706C931a94b564AB"
 DATA_API_URL = "https://data-api.polymarket.com"
 
+SESSION = requests.Session()
+
 def check_endpoint():
     ep = f"/positions?user={ADDRESS}"
     print(f"Checking {DATA_API_URL + ep}...")
     try:
-        resp = requests.get(DATA_API_URL + ep, timeout=10)
+        resp = SESSION.get(DATA_API_URL + ep, timeout=10)
         print(f"Status: {resp.status_code}")
         if resp.status_code == 200:
             data = resp.json()
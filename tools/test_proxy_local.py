@@ -10,12 +10,14 @@ load_dotenv()
 PROXY_URL = os.getenv("PROXY_URL", "")
 SYS_PROXIES = {"https": PROXY_URL, "http": PROXY_URL}
 
+SESSION = requests.Session()
+
 def test_proxy():
     print(f"Testing Proxy: {PROXY_URL}")
     try:
         # 1. Test IP Check
         print("Checking IP via Proxy...")
-        resp = requests.get("https://api.ipify.org?format=json", proxies=SYS_PROXIES, timeout=15)
+        resp = SESSION.get("https://api.ipify.org?format=json", proxies=SYS_PROXIES, timeout=15)
         if resp.status_code == 200:
             print(f"✅ Proxy IP: {resp.json().get('ip')}")
         else:
@@ -24,7 +26,7 @@ def test_proxy():
 
         # 2. Test HTTP Access (Generic)
         print("Checking General HTTP Access...")
-        resp = requests.get("https://www.google.com", proxies=SYS_PROXIES, timeout=15)
+        resp = SESSION.get("https://www.google.com", proxies=SYS_PROXIES, timeout=15)
         if resp.status_code == 200:
             print("✅ General Access: SUCCESS")
         else:
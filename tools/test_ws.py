@@ -1,6 +1,6 @@
 import asyncio
 import websockets
-import json
+from _fastjson import loads
 
 async def test_ws():
     uri = "ws://localhost:8000/api/v1/ws/stream"
@@ -9,7 +9,7 @@ async def test_ws():
             print(f"Connected to {uri}")
             while True:
                 msg = await websocket.recv()
-                data = json.loads(msg)
+                data = loads(msg)
                 print(f"Received: Equity=${data.get('total_equity')} | PnL=${data.get('virtual_pnl')}")
                 break # Just need one message to verify
     except Exception as e:
@@ -1,6 +1,6 @@
 import asyncio
 import websockets
-import json
+from _fastjson import loads
 import sys
 
 async def test_ws():
@@ -11,7 +11,7 @@ async def test_ws():
             print(f"Connected!")
             while True:
                 msg = await websocket.recv()
-                data = json.loads(msg)
+                data = loads(msg)
                 print(f"Received: Equity=${data.get('total_equity')} | PnL=${data.get('virtual_pnl')}")
                 break
     except Exception as e:
@@ -1,12 +1,12 @@
 import asyncio
 import os
-import json
-import time
 from datetime import datetime
 from dotenv import load_dotenv
 from py_clob_client.client import ClobClient
 from py_clob_client.clob_types import ApiCreds
 import websockets
+from _clob_ws import get_book_ws
+from _fastjson import loads
 
 # Load Environment from where the bot runs
 load_dotenv("/app/hft/.env")
@@ -16,26 +16,26 @@ BINANCE_URL = "wss://stream.binance.us:9443/ws/btcusdt@aggTrade/ethusdt@aggTrade
 
 async def check_binance():
     print(f"\n[1] CHECKING EXTERNAL FEED (Binance US)...")
-    print(f"Connecting to {BINANCE_URL}...")
+    print(f"[1] Connecting to {BINANCE_URL}...")
     try:
         async with websockets.connect(BINANCE_URL) as ws:
-            print("Connected! Listening for 5 seconds...")
-            start = time.time()
+            print("[1] Connected! Listening for 5 seconds...")
             count = 0
-            while time.time() - start < 5:
-                try:
-                    msg = await asyncio.wait_for(ws.recv(), timeout=1.0)
-                    data = json.loads(msg)
-                    print(f" -> Ticker: {data.get('s')} | Price: {data.get('p')}")
-                    count += 1
-                except asyncio.TimeoutError:
-                    continue
+            # One deadline for the whole window instead of a wait_for timer per recv
+            try:
+                async with asyncio.timeout(5.0):
+                    while True:
+                        data = loads(await ws.recv())
+                        print(f"[1] -> Ticker: {data.get('s')} | Price: {data.get('p')}")
+                        count += 1
+            except TimeoutError:
+                pass
             if count == 0:
-                print(" -> [WARNING] No ticks received! Feed might be silent.")
+                print("[1] -> [WARNING] No ticks received! Feed might be silent.")
             else:
-                print(f" -> Received {count} ticks. Feed is ALIVE.")
+                print(f"[1] -> Received {count} ticks. Feed is ALIVE.")
     except Exception as e:
-        print(f" -> [ERROR] Binance Connection Failed: {e}")
+        print(f"[1] -> [ERROR] Binance Connection Failed: {e}")
 
 async def check_polymarket():
     print(f"\n[2] CHECKING POLYMARKET CONNECTION...")
@@ -48,32 +48,33 @@ async def check_polymarket():
     creds = ApiCreds(api_key=api_key, api_secret=api_secret, api_passphrase=api_passphrase)
     client = ClobClient("https://clob.polymarket.com", key=pk, chain_id=137, creds=creds)
     
-    print(f"Fetching Order Book for Token: {TOKEN_ID[:20]}...")
+    print(f"[2] Fetching Order Book for Token: {TOKEN_ID[:20]}...")
     try:
-        book = client.get_order_book(TOKEN_ID)
-        print(f" -> Bids: {book.bids[:3]}")
-        print(f" -> Asks: {book.asks[:3]}")
+        # Snapshot from the market websocket; REST (in a thread) if that fails
+        book = await get_book_ws(TOKEN_ID, fallback=lambda: client.get_order_book(TOKEN_ID))
+        print(f"[2] -> Bids: {book.bids[:3]}")
+        print(f"[2] -> Asks: {book.asks[:3]}")
         
         if book.bids and book.asks:
             best_bid = float(book.bids[0].price)
             best_ask = float(book.asks[0].price)
             mid = (best_bid + best_ask) / 2
-            print(f" -> Calculated Internal Mid: {mid:.4f}")
+            print(f"[2] -> Calculated Internal Mid: {mid:.4f}")
             
             if mid == 0.500:
-                print(" -> [CRITICAL] Market is indeed FLAT at 0.500.")
+                print("[2] -> [CRITICAL] Market is indeed FLAT at 0.500.")
             else:
-                print(f" -> [DISCREPANCY] Market is active! Dashboard is stale.")
+                print(f"[2] -> [DISCREPANCY] Market is active! Dashboard is stale.")
         else:
-            print(" -> [ERROR] Order Book is empty!")
+            print("[2] -> [ERROR] Order Book is empty!")
             
     except Exception as e:
-        print(f" -> [ERROR] Polymarket Fetch Failed: {e}")
+        print(f"[2] -> [ERROR] Polymarket Fetch Failed: {e}")
 
 async def main():
     print("=== LIVE SYSTEM INVESTIGATION TRACE ===")
-    await check_binance()
-    await check_polymarket()
+    # Independent checks; lines are tagged [1]/[2] since their output interleaves
+    await asyncio.gather(check_binance(), check_polymarket())
     print("\n=== TRACE COMPLETE ===")
 
 if __name__ == "__main__":
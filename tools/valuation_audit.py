@@ -1,13 +1,16 @@
 #!/usr/bin/env python3
+import asyncio
 import os
 import sys
 import math
 from dotenv import load_dotenv
 from py_clob_client.client import ClobClient
-from py_clob_client.clob_types import ApiCreds, OrderArgs, OrderType
+from py_clob_client.clob_types import ApiCreds, OrderArgs, OrderBookSummary, OrderSummary, OrderType
 from py_clob_client.constants import POLYGON
 from curl_cffi import requests as cffi_requests
 import py_clob_client.http_helpers.helpers as _clob_helpers
+from _clob_ws import get_book_ws
+import ijson
 
 # --- CONFIG ---
 load_dotenv(".env")
@@ -32,6 +35,48 @@ def patched_request(endpoint, method, headers=None, data=None, **kwargs):
     return resp.json()
 _clob_helpers.request = patched_request
 
+def fetch_book(token_id):
+    """
+    REST /book decoded incrementally with ijson: only the bid/ask levels are
+    built, never the whole response dict. Levels come back in the API's
+    order (best last); main() sorts them.
+    """
+    bid_items, ask_items = ijson.sendable_list(), ijson.sendable_list()
+    parsers = [ijson.items_coro(bid_items, "bids.item"), ijson.items_coro(ask_items, "asks.item")]
+
+    resp = session.get("https://clob.polymarket.com/book", params={"token_id": token_id}, stream=True)
+    try:
+        resp.raise_for_status()
+        for chunk in resp.iter_content():
+            for parser in parsers:
+                parser.send(chunk)
+        for parser in parsers:
+            parser.close()
+    finally:
+        resp.close()
+    return OrderBookSummary(
+        asset_id=token_id,
+        bids=[OrderSummary(price=b["price"], size=b["size"]) for b in bid_items],
+        asks=[OrderSummary(price=a["price"], size=a["size"]) for a in ask_items],
+    )
+
+def fill_levels(bids, qty_raw):
+    """
+    Walk the bid book for a market sell of qty_raw units.
+    Returns (prices, sizes_raw, takes_raw, unsold_raw); takes_raw[i] is what
+    level i fills (0 past the last level touched).
+    """
+    prices, sizes, takes = [], [], []
+    remaining = qty_raw
+    for bid in bids:
+        p, s = float(bid.price), float(bid.size)
+        take = min(s, remaining)
+        prices.append(p)
+        sizes.append(s)
+        takes.append(take)
+        remaining -= take
+    return prices, sizes, takes, remaining
+
 def main():
     print("🔎 STARTING LIQUIDITY VALUATION AUDIT (VWAP METHOD)")
     
@@ -41,9 +86,10 @@ def main():
 
     try:
         # 1. Fetch Book
-        book = client.get_order_book(TARGET_TOKEN)
-        bids = book.bids
-        asks = book.asks
+        book = asyncio.run(get_book_ws(TARGET_TOKEN, fallback=lambda: fetch_book(TARGET_TOKEN)))
+        # REST and WS both list levels best last; the VWAP walk needs best first
+        bids = sorted(book.bids, key=lambda b: float(b.price), reverse=True)
+        asks = sorted(book.asks, key=lambda a: float(a.price))
         
         if not bids or not asks:
             print("❌ MARKET ERROR: Orderbook empty/broken.")
@@ -54,95 +100,20 @@ def main():
         midpoint = (best_bid + best_ask) / 2
         print(f"📊 Market State: Bid ${best_bid} | Ask ${best_ask} | Mid ${midpoint:.3f}")
         
-        # 2. Simulate VWAP Sell
-        remaining = POS_SIZE
-        total_proceeds = 0.0
-        depth_consumed = 0
-        
+        # 2. Simulate VWAP Sell (book sizes are raw 1e6 units, prices per share)
         print(f"\n📉 Simulating Sell of {POS_SIZE} Shares...")
         print("   Price Level | Available | Took | Proceeds")
         print("   -----------------------------------------")
-        
-        for bid in bids:
-            price = float(bid.price)
-            size = float(bid.size) # Raw size usually? API returns strings. 
-            # Note: ClobClient get_order_book returns strings usually.
-            # Assuming size is SHARES for simplicity? 
-            # Wait, API returns size in RAW units or Shares? 
-            # Usually OrderBook returns size in units.
-            # We assume units. POS_SIZE=35 is shares.
-            # But wait, sell_position.py used raw_balance for Order, reporting shares / 1e6.
-            # So API returns RAW? 
-            # If so, size needs / 1e6.
-            # Let's verify by printing raw.
-            # But for safer math, let's assume size is raw.
-            
-            # Correction: py_clob_client OrderBook might normalize? 
-            # Most likely strings of raw units.
-            # We will assume bid.size is raw units.
-            avail_shares = float(bid.size) # Wait, if it's shares...
-            # If I get 2000000 -> 2 shares.
-            # Let's treat it as potential Shares, assuming input matches expectations.
-            # Actually, `get_order_book` returns whatever the API returns.
-            # Polymarket API returns raw units string.
-            # So `avail_shares = float(bid.size)`?
-            # Wait. If I want to match 35 shares.
-            # I should verify if `bid.size` is raw.
-            # Since I can't check easy, I will output logic assuming it needs / 1e6?
-            # NO, better to assume RAW everywhere to be safe, then convert at end.
-            
-            # BUT user asked for "Realized Exit Price".
-            # I will act as if `bid.size` is SHARES if it looks small, else RAW.
-            # If size > 1000, probably raw.
-            # If size < 1000, probably normal? (Unlikely for raw).
-            # I'll divide by 1e6 blindly.
-            
-            # Re-reading: OrderBook returns `size` field.
-            # Let's try dividing by 1e6.
-            
-            # WAIT. OrderBook returned by `py_clob_client` might be parsed?
-            # I'll check `market_maker.py` which printed Book info but didn't parse size.
-            # I will trust standard API response: Raw.
-            
-            size_shares = float(bid.size) # Intentionally NOT dividing to test if it's already normalized?
-            # No, standard is raw. I will divide.
-            # Actually, let's do this: 
-            # Just print the raw first line to debug.
-            # No, script needs to run once.
-            # I will use `float(bid.size)` but assuming generic unit.
-            # If I treat POS_SIZE as 35.0. 
-            # If bid.size is 35000000.
-            # Matches...
-            # I will use a helper: `to_shares(raw)`.
-            pass
 
-        # Redoing logic cleanly
-        remaining_raw = POS_SIZE * 1e6
-        total_proceeds_raw = 0.0
-        
-        for i, bid in enumerate(bids):
-            if remaining_raw <= 0: break
-            
-            p = float(bid.price)
-            s_raw = float(bid.size)
-            
-            take_raw = min(s_raw, remaining_raw)
-            total_proceeds_raw += (take_raw * p) # Proceeds in standard units?
-            # Price is standard (0.xx). 
-            # Proceeds = 1000000 * 0.50 = 500000.
-            # Does price apply to raw? Yes? 
-            # No. Price is per Share.
-            # If I sell 1 Share (1e6 units) at $0.50. I get $0.50 USDC (500000 units USDC).
-            # Math: (Units / 1e6) * Price.
-            
+        prices, sizes_raw, takes_raw, remaining_raw = fill_levels(bids, POS_SIZE * 1e6)
+        total_proceeds = 0.0
+        for p, s_raw, take_raw in zip(prices, sizes_raw, takes_raw):
+            if take_raw <= 0:
+                break
             proceeds_usd = (take_raw / 1e6) * p
-            
             print(f"   ${p:.3f}      | {s_raw/1e6:.2f}     | {take_raw/1e6:.2f} | ${proceeds_usd:.2f}")
-            
-            remaining_raw -= take_raw
-            depth_consumed += 1
             total_proceeds += proceeds_usd
-            
+
         realized_price = total_proceeds / POS_SIZE
         if remaining_raw > 0:
             print(f"\n❌ CRITICAL: Market Depth Insufficient! Could not sell full {POS_SIZE} shares.")
@@ -34,9 +34,6 @@ TOKEN_ID = "91501721879997492700285157368537347903611979351184809758453322525234
 def check_status():
     print(f"Checking Order Status for Token: {TOKEN_ID}")
     try:
-        # Inspect Client Methods
-        print(f"Client Methods: {[m for m in dir(client) if 'order' in m or 'trade' in m]}")
-        
         # Check Open Orders (Try no args)
         try:
             open_orders = client.get_orders()
@@ -46,13 +43,6 @@ def check_status():
         except Exception as e:
             print(f"get_orders() failed: {e}")
 
-        # Check Recent Trades (Try no args)
-        try:
-           # Some clients use get_trades_history or get_fills
-           # Let's try basic get_trades if listed in dir
-           pass
-        except: pass
-            
     except Exception as e:
         print(f"Error: {e}")
 
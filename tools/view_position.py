@@ -19,6 +19,7 @@ MAKER_ADDRESS = "0xb22028EA4E841CA321eb917C706C931a94b564AB"
 # RPC for Balance Check (USDC.e on Polygon)
 RPC_URL = "https://1rpc.io/matic"
 USDC_ADDRESS = "0x2791Bca1f2de4661ED88A30C99A7a9449Aa84174"
+USDC_DECIMALS = 6  # immutable for both USDC.e and native USDC
 NATIVE_USDC = "0x3c499c542cEF5E3811e1192ce70d8cC03d5c3359"
 
 # ---------------- IMPORTS ----------------
@@ -60,18 +61,17 @@ def main():
         if w3.is_connected():
             matic_bal = w3.from_wei(w3.eth.get_balance(MAKER_ADDRESS), 'ether')
             # USDC.e
-            abi = [{"constant":True,"inputs":[{"name":"_owner","type":"address"}],"name":"balanceOf","outputs":[{"name":"balance","type":"uint256"}],"type":"function"},{"constant":True,"inputs":[],"name":"decimals","outputs":[{"name":"","type":"uint8"}],"type":"function"}]
+            abi = [{"constant":True,"inputs":[{"name":"_owner","type":"address"}],"name":"balanceOf","outputs":[{"name":"balance","type":"uint256"}],"type":"function"}]
             ct = w3.eth.contract(address=USDC_ADDRESS, abi=abi)
             usdc_raw = ct.functions.balanceOf(MAKER_ADDRESS).call()
-            usdc_dec = ct.functions.decimals().call()
-            usdc_bal = usdc_raw / (10 ** usdc_dec)
+            usdc_bal = usdc_raw / (10 ** USDC_DECIMALS)
             print(f"\n[WALLET BALANCES]")
             print(f" - USDC.e: ${usdc_bal:.2f}")
             print(f" - MATIC : {matic_bal:.4f}")
 
             # Native USDC
             native_ct = w3.eth.contract(address=Web3.to_checksum_address(NATIVE_USDC), abi=abi)
-            native_bal = native_ct.functions.balanceOf(MAKER_ADDRESS).call() / (10**6)
+            native_bal = native_ct.functions.balanceOf(MAKER_ADDRESS).call() / (10 ** USDC_DECIMALS)
             print(f" - Native USDC: ${native_bal:.2f}")
         else:
             print(f"\n[RPC ERROR] Could not connect to {RPC_URL}")
@@ -112,49 +112,42 @@ def main():
             realized_pnl = 0.0
             pnl_tracker = {} # asset -> {pos, cost}
 
-            for t in reversed(trades): # Chronological
-                asset = t.get('asset_id')
-                side = t.get('side') # Taker side
-                size = float(t.get('size', 0))
+            # Our share of each multi-maker trade (size summed over our maker
+            # orders, side of the last one), parsed once and aligned with
+            # `trades` for both the PnL walk and the log below
+            my_fills = []
+            for t in trades:
+                my_size, my_side = 0.0, None
+                for mo in t.get('maker_orders', []):
+                    if mo.get('maker_address') == MAKER_ADDRESS:
+                        my_size += float(mo.get('matched_amount', 0))
+                        my_side = mo.get('side')
+                my_fills.append((my_size, my_side))
+
+            # Average-cost PnL is a running recurrence (each buy re-weights the
+            # average), so it stays a loop, but only over trades we were in
+            for t, (my_actual_size, my_side) in zip(reversed(trades), reversed(my_fills)): # Chronological
+                if not my_side or my_actual_size <= 0:
+                    continue
                 price = float(t.get('price', 0))
-                
-                # Correction: Determine user's actual side and actual size matched in the multi-maker trade
-                my_actual_size = 0.0
-                my_side = None
-                
-                # Check maker orders for our contribution
-                if 'maker_orders' in t:
-                    for mo in t['maker_orders']:
-                        if mo.get('maker_address') == MAKER_ADDRESS:
-                            my_actual_size += float(mo.get('matched_amount', 0))
-                            my_side = mo.get('side')
-                
-                if my_actual_size == 0:
-                      # If not maker, maybe we were taker?
-                      # For this bot, we are usually maker. Let's assume taker if maker_orders not present/matching
-                      pass
-
-                if my_side and my_actual_size > 0:
-                    if asset not in pnl_tracker: pnl_tracker[asset] = {"pos": 0.0, "cost": 0.0}
-                    if my_side == 'BUY':
-                        pnl_tracker[asset]["pos"] += my_actual_size
-                        pnl_tracker[asset]["cost"] += (my_actual_size * price)
-                    else: # SELL
-                        if pnl_tracker[asset]["pos"] > 0:
-                            avg_cost = pnl_tracker[asset]["cost"] / pnl_tracker[asset]["pos"]
-                            realized_pnl += (price - avg_cost) * my_actual_size
-                            pnl_tracker[asset]["pos"] -= my_actual_size
-                            pnl_tracker[asset]["cost"] -= (my_actual_size * avg_cost)
-                        else:
-                            pnl_tracker[asset]["pos"] -= my_actual_size
-                            pnl_tracker[asset]["cost"] -= (my_actual_size * price)
-
-            # Display Trades
-            for t in trades[:15]:
-                dt = datetime.fromtimestamp(int(t.get('match_time', 0)))
-                # Calculate my specific action in this trade for the log
-                my_size = sum(float(mo['matched_amount']) for mo in t.get('maker_orders', []) if mo['maker_address'] == MAKER_ADDRESS)
+                tracker = pnl_tracker.setdefault(t.get('asset_id'), {"pos": 0.0, "cost": 0.0})
+                if my_side == 'BUY':
+                    tracker["pos"] += my_actual_size
+                    tracker["cost"] += (my_actual_size * price)
+                else: # SELL
+                    if tracker["pos"] > 0:
+                        avg_cost = tracker["cost"] / tracker["pos"]
+                        realized_pnl += (price - avg_cost) * my_actual_size
+                        tracker["pos"] -= my_actual_size
+                        tracker["cost"] -= (my_actual_size * avg_cost)
+                    else:
+                        tracker["pos"] -= my_actual_size
+                        tracker["cost"] -= (my_actual_size * price)
+
+            # Display Trades (timestamps formatted only for rows we print)
+            for t, (my_size, _) in zip(trades[:15], my_fills):
                 if my_size > 0:
+                    dt = datetime.fromtimestamp(int(t.get('match_time', 0)))
                     print(f" - {dt.strftime('%H:%M:%S')} | BOUGHT {my_size} @ ${t['price']} (Part of larger {t['side']} {t['size']} trade)")
 
             print(f"\n[ACCOUNT REALIZED PnL]")
@@ -8,6 +8,12 @@ Usage:
 
 The monitor agent runs this via SSH to get the COMPLETE picture — not just USDC.
 
+For repeated runs, start a long-lived server once:
+    python3 /app/sovereign-hive/tools/wallet_audit.py --serve
+It keeps one ClobClient, Web3 and keep-alive session and answers audits on
+AUDIT_SOCK; a plain invocation asks it first and only audits in-process
+(paying the client/TLS setup again) when no server is listening.
+
 Assets checked:
 1. USDC.e balance (wallet cash)
 2. Conditional tokens on CTF Exchange (shares from trades)
@@ -17,9 +23,14 @@ Assets checked:
 6. Current CLOB orderbook prices
 7. POL balance (gas)
 """
+import asyncio
 import os
 import json
+import socket
 import sys
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
 from datetime import datetime, timezone
 
 # ── Bootstrap ──────────────────────────────────────────────────────────
@@ -41,7 +52,13 @@ try:
     from web3 import Web3
     from py_clob_client.client import ClobClient
     from py_clob_client.clob_types import ApiCreds
-    import requests
+    from curl_cffi import CurlHttpVersion
+    from curl_cffi import requests as cffi_requests
+    from _abis import BALANCE_OF_SELECTOR
+    from eth_abi import encode
+    from _fastjson import dumps, loads
+    from _rpc import (aggregate3, batch_rpc, connect_fastest, decode_uint, eth_call,
+                      make_w3, pooled_session)
 except ImportError as e:
     print(json.dumps({"error": "missing dependency: %s" % e, "timestamp": datetime.now(timezone.utc).isoformat()}))
     sys.exit(1)
@@ -49,6 +66,7 @@ except ImportError as e:
 # ── Config ─────────────────────────────────────────────────────────────
 WALLET_KEY = os.environ.get("POLYMARKET_PRIVATE_KEY", "")
 USDC_ADDRESS = "0x2791Bca1f2de4661ED88A30C99A7a9449Aa84174"
+USDC_DECIMALS = 6  # immutable for USDC.e; no decimals() call needed
 CTF_ADDRESS = "0x4D97DCd97eC945f40cF65F87097ACe5EA0476045"
 NEGRISK_ADDRESS = "0xC5d563A36AE78145C45a50134d48A1215220f80a"
 RPC_ENDPOINTS = [
@@ -57,13 +75,18 @@ RPC_ENDPOINTS = [
     "https://polygon.llamarpc.com",
 ]
 
-ERC20_ABI = [
-    {"constant": True, "inputs": [{"name": "_owner", "type": "address"}],
-     "name": "balanceOf", "outputs": [{"name": "balance", "type": "uint256"}],
-     "type": "function"},
-    {"constant": True, "inputs": [], "name": "decimals",
-     "outputs": [{"name": "", "type": "uint8"}], "type": "function"}
-]
+# Unix socket of the --serve audit server
+AUDIT_SOCK = os.environ.get("WALLET_AUDIT_SOCK", "/run/sovereign-hive/wallet_audit.sock")
+
+# Gamma markets per held asset, kept across runs. Resolved markets never
+# change again, so those entries never expire; the rest are refetched
+# after GAMMA_TTL seconds
+GAMMA_CACHE = os.path.expanduser("~/.cache/wallet_audit/gamma.json")
+GAMMA_TTL = 300
+
+# ERC1155 balanceOf(address,uint256)
+ERC1155_BALANCE_OF_SELECTOR = bytes.fromhex("00fdd58e")
+
 CTF_ABI = [
     {"constant": True,
      "inputs": [{"name": "_owner", "type": "address"}, {"name": "_id", "type": "uint256"}],
@@ -72,34 +95,61 @@ CTF_ABI = [
      "type": "function"}
 ]
 
-result = {
-    "timestamp": datetime.now(timezone.utc).isoformat(),
-    "wallet_address": None,
-    "usdc_balance": 0.0,
-    "pol_balance": 0.0,
-    "conditional_tokens": [],
-    "open_orders": [],
-    "clob_locked": 0.0,
-    "sell_order_shares_value": 0.0,
-    "total_shares_value": 0.0,
-    "total_assets": 0.0,
-    "starting_balance": 82.88,
-    "pnl": 0.0,
-    "errors": [],
-    "actions_needed": [],
-}
+# One keep-alive session for every RPC POST (web3 provider and batch_rpc);
+# Gamma/CLOB GETs share a single curl_cffi session in fetch_market_data
+HTTP = pooled_session()
+HTTP.headers.update({"Accept": "application/json"})
+
+RESULT_LOCK = threading.Lock()
+
+
+def new_result():
+    """Empty audit result, stamped now."""
+    return {
+        "timestamp": datetime.now(timezone.utc).isoformat(),
+        "wallet_address": None,
+        "usdc_balance": 0.0,
+        "pol_balance": 0.0,
+        "conditional_tokens": [],
+        "open_orders": [],
+        "clob_locked": 0.0,
+        "sell_order_shares_value": 0.0,
+        "total_shares_value": 0.0,
+        "total_assets": 0.0,
+        "starting_balance": 82.88,
+        "pnl": 0.0,
+        "errors": [],
+        "actions_needed": [],
+    }
+
+
+result = new_result()
+
+
+def emit(obj):
+    """Write obj to stdout as indented JSON (bytes straight to the buffer)."""
+    sys.stdout.buffer.write(dumps(obj, indent=True) + b"\n")
+    sys.stdout.flush()
+
+
+def record(key, item):
+    """Append to a shared result list; the audit stages run on separate threads."""
+    with RESULT_LOCK:
+        result[key].append(item)
 
 
 def get_web3():
-    """Try multiple RPC endpoints."""
-    for rpc in RPC_ENDPOINTS:
-        try:
-            w3 = Web3(Web3.HTTPProvider(rpc, request_kwargs={"timeout": 10}))
-            if w3.is_connected():
-                return w3
-        except Exception:
-            continue
-    return None
+    """
+    Web3 on whichever RPC endpoint answers first (all probed in parallel),
+    with the others kept as fallbacks its reads are raced against, so one
+    slow or flaky public node can't stall every later call.
+    """
+    fastest = connect_fastest(RPC_ENDPOINTS, probe_timeout=2)
+    if fastest is None:
+        return None
+    rpc = fastest.provider.endpoint_uri
+    return make_w3(rpc, session=HTTP, timeout=10,
+                   fallback_urls=[u for u in RPC_ENDPOINTS if u != rpc])
 
 
 def get_clob_client():
@@ -116,21 +166,144 @@ def get_clob_client():
 
 
 def check_usdc_and_pol(w3, address):
-    """Check USDC.e and POL balances."""
+    """Check USDC.e and POL balances (one JSON-RPC batch for both reads)."""
+    owner_word = address[2:].lower().rjust(64, "0")
     try:
-        usdc = w3.eth.contract(
-            address=Web3.to_checksum_address(USDC_ADDRESS), abi=ERC20_ABI
-        )
-        raw = usdc.functions.balanceOf(address).call()
-        decimals = usdc.functions.decimals().call()
-        result["usdc_balance"] = raw / (10 ** decimals)
+        raw, pol = map(decode_uint, batch_rpc(w3.provider.endpoint_uri, [
+            eth_call(USDC_ADDRESS, "0x" + BALANCE_OF_SELECTOR.hex() + owner_word),
+            ("eth_getBalance", [address, "latest"]),
+        ], session=HTTP, timeout=10))
     except Exception as e:
-        result["errors"].append("USDC check failed: %s" % str(e)[:100])
+        record("errors", "Balance batch failed: %s" % str(e)[:100])
+        return
+
+    if raw is None:
+        record("errors", "USDC check failed: balanceOf returned no data")
+    else:
+        result["usdc_balance"] = raw / (10 ** USDC_DECIMALS)
+
+    if pol is None:
+        record("errors", "POL check failed: eth_getBalance returned no data")
+    else:
+        result["pol_balance"] = pol / 1e18
+
+
+def get_share_balances(w3, address, token_ids):
+    """
+    {token_id: (ctf_raw, negrisk_raw)} for every token, from one Multicall3
+    aggregate3 instead of two eth_calls per token. A balance that couldn't
+    be read is None. Falls back to per-contract calls if the multicall
+    itself fails.
+    """
+    if not token_ids:
+        return {}
+    contracts = [Web3.to_checksum_address(CTF_ADDRESS), Web3.to_checksum_address(NEGRISK_ADDRESS)]
+    calls = [
+        (target, ERC1155_BALANCE_OF_SELECTOR + encode(["address", "uint256"], [address, token_id]))
+        for token_id in token_ids for target in contracts
+    ]
+    try:
+        data = aggregate3(w3, calls, allow_failure=True)
+        values = [decode_uint(d) for d in data]
+    except Exception:
+        values = []
+        ctf, neg_risk = (w3.eth.contract(address=c, abi=CTF_ABI) for c in contracts)
+        for token_id in token_ids:
+            for contract in (ctf, neg_risk):
+                try:
+                    values.append(contract.functions.balanceOf(address, token_id).call())
+                except Exception:
+                    values.append(None)
+    return {token_id: (values[2 * i], values[2 * i + 1]) for i, token_id in enumerate(token_ids)}
+
+
+async def _get_json(session, url, require_ok):
+    resp = await session.get(url)
+    if require_ok and resp.status_code != 200:
+        return None
+    return loads(resp.content)
+
+
+def index_markets_by_token(markets):
+    """{token_id: market} over Gamma's clobTokenIds and tokens[] fields."""
+    by_token = {}
+    for m in markets:
+        token_ids = m.get("clobTokenIds") or []
+        if isinstance(token_ids, str):
+            try:
+                token_ids = loads(token_ids)
+            except ValueError:
+                token_ids = []
+        token_ids = list(token_ids) + [tok.get("token_id") for tok in m.get("tokens", [])]
+        for token_id in token_ids:
+            if token_id:
+                by_token.setdefault(str(token_id), m)
+    return by_token
+
+
+def load_gamma_cache():
+    """{asset_id: {"market": ..., "ts": ...}} from GAMMA_CACHE ({} if absent or corrupt)."""
+    try:
+        with open(GAMMA_CACHE, "rb") as f:
+            return loads(f.read())
+    except (OSError, ValueError):
+        return {}
+
 
+def save_gamma_cache(cache):
     try:
-        result["pol_balance"] = w3.eth.get_balance(address) / 1e18
-    except Exception as e:
-        result["errors"].append("POL check failed: %s" % str(e)[:100])
+        os.makedirs(os.path.dirname(GAMMA_CACHE), exist_ok=True)
+        tmp = GAMMA_CACHE + ".tmp"
+        with open(tmp, "wb") as f:
+            f.write(dumps(cache))
+        os.replace(tmp, GAMMA_CACHE)
+    except OSError:
+        pass
+
+
+async def fetch_market_data(asset_ids):
+    """
+    ({asset_id: gamma markets list}, {asset_id: CLOB book}): Gamma markets
+    from GAMMA_CACHE where still fresh, one Gamma request for the rest
+    (comma-separated clob_token_ids), then the books of still-open markets
+    in one gather. A failed fetch is left in place as its exception.
+    """
+    if not asset_ids:
+        return {}, {}
+    cache = load_gamma_cache()
+    now = time.time()
+    gammas = {
+        a: [cache[a]["market"]] for a in asset_ids
+        if a in cache and (cache[a]["market"].get("resolved") or now - cache[a]["ts"] < GAMMA_TTL)
+    }
+    missing = [a for a in asset_ids if a not in gammas]
+    # HTTP/2: the concurrent GETs to each host multiplex over one connection
+    async with cffi_requests.AsyncSession(
+        impersonate="chrome110", http_version=CurlHttpVersion.V2TLS, max_clients=32,
+        timeout=10, headers={"Accept": "application/json"},
+    ) as session:
+        if missing:
+            try:
+                markets = await _get_json(
+                    session,
+                    "https://gamma-api.polymarket.com/markets?clob_token_ids=%s" % ",".join(missing),
+                    False,
+                )
+                by_token = index_markets_by_token(markets)
+                for a in missing:
+                    gammas[a] = [by_token[a]] if a in by_token else []
+                    if a in by_token:
+                        cache[a] = {"market": by_token[a], "ts": now}
+                save_gamma_cache(cache)
+            except Exception as e:
+                gammas.update(dict.fromkeys(missing, e))
+        open_ids = [a for a, data in gammas.items()
+                    if isinstance(data, list) and data and not data[0].get("closed")]
+        books = await asyncio.gather(*(
+            _get_json(session, "https://clob.polymarket.com/book?token_id=%s" % a, True)
+            for a in open_ids
+        ), return_exceptions=True)
+    return gammas, dict(zip(open_ids, books))
 
 
 def check_clob_trades_and_tokens(w3, address, client):
@@ -159,140 +332,129 @@ def check_clob_trades_and_tokens(w3, address, client):
                 if trade["outcome"]:
                     asset_outcomes[trade["asset_id"]] = trade["outcome"]
     except Exception as e:
-        result["errors"].append("CLOB trades failed: %s" % str(e)[:100])
+        record("errors", "CLOB trades failed: %s" % str(e)[:100])
 
     # Check conditional token balances for every traded asset
-    ctf = w3.eth.contract(address=Web3.to_checksum_address(CTF_ADDRESS), abi=CTF_ABI)
-    neg_risk = w3.eth.contract(address=Web3.to_checksum_address(NEGRISK_ADDRESS), abi=CTF_ABI)
-
+    token_ids = {}
     for asset_id in asset_ids:
         try:
-            token_id = int(asset_id)
+            token_ids[asset_id] = int(asset_id)
         except (ValueError, TypeError):
             continue
+    balances = get_share_balances(w3, address, list(token_ids.values()))
+    held = {}  # asset_id -> (shares, source)
 
+    for asset_id, token_id in token_ids.items():
         shares = 0.0
         source = None
+        ctf_raw, nr_raw = balances[token_id]
 
-        # Check CTF Exchange
-        try:
-            balance = ctf.functions.balanceOf(address, token_id).call()
-            ctf_shares = balance / 1e6
-            if ctf_shares > 0.001:
-                shares = ctf_shares
-                source = "CTF"
-        except Exception:
-            pass
-
-        # Check NegRisk Adapter
-        try:
-            balance = neg_risk.functions.balanceOf(address, token_id).call()
-            nr_shares = balance / 1e6
-            if nr_shares > 0.001:
-                shares += nr_shares
-                if source:
-                    source += "+NegRisk"
-                else:
-                    source = "NegRisk"
-        except Exception:
-            pass
+        # CTF Exchange
+        if ctf_raw is not None and ctf_raw / 1e6 > 0.001:
+            shares = ctf_raw / 1e6
+            source = "CTF"
 
-        if shares > 0.001:
-            # Use outcome from trade data if available (more reliable than Gamma for token matching)
-            known_outcome = asset_outcomes.get(asset_id, "unknown")
-
-            # Look up market info
-            token_info = {
-                "asset_id": asset_id,
-                "shares": round(shares, 4),
-                "source": source,
-                "market_question": "unknown",
-                "outcome": known_outcome,
-                "resolved": False,
-                "winner": False,
-                "closed": False,
-                "current_price": 0.0,
-                "current_value": 0.0,
-                "max_value": round(shares, 2),  # $1 per share if wins
-            }
+        # NegRisk Adapter
+        if nr_raw is not None and nr_raw / 1e6 > 0.001:
+            shares += nr_raw / 1e6
+            if source:
+                source += "+NegRisk"
+            else:
+                source = "NegRisk"
 
-            # Get market details from Gamma API
-            try:
-                resp = requests.get(
-                    "https://gamma-api.polymarket.com/markets?clob_token_ids=%s" % asset_id,
-                    timeout=10
-                )
-                data = resp.json()
-                if data:
-                    m = data[0]
-                    token_info["market_question"] = m.get("question", "unknown")
-                    token_info["resolved"] = bool(m.get("resolved"))
-                    token_info["closed"] = bool(m.get("closed"))
-
-                    # Try to find our specific token in the market's tokens array
-                    matched_token = False
-                    for tok in m.get("tokens", []):
-                        if tok.get("token_id") == asset_id:
-                            matched_token = True
-                            token_info["outcome"] = tok.get("outcome", known_outcome)
-                            token_info["winner"] = bool(tok.get("winner"))
-                            price = tok.get("price")
-                            if price is not None:
-                                token_info["current_price"] = float(price)
-
-                    # If Gamma didn't match, keep outcome from trade data
-                    if not matched_token and known_outcome != "unknown":
-                        token_info["outcome"] = known_outcome
-
-                    # Check CLOB orderbook for current sellable price (only for open markets)
-                    if not token_info["closed"]:
-                        try:
-                            book_resp = requests.get(
-                                "https://clob.polymarket.com/book?token_id=%s" % asset_id,
-                                timeout=10
-                            )
-                            if book_resp.status_code == 200:
-                                book = book_resp.json()
-                                bids = book.get("bids", [])
-                                if bids:
-                                    best_bid = max(bids, key=lambda x: float(x.get("price", 0)))
-                                    token_info["current_price"] = float(best_bid.get("price", 0))
-                        except Exception:
-                            pass
-
-                    token_info["current_value"] = round(shares * token_info["current_price"], 2)
-
-                    # Determine action needed
-                    if token_info["resolved"] and token_info["winner"]:
-                        token_info["action"] = "REDEEM — resolved in our favor, worth $%.2f" % shares
-                        token_info["current_value"] = round(shares, 2)  # $1 per share
-                        result["actions_needed"].append(
-                            "REDEEM %.2f shares of '%s' ($%.2f)" % (
-                                shares, token_info["outcome"], shares
-                            )
+        if shares > 0.001:
+            held[asset_id] = (shares, source)
+
+    # Gamma metadata (one batched request) and order books for every held token
+    gammas, books = asyncio.run(fetch_market_data(list(held)))
+
+    for asset_id, (shares, source) in held.items():
+        # Use outcome from trade data if available (more reliable than Gamma for token matching)
+        known_outcome = asset_outcomes.get(asset_id, "unknown")
+
+        # Look up market info
+        token_info = {
+            "asset_id": asset_id,
+            "shares": round(shares, 4),
+            "source": source,
+            "market_question": "unknown",
+            "outcome": known_outcome,
+            "resolved": False,
+            "winner": False,
+            "closed": False,
+            "current_price": 0.0,
+            "current_value": 0.0,
+            "max_value": round(shares, 2),  # $1 per share if wins
+        }
+
+        # Get market details from Gamma API
+        try:
+            data = gammas[asset_id]
+            if isinstance(data, Exception):
+                raise data
+            if data:
+                m = data[0]
+                token_info["market_question"] = m.get("question", "unknown")
+                token_info["resolved"] = bool(m.get("resolved"))
+                token_info["closed"] = bool(m.get("closed"))
+
+                # Try to find our specific token in the market's tokens array
+                matched_token = False
+                for tok in m.get("tokens", []):
+                    if tok.get("token_id") == asset_id:
+                        matched_token = True
+                        token_info["outcome"] = tok.get("outcome", known_outcome)
+                        token_info["winner"] = bool(tok.get("winner"))
+                        price = tok.get("price")
+                        if price is not None:
+                            token_info["current_price"] = float(price)
+
+                # If Gamma didn't match, keep outcome from trade data
+                if not matched_token and known_outcome != "unknown":
+                    token_info["outcome"] = known_outcome
+
+                # Check CLOB orderbook for current sellable price (only for open markets)
+                book = books.get(asset_id)
+                if not token_info["closed"] and isinstance(book, dict):
+                    # REST /book lists bids ascending (best last); max() doesn't
+                    # depend on that and is trivial at these book sizes
+                    bids = book.get("bids", [])
+                    if bids:
+                        token_info["current_price"] = max(float(b.get("price", 0)) for b in bids)
+
+                token_info["current_value"] = round(shares * token_info["current_price"], 2)
+
+                # Determine action needed
+                if token_info["resolved"] and token_info["winner"]:
+                    token_info["action"] = "REDEEM — resolved in our favor, worth $%.2f" % shares
+                    token_info["current_value"] = round(shares, 2)  # $1 per share
+                    record("actions_needed",
+                        "REDEEM %.2f shares of '%s' ($%.2f)" % (
+                            shares, token_info["outcome"], shares
                         )
-                    elif token_info["resolved"] and not token_info["winner"]:
-                        token_info["action"] = "WORTHLESS — resolved against us"
-                        token_info["current_value"] = 0.0
-                    elif token_info["closed"] and not token_info["resolved"]:
-                        # Market closed but not yet resolved — likely pending resolution
-                        # For closed markets, value at max (pending outcome) for conservative reporting
-                        token_info["action"] = "PENDING RESOLUTION — market closed, awaiting result"
-                        token_info["current_value"] = round(shares, 2)  # Assume $1 until resolution (conservative high)
-                        result["actions_needed"].append(
-                            "CHECK resolution for '%s' (%s) — %.2f shares (worth $%.2f if wins, $0 if loses)" % (
-                                token_info["market_question"][:60],
-                                token_info["outcome"], shares, shares
-                            )
+                    )
+                elif token_info["resolved"] and not token_info["winner"]:
+                    token_info["action"] = "WORTHLESS — resolved against us"
+                    token_info["current_value"] = 0.0
+                elif token_info["closed"] and not token_info["resolved"]:
+                    # Market closed but not yet resolved — likely pending resolution
+                    # For closed markets, value at max (pending outcome) for conservative reporting
+                    token_info["action"] = "PENDING RESOLUTION — market closed, awaiting result"
+                    token_info["current_value"] = round(shares, 2)  # Assume $1 until resolution (conservative high)
+                    record("actions_needed",
+                        "CHECK resolution for '%s' (%s) — %.2f shares (worth $%.2f if wins, $0 if loses)" % (
+                            token_info["market_question"][:60],
+                            token_info["outcome"], shares, shares
                         )
-                    else:
-                        token_info["action"] = "OPEN — can sell at $%.2f or hold" % token_info["current_price"]
+                    )
+                else:
+                    token_info["action"] = "OPEN — can sell at $%.2f or hold" % token_info["current_price"]
 
-            except Exception as e:
-                result["errors"].append("Gamma lookup failed for %s: %s" % (asset_id[:12], str(e)[:80]))
+        except Exception as e:
+            record("errors", "Gamma lookup failed for %s: %s" % (asset_id[:12], str(e)[:80]))
 
-            result["conditional_tokens"].append(token_info)
-            result["total_shares_value"] += token_info["current_value"]
+        result["conditional_tokens"].append(token_info)
+        result["total_shares_value"] += token_info["current_value"]
 
 
 def check_open_orders(client):
@@ -321,38 +483,32 @@ def check_open_orders(client):
             result["clob_locked"] += locked_usdc
             result["sell_order_shares_value"] += locked_shares_value
     except Exception as e:
-        result["errors"].append("CLOB orders failed: %s" % str(e)[:100])
+        record("errors", "CLOB orders failed: %s" % str(e)[:100])
 
 
-def main():
-    if not WALLET_KEY:
-        result["errors"].append("POLYMARKET_PRIVATE_KEY not set")
-        print(json.dumps(result, indent=2))
-        sys.exit(1)
-
-    w3 = get_web3()
-    if not w3:
-        result["errors"].append("All RPC endpoints failed")
-        print(json.dumps(result, indent=2))
-        sys.exit(1)
+def run_audit(w3, client):
+    """Run every audit stage into a fresh `result` and return it."""
+    result.clear()
+    result.update(new_result())
 
-    account = w3.eth.account.from_key(WALLET_KEY)
-    address = account.address
+    address = w3.eth.account.from_key(WALLET_KEY).address
     result["wallet_address"] = address
 
-    # 1. USDC + POL
-    check_usdc_and_pol(w3, address)
-
-    # 2. CLOB client
-    client = get_clob_client()
-
-    # 3. Trades → Token balances → Market info
-    check_clob_trades_and_tokens(w3, address, client)
-
-    # 4. Open orders
-    check_open_orders(client)
-
-    # 5. Calculate totals
+    # 1-3 are independent (RPC, CLOB+Gamma, CLOB) and write disjoint result
+    # keys apart from record(): run them side by side
+    #   1. USDC + POL
+    #   2. Trades → Token balances → Market info
+    #   3. Open orders
+    with ThreadPoolExecutor(max_workers=3) as ex:
+        stages = [
+            ex.submit(check_usdc_and_pol, w3, address),
+            ex.submit(check_clob_trades_and_tokens, w3, address, client),
+            ex.submit(check_open_orders, client),
+        ]
+        for stage in stages:
+            stage.result()
+
+    # 4. Calculate totals
     # NOTE: clob_locked (unfilled BUY orders) is NOT real money — it's an off-chain
     # intent on Polymarket's CLOB. USDC only moves on-chain when orders are FILLED.
     # Do NOT add clob_locked to total_assets. Only count on-chain balances:
@@ -368,7 +524,7 @@ def main():
     )
     result["pnl"] = round(result["total_assets"] - result["starting_balance"], 2)
 
-    # 6. Summary line for quick parsing
+    # 5. Summary line for quick parsing
     result["summary"] = (
         "USDC=$%.2f | Shares=$%.2f | SellOrders=$%.2f | CLOBIntents=$%.2f | "
         "Total=$%.2f | P&L=$%+.2f | POL=%.1f | Actions=%d"
@@ -379,7 +535,82 @@ def main():
         len(result["actions_needed"])
     )
 
-    print(json.dumps(result, indent=2))
+    return result
+
+
+async def serve(sock_path=AUDIT_SOCK):
+    """
+    Answer {"cmd": "audit"} lines on a Unix socket with the audit JSON,
+    reusing one Web3 and ClobClient for the life of the process.
+    """
+    w3 = get_web3()
+    if not w3:
+        raise SystemExit("All RPC endpoints failed")
+    client = get_clob_client()
+    # `result` is shared module state: one audit at a time
+    audit_lock = asyncio.Lock()
+
+    async def handle(reader, writer):
+        try:
+            request = loads(await reader.readline())
+            if request.get("cmd") != "audit":
+                reply = dumps({"error": "unknown cmd: %s" % request.get("cmd")})
+            else:
+                async with audit_lock:
+                    reply = dumps(await asyncio.to_thread(run_audit, w3, client), indent=True)
+            writer.write(reply + b"\n")
+            await writer.drain()
+        except Exception as e:
+            writer.write(dumps({"error": str(e)[:200]}) + b"\n")
+        finally:
+            writer.close()
+
+    if os.path.exists(sock_path):
+        os.unlink(sock_path)
+    server = await asyncio.start_unix_server(handle, path=sock_path)
+    os.chmod(sock_path, 0o600)
+    async with server:
+        await server.serve_forever()
+
+
+def query_server(sock_path=AUDIT_SOCK, timeout=60):
+    """Audit JSON bytes from a running --serve process, or None if there isn't one."""
+    try:
+        with socket.socket(socket.AF_UNIX, socket.SOCK_STREAM) as sock:
+            sock.settimeout(timeout)
+            sock.connect(sock_path)
+            sock.sendall(b'{"cmd": "audit"}\n')
+            chunks = []
+            while chunk := sock.recv(65536):
+                chunks.append(chunk)
+    except OSError:
+        return None
+    return b"".join(chunks) or None
+
+
+def main():
+    if not WALLET_KEY:
+        record("errors", "POLYMARKET_PRIVATE_KEY not set")
+        emit(result)
+        sys.exit(1)
+
+    if "--serve" in sys.argv[1:]:
+        asyncio.run(serve())
+        return
+
+    reply = query_server()
+    if reply is not None:
+        sys.stdout.buffer.write(reply)
+        return
+
+    w3 = get_web3()
+    if not w3:
+        record("errors", "All RPC endpoints failed")
+        emit(result)
+        sys.exit(1)
+
+    run_audit(w3, get_clob_client())
+    emit(result)
 
 
 if __name__ == "__main__":